@@ -1,91 +1,330 @@
 """Crestron TSW-760 integration for Home Assistant."""
 
 import logging
+import time
+
+import aiohttp
 
-from homeassistant import config_entries
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import CONF_HOST, CONF_NAME
-from homeassistant.core import HomeAssistant
+from homeassistant.const import CONF_HOST, CONF_NAME, EntityCategory
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.helpers import (
+    config_validation as cv,
+    device_registry as dr,
+    entity_registry as er,
+)
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import DOMAIN, PLATFORMS
+from .const import (
+    ATTR_RESTORED,
+    ATTR_SNAPSHOT_SAVED_AT,
+    CONF_CONNECT_TIMEOUT,
+    CONF_MAX_IN_FLIGHT,
+    CONF_READ_TIMEOUT,
+    DATA_SCHEDULER,
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_READ_TIMEOUT,
+    DOMAIN,
+    MAX_IN_FLIGHT,
+    PLATFORMS,
+)
 from .coordinator import CrestronDataUpdateCoordinator
+from .descriptors import (
+    DESCRIPTORS,
+    DESCRIPTORS_BY_PLATFORM,
+    PanelInfo,
+    PathDescriptor,
+    build_panel_info,
+    entity_unique_id,
+)
+from .probe import pop_probe
+from .scheduler import FleetScheduler
+from .services import async_setup_services
+from .snapshot import SnapshotStore
 
 _LOGGER = logging.getLogger(__name__)
 
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+
+async def async_setup(hass: HomeAssistant, config: dict) -> bool:
+    """Register the services shared by all panels."""
+    async_setup_services(hass)
+    return True
+
 
 async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> bool:
     """Set up Crestron TSW-760 from a config entry."""
+    start = time.perf_counter()
     hass.data.setdefault(DOMAIN, {})
     hass.data[DOMAIN][config_entry.entry_id] = config_entry.data
+    if DATA_SCHEDULER not in hass.data[DOMAIN]:
+        hass.data[DOMAIN][DATA_SCHEDULER] = FleetScheduler()
     coordinator = CrestronDataUpdateCoordinator(
-        hass, config_entry.data[CONF_HOST], config_entry.data[CONF_NAME]
+        hass,
+        config_entry.data[CONF_HOST],
+        config_entry.data[CONF_NAME],
+        hass.data[DOMAIN][DATA_SCHEDULER],
+        SnapshotStore(hass, config_entry.entry_id),
+        connect_timeout=config_entry.options.get(
+            CONF_CONNECT_TIMEOUT, DEFAULT_CONNECT_TIMEOUT
+        ),
+        read_timeout=config_entry.options.get(CONF_READ_TIMEOUT, DEFAULT_READ_TIMEOUT),
+        max_in_flight=config_entry.options.get(CONF_MAX_IN_FLIGHT, MAX_IN_FLIGHT),
     )
-    # Forward the setup to the appropriate platforms
-    await coordinator.async_config_entry_first_refresh()
+    for descriptor in DESCRIPTORS:
+        coordinator.register_path(descriptor.value_path)
+    probe = pop_probe(hass, coordinator.host)
+    if probe is not None:
+        # The config flow just read the panel; reuse what it fetched
+        if not coordinator.seed_from_probe(probe):
+            _async_refresh_in_background(hass, config_entry, coordinator)
+    elif await coordinator.async_restore_snapshot():
+        # Set up from the last good snapshot; the panel is polled meanwhile
+        _async_refresh_in_background(hass, config_entry, coordinator)
+    else:
+        try:
+            await coordinator.async_config_entry_first_refresh()
+        except ConfigEntryNotReady:
+            await coordinator.async_shutdown()
+            raise
+    coordinator.panel = build_panel_info(coordinator, config_entry)
     hass.data[DOMAIN][config_entry.entry_id] = coordinator
+    config_entry.async_on_unload(config_entry.add_update_listener(_async_reload))
 
     # Forward the setup to the appropriate platforms
     await hass.config_entries.async_forward_entry_setups(config_entry, PLATFORMS)
+    coordinator.stats["setup_ms"] = round((time.perf_counter() - start) * 1000, 1)
+    _LOGGER.debug("Set up %s in %s ms", coordinator.host, coordinator.stats["setup_ms"])
+    coordinator.push.start()
+    if coordinator.discovered is None:
+        config_entry.async_create_background_task(
+            hass,
+            _async_discover(hass, config_entry, coordinator),
+            f"{DOMAIN} discovery {coordinator.host}",
+        )
+    else:
+        _async_register_discovered(hass, config_entry, coordinator)
     return True
 
 
+async def _async_discover(hass, config_entry, coordinator):
+    """Discover the panel's leaves and register their disabled entities."""
+    try:
+        await coordinator.async_discover_schema()
+    except (aiohttp.ClientError, TimeoutError, ValueError) as err:
+        _LOGGER.warning(
+            "Could not read the device tree of %s to discover entities: %s",
+            coordinator.host,
+            err,
+        )
+        return
+    _LOGGER.debug(
+        "Discovered %s leaves on %s", len(coordinator.discovered), coordinator.host
+    )
+    _async_register_discovered(hass, config_entry, coordinator)
+
+
+@callback
+def _async_register_discovered(hass, config_entry, coordinator):
+    """Add a disabled registry entry for every discovered leaf.
+
+    No entity object exists for these until the user enables one, which
+    reloads the entry; see ``async_platform_descriptors``.
+    """
+    registry = er.async_get(hass)
+    panel = coordinator.panel
+    device = dr.async_get(hass).async_get_device(
+        identifiers=panel.device_info["identifiers"]
+    )
+    for descriptor in coordinator.discovered:
+        name = f"{panel.name} {descriptor.name}"
+        registry.async_get_or_create(
+            descriptor.type,
+            DOMAIN,
+            entity_unique_id(panel, descriptor),
+            config_entry=config_entry,
+            device_id=device.id if device else None,
+            disabled_by=er.RegistryEntryDisabler.INTEGRATION,
+            original_name=name,
+            suggested_object_id=name,
+        )
+
+
+@callback
+def async_platform_descriptors(hass, config_entry, platform):
+    """Return the descriptors to create entities for on ``platform``.
+
+    Discovered leaves only get an entity once their registry entry is
+    enabled, so hundreds of them cost nothing until someone uses one.
+    """
+    descriptors = DESCRIPTORS_BY_PLATFORM.get(platform, ())
+    coordinator = hass.data[DOMAIN][config_entry.entry_id]
+    discovered = coordinator.discovered_by_platform.get(platform)
+    if not discovered:
+        return descriptors
+    enabled = {
+        entry.unique_id
+        for entry in er.async_entries_for_config_entry(
+            er.async_get(hass), config_entry.entry_id
+        )
+        if entry.domain == platform and not entry.disabled
+    }
+    return descriptors + tuple(
+        descriptor
+        for descriptor in discovered
+        if entity_unique_id(coordinator.panel, descriptor) in enabled
+    )
+
+
+@callback
+def _async_refresh_in_background(hass, config_entry, coordinator):
+    """Run the first refresh without holding up setup."""
+    config_entry.async_create_background_task(
+        hass,
+        coordinator.async_refresh(),
+        f"{DOMAIN} first refresh {coordinator.host}",
+    )
+
+
+async def _async_reload(hass: HomeAssistant, config_entry: ConfigEntry) -> None:
+    """Apply changed options by reloading the entry."""
+    await hass.config_entries.async_reload(config_entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     unload_ok = await hass.config_entries.async_unload_platforms(
         config_entry, PLATFORMS
     )
     if unload_ok:
-        hass.data[DOMAIN].pop(config_entry.entry_id)
+        coordinator = hass.data[DOMAIN].pop(config_entry.entry_id)
+        await coordinator.async_shutdown()
     return unload_ok
 
 
+async def async_remove_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> None:
+    """Delete the stored snapshot of a removed panel."""
+    await SnapshotStore(hass, config_entry.entry_id).async_remove()
+
+
 class CrestronEntity(CoordinatorEntity):
-    """Representation of a Crestron entity."""
+    """Representation of a Crestron entity.
+
+    Everything that is the same for many entities lives in the shared
+    ``panel`` and ``descriptor``; an entity only stores its name and the
+    references to both.
+    """
 
     def __init__(
         self,
         coordinator: CrestronDataUpdateCoordinator,
-        name: str,
-        value_path: list,
-        entity_id: str,
-        config_entry: config_entries.ConfigEntry,
+        panel: PanelInfo,
+        descriptor: PathDescriptor,
     ):
         """Initialize the Crestron entity."""
-        super().__init__(coordinator)
-        self._attr_name = name
-        self.value_path = value_path
-        self._entity_id = entity_id
-        self._attr_unique_id = f"{entity_id}_" + "_".join(value_path)
-        self._attr_model = self.coordinator.data.get("model", "")
-        self._attr_serial_number = self.coordinator.data.get("SerialNumber", "")
-        self._attr_mac_address = self.coordinator.data.get("MacAddress", "")
-        self._attr_device_info = {
-            "identifiers": {(DOMAIN, self._attr_serial_number)},
-            "name": config_entry.data.get(CONF_NAME, name),
-            "manufacturer": "Crestron",
-            "model": self._attr_model,
-            "serial_number": self._attr_serial_number,
-            "connections": {("mac", self._attr_mac_address)},
-        }
+        super().__init__(coordinator, descriptor.value_path)
+        self.panel = panel
+        self.descriptor = descriptor
+        self._attr_name = f"{panel.name} {descriptor.name}"
+        coordinator.register_path(descriptor.value_path)
+
+    @property
+    def value_path(self):
+        """Return the path of the entity's value in the device tree."""
+        return self.descriptor.value_path
+
+    @property
+    def unique_id(self):
+        """Return a unique ID for the entity."""
+        return entity_unique_id(self.panel, self.descriptor)
+
+    @property
+    def entity_registry_enabled_default(self):
+        """Return whether the entity is enabled when first added."""
+        return not self.descriptor.discovered
+
+    @property
+    def name(self):
+        """Return the name of the entity."""
+        return self._attr_name
 
     @property
     def device_info(self):
         """Return device information about this entity."""
-        return self._attr_device_info
+        return self.panel.device_info
 
     @property
     def available(self):
         """Return if the entity is available."""
         return self.coordinator.last_update_success
 
+    @property
+    def extra_state_attributes(self):
+        """Mark values restored from the stored snapshot."""
+        attributes = super().extra_state_attributes
+        if not self.coordinator.restored:
+            return attributes
+        return {
+            **(attributes or {}),
+            ATTR_RESTORED: True,
+            ATTR_SNAPSHOT_SAVED_AT: self.coordinator.restored_at,
+        }
+
     def _extract_value(self):
         """Extract value from the API response."""
-        value = self.coordinator.data
-        if value is None:
-            return None
-        for key in self.value_path:
-            value = value.get(key)
-            if value is None:
-                return None
-        return value
+        return self.coordinator.values.get(self.coordinator_context)
+
+    def _handle_result(self, outcome):
+        """Log a failed write outcome and return whether the write succeeded."""
+        if outcome is None:
+            _LOGGER.warning(
+                "No result reported for %s, refreshing its state", self._attr_name
+            )
+            return False
+        if not outcome.success:
+            _LOGGER.error(
+                "Failed to set property %s. Error: %s",
+                self.value_path[-1],
+                outcome.status_info,
+            )
+            return False
+        return True
+
+
+class CrestronDiagnosticEntity(CoordinatorEntity):
+    """Representation of a diagnostic entity reporting on the coordinator.
+
+    It has no value path, so it hears about every refresh; its state is
+    only written when it changed since the last refresh.
+    """
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _last_reported = None
+
+    def __init__(
+        self,
+        coordinator: CrestronDataUpdateCoordinator,
+        panel: PanelInfo,
+        name: str,
+        key: str,
+    ):
+        """Initialize the diagnostic entity."""
+        super().__init__(coordinator)
+        self.panel = panel
+        self._attr_name = f"{panel.name} {name}"
+        self._attr_unique_id = f"{panel.slug}_{key}"
+
+    @property
+    def device_info(self):
+        """Return device information about this entity."""
+        return self.panel.device_info
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the state if the refresh changed it."""
+        reported = (self.available, self.state, self.extra_state_attributes)
+        if reported != self._last_reported:
+            self._last_reported = reported
+            self.async_write_ha_state()
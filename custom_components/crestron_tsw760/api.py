@@ -0,0 +1,285 @@
+"""HTTP client used for all communication with a Crestron TSW-760 panel."""
+
+import asyncio
+import contextlib
+import hashlib
+import logging
+import time
+
+import aiohttp
+
+from .breaker import STATE_CLOSED, CircuitBreaker, CircuitOpenError
+from .commands import PRIORITY_POLL, PRIORITY_WRITE, CommandQueue
+from .const import (
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_READ_TIMEOUT,
+    DEVICE_INFO_PATH,
+    DNS_CACHE_TTL,
+    EXCLUDED_KEYS,
+    KEEPALIVE_TIMEOUT,
+    LIMIT_PER_HOST,
+    READ_CHUNK_SIZE,
+)
+from .decoder import PruningJsonDecoder
+from .timing import PhaseTimings
+from .trace import ExchangeTrace
+
+_LOGGER = logging.getLogger(__name__)
+
+# Returned by conditional GETs when the body has not changed
+NOT_MODIFIED = object()
+
+
+class CrestronApiClient:
+    """Keep-alive HTTP client for a single Crestron panel.
+
+    One client is shared by the coordinator and every entity of a panel so
+    polls and writes reuse the same pooled connections instead of opening a
+    new session per request.
+
+    Every request must connect within ``connect_timeout`` and receive each
+    part of its response within ``read_timeout`` seconds, and goes through
+    the panel's circuit breaker. At most ``limit_per_host`` requests are
+    sent at once; the others wait in the panel's CommandQueue. While
+    ``trace`` is enabled, every exchange is kept in its ring buffer.
+    """
+
+    def __init__(
+        self,
+        host,
+        limit_per_host=LIMIT_PER_HOST,
+        timings=None,
+        connect_timeout=DEFAULT_CONNECT_TIMEOUT,
+        read_timeout=DEFAULT_READ_TIMEOUT,
+    ):
+        """Initialize the client."""
+        self.host = host
+        self._limit_per_host = limit_per_host
+        self._timeout = aiohttp.ClientTimeout(
+            total=None, sock_connect=connect_timeout, sock_read=read_timeout
+        )
+        self.timings = timings if timings is not None else PhaseTimings()
+        self.breaker = CircuitBreaker(host)
+        self.queue = CommandQueue(limit_per_host, self.timings)
+        self.trace = ExchangeTrace()
+        self._session = None
+        self._validators = {}
+        # Set once the running circuit probe, if any, has an outcome
+        self._probe_done = None
+        self.stats = {
+            "requests": 0,
+            "connections_created": 0,
+            "connections_reused": 0,
+            "bytes_received": 0,
+            "bytes_skipped": 0,
+            "unchanged_hits": 0,
+            "unchanged_misses": 0,
+        }
+
+    def _get_session(self):
+        """Return the pooled session, creating it on first use."""
+        if self._session is None or self._session.closed:
+            trace_config = aiohttp.TraceConfig()
+            trace_config.on_connection_create_start.append(self._on_connection_start)
+            trace_config.on_connection_create_end.append(self._on_connection_create)
+            trace_config.on_connection_reuseconn.append(self._on_connection_reuse)
+            connector = aiohttp.TCPConnector(
+                limit_per_host=self._limit_per_host,
+                ttl_dns_cache=DNS_CACHE_TTL,
+                keepalive_timeout=KEEPALIVE_TIMEOUT,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=self._timeout,
+                trace_configs=[trace_config],
+            )
+        return self._session
+
+    async def _on_connection_start(self, session, context, params):
+        """Note when a new connection starts opening."""
+        context.connect_start = time.perf_counter()
+
+    async def _on_connection_create(self, session, context, params):
+        """Count a newly opened connection and time how long it took."""
+        self.stats["connections_created"] += 1
+        self.timings.record("connect", time.perf_counter() - context.connect_start)
+
+    async def _on_connection_reuse(self, session, context, params):
+        """Count a request served from a pooled connection."""
+        self.stats["connections_reused"] += 1
+
+    def url(self, path):
+        """Return the absolute URL of an API path."""
+        return f"http://{self.host}{path}"
+
+    @contextlib.asynccontextmanager
+    async def _async_guard(self, priority):
+        """Run a request through the command queue and the circuit breaker.
+
+        Connection errors, timeouts and server errors count as failures;
+        any other answer shows the panel is alive. When the failures open
+        the circuit, the pooled connections are dropped.
+        """
+        await self._async_wait_for_probe()
+        self.breaker.raise_if_open()
+        async with self.queue.async_slot(priority):
+            await self._async_check_circuit()
+            try:
+                yield
+            except aiohttp.ClientResponseError as err:
+                if err.status < 500:
+                    self.breaker.record_success()
+                elif self.breaker.record_failure(err):
+                    await self.async_close()
+                raise
+            except (aiohttp.ClientError, TimeoutError) as err:
+                if self.breaker.record_failure(err):
+                    await self.async_close()
+                raise
+            self.breaker.record_success()
+
+    async def _async_wait_for_probe(self):
+        """Wait until the running circuit probe, if any, has an outcome."""
+        while self._probe_done is not None:
+            await self._probe_done.wait()
+
+    async def _async_check_circuit(self):
+        """Fail fast while the circuit is open, probing when it is due.
+
+        The probe is a GET of the small DeviceInfo subtree whose body is
+        not read; any HTTP answer closes the circuit. Requests arriving
+        while it runs, such as the other subtrees of the same poll, wait
+        for its outcome instead of failing.
+        """
+        breaker = self.breaker
+        await self._async_wait_for_probe()
+        breaker.raise_if_open()
+        if breaker.state == STATE_CLOSED:
+            return
+        breaker.begin_probe()
+        self._probe_done = probe_done = asyncio.Event()
+        url = self.url("/" + "/".join(DEVICE_INFO_PATH))
+        try:
+            async with self._get_session().get(url):
+                pass
+        except (aiohttp.ClientError, TimeoutError) as err:
+            breaker.record_failure(err)
+            raise CircuitOpenError(f"{self.host} is still unreachable: {err}") from err
+        except asyncio.CancelledError:
+            breaker.abort_probe()
+            raise
+        finally:
+            self._probe_done = None
+            probe_done.set()
+        breaker.record_success()
+
+    async def async_get_json(self, path, conditional=False, priority=PRIORITY_POLL):
+        """GET an API path and return the decoded JSON body.
+
+        With ``conditional`` the request carries the ETag/Last-Modified
+        validators of the previous response, and a body identical to the
+        previous one is detected by digest. Either way ``NOT_MODIFIED`` is
+        returned instead of decoding the body again.
+        """
+        if not conditional:
+            return await self._async_request("get", path, priority)
+        etag, last_modified, previous_digest = self._validators.get(
+            path, (None, None, None)
+        )
+        headers = {}
+        if etag:
+            headers[aiohttp.hdrs.IF_NONE_MATCH] = etag
+        if last_modified:
+            headers[aiohttp.hdrs.IF_MODIFIED_SINCE] = last_modified
+        decoder = PruningJsonDecoder(EXCLUDED_KEYS)
+        digest = hashlib.blake2b(digest_size=16)
+        async with self._async_guard(priority):
+            with self.trace.capture("get", path) as capture:
+                session = self._get_session()
+                self.stats["requests"] += 1
+                start = time.perf_counter()
+                async with session.get(self.url(path), headers=headers) as response:
+                    self.timings.record("poll_wait", time.perf_counter() - start)
+                    if capture is not None:
+                        capture.respond(response.status)
+                    if response.status == 304:
+                        self.stats["unchanged_hits"] += 1
+                        return NOT_MODIFIED
+                    response.raise_for_status()
+                    with self.timings.measure("poll_download"):
+                        async for chunk in response.content.iter_chunked(
+                            READ_CHUNK_SIZE
+                        ):
+                            digest.update(chunk)
+                            decoder.feed(chunk)
+                            if capture is not None:
+                                capture.feed(chunk)
+                    etag = response.headers.get(aiohttp.hdrs.ETAG)
+                    last_modified = response.headers.get(aiohttp.hdrs.LAST_MODIFIED)
+        self._count_bytes(path, decoder)
+        body_digest = digest.digest()
+        self._validators[path] = (etag, last_modified, body_digest)
+        if body_digest == previous_digest:
+            self.stats["unchanged_hits"] += 1
+            return NOT_MODIFIED
+        self.stats["unchanged_misses"] += 1
+        with self.timings.measure("poll_decode"):
+            return decoder.close()
+
+    def invalidate(self):
+        """Forget all validators so the next conditional GETs decode again."""
+        self._validators.clear()
+
+    async def async_post_json(self, path, payload, priority=PRIORITY_WRITE):
+        """POST a payload to an API path and return the decoded JSON body."""
+        return await self._async_request("post", path, priority, json=payload)
+
+    async def _async_request(self, method, path, priority, **kwargs):
+        """Perform a request and decode its JSON response.
+
+        The body is decoded while it streams in, dropping ``EXCLUDED_KEYS``
+        subtrees without ever materializing them. Phases are timed as
+        ``poll_*`` for GETs and ``write_*`` for everything else.
+        """
+        phase = "poll" if method == "get" else "write"
+        decoder = PruningJsonDecoder(EXCLUDED_KEYS)
+        async with self._async_guard(priority):
+            with self.trace.capture(method, path, kwargs.get("json")) as capture:
+                session = self._get_session()
+                self.stats["requests"] += 1
+                start = time.perf_counter()
+                async with session.request(
+                    method, self.url(path), **kwargs
+                ) as response:
+                    self.timings.record(f"{phase}_wait", time.perf_counter() - start)
+                    if capture is not None:
+                        capture.respond(response.status)
+                    response.raise_for_status()
+                    with self.timings.measure(f"{phase}_download"):
+                        async for chunk in response.content.iter_chunked(
+                            READ_CHUNK_SIZE
+                        ):
+                            decoder.feed(chunk)
+                            if capture is not None:
+                                capture.feed(chunk)
+        self._count_bytes(path, decoder)
+        with self.timings.measure(f"{phase}_decode"):
+            return decoder.close()
+
+    def _count_bytes(self, path, decoder):
+        """Record how much of a response was received and skipped."""
+        self.stats["bytes_received"] += decoder.bytes_received
+        self.stats["bytes_skipped"] += decoder.bytes_skipped
+        _LOGGER.debug(
+            "Received %s bytes from %s%s (%s skipped)",
+            decoder.bytes_received,
+            self.host,
+            path,
+            decoder.bytes_skipped,
+        )
+
+    async def async_close(self):
+        """Close the pooled session and its connections."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
@@ -0,0 +1,136 @@
+"""Stop contacting a panel that keeps failing."""
+
+import logging
+import time
+
+import aiohttp
+
+from .const import (
+    BREAKER_FAILURE_THRESHOLD,
+    BREAKER_MAX_RESET_TIMEOUT,
+    BREAKER_RESET_TIMEOUT,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(aiohttp.ClientConnectionError):
+    """Raised instead of contacting a panel whose circuit is open."""
+
+
+class CircuitBreaker:
+    """Track the failures of one panel and decide whether to contact it.
+
+    After ``threshold`` consecutive failures the circuit opens and every
+    request fails at once with ``CircuitOpenError``. Once ``reset_timeout``
+    has passed, a single probe may be sent (half-open) while the client
+    holds other requests back: if it succeeds the circuit closes,
+    otherwise it opens again for twice as long, up to
+    ``max_reset_timeout``.
+    """
+
+    def __init__(
+        self,
+        host,
+        threshold=BREAKER_FAILURE_THRESHOLD,
+        reset_timeout=BREAKER_RESET_TIMEOUT,
+        max_reset_timeout=BREAKER_MAX_RESET_TIMEOUT,
+    ):
+        """Initialize the breaker."""
+        self.host = host
+        self._threshold = threshold
+        self._base_reset_timeout = reset_timeout
+        self._max_reset_timeout = max_reset_timeout
+        self._reset_timeout = reset_timeout
+        self._retry_at = None
+        self.state = STATE_CLOSED
+        self.stats = {
+            "consecutive_failures": 0,
+            "trips": 0,
+            "probes": 0,
+            "rejected": 0,
+            "last_error": None,
+        }
+
+    @property
+    def probe_due(self):
+        """Return whether an open circuit may send its probe now."""
+        return self.state == STATE_OPEN and time.monotonic() >= self._retry_at
+
+    def raise_if_open(self):
+        """Raise ``CircuitOpenError`` while the circuit is open.
+
+        Nothing is raised while a probe runs; the client then holds the
+        request until the probe's outcome is known.
+        """
+        if self.state != STATE_OPEN or self.probe_due:
+            return
+        self.stats["rejected"] += 1
+        raise CircuitOpenError(
+            f"{self.host} is unreachable, retrying in "
+            f"{self._retry_at - time.monotonic():.0f}s"
+        )
+
+    def begin_probe(self):
+        """Let one probe through; other requests wait for its outcome."""
+        self.state = STATE_HALF_OPEN
+        self.stats["probes"] += 1
+
+    def abort_probe(self):
+        """Reopen after a cancelled probe, allowing the next one at once."""
+        if self.state == STATE_HALF_OPEN:
+            self.state = STATE_OPEN
+            self._retry_at = time.monotonic()
+
+    def record_success(self):
+        """Close the circuit after the panel answered."""
+        if self.state != STATE_CLOSED:
+            _LOGGER.info("%s is reachable again", self.host)
+        self.state = STATE_CLOSED
+        self._reset_timeout = self._base_reset_timeout
+        self.stats["consecutive_failures"] = 0
+
+    def record_failure(self, err):
+        """Count a failed request; return whether the circuit just opened."""
+        self.stats["consecutive_failures"] += 1
+        self.stats["last_error"] = repr(err)
+        if self.state == STATE_HALF_OPEN:
+            self._reset_timeout = min(self._reset_timeout * 2, self._max_reset_timeout)
+            self._open()
+            return False
+        if (
+            self.state == STATE_CLOSED
+            and self.stats["consecutive_failures"] >= self._threshold
+        ):
+            self.stats["trips"] += 1
+            self._open()
+            _LOGGER.warning(
+                "%s failed %s requests in a row, pausing requests for %ss: %s",
+                self.host,
+                self.stats["consecutive_failures"],
+                self._reset_timeout,
+                err,
+            )
+            return True
+        return False
+
+    def _open(self):
+        """Reject requests until the reset timeout has passed."""
+        self.state = STATE_OPEN
+        self._retry_at = time.monotonic() + self._reset_timeout
+
+    def summary(self):
+        """Return the state and counters, e.g. for diagnostics."""
+        retry_in = None
+        if self.state == STATE_OPEN:
+            retry_in = round(max(self._retry_at - time.monotonic(), 0.0), 1)
+        return {
+            "state": self.state,
+            "retry_in": retry_in,
+            "reset_timeout": self._reset_timeout,
+            **self.stats,
+        }
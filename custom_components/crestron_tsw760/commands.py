@@ -0,0 +1,109 @@
+"""Serialize the requests sent to a single panel."""
+
+import asyncio
+import contextlib
+import heapq
+import itertools
+import time
+
+from .const import MAX_IN_FLIGHT, OPERATION_PREFIXES
+
+# Lower values are served first
+PRIORITY_OPERATION = 0
+PRIORITY_WRITE = 1
+PRIORITY_POLL = 2
+
+
+def write_priority(path):
+    """Return the priority of a write to ``path``.
+
+    Standby and other device operations go ahead of cosmetic settings
+    such as the brightness.
+    """
+    for prefix in OPERATION_PREFIXES:
+        if tuple(path[: len(prefix)]) == prefix:
+            return PRIORITY_OPERATION
+    return PRIORITY_WRITE
+
+
+class CommandQueue:
+    """Let at most ``limit`` requests reach a panel at once, by priority.
+
+    Waiting requests are served lowest priority value first, and in
+    arrival order within a priority. A task that already holds a slot can
+    send further requests under it without queueing again.
+    """
+
+    def __init__(self, limit=MAX_IN_FLIGHT, timings=None):
+        """Initialize the queue."""
+        self.limit = limit
+        self._timings = timings
+        self._waiters = []
+        self._order = itertools.count()
+        self._holders = set()
+        self.in_flight = 0
+        self.stats = {"commands": 0, "max_depth": 0, "jumped": 0}
+
+    @property
+    def depth(self):
+        """Return the number of requests waiting for a slot."""
+        return sum(1 for *_, waiter in self._waiters if not waiter.done())
+
+    @contextlib.asynccontextmanager
+    async def async_slot(self, priority=PRIORITY_POLL):
+        """Hold a slot for the duration of the block."""
+        task = asyncio.current_task()
+        if task in self._holders:
+            yield
+            return
+        start = time.perf_counter()
+        await self._async_acquire(priority)
+        if self._timings is not None:
+            self._timings.record("queue_wait", time.perf_counter() - start)
+        self._holders.add(task)
+        try:
+            yield
+        finally:
+            self._holders.discard(task)
+            self._release()
+
+    async def _async_acquire(self, priority):
+        """Wait until a slot is free and no higher priority is waiting."""
+        self.stats["commands"] += 1
+        if self.in_flight < self.limit and not self._waiters:
+            self.in_flight += 1
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        entry = (priority, next(self._order), waiter)
+        if self._waiters and priority < self._waiters[0][0]:
+            self.stats["jumped"] += 1
+        heapq.heappush(self._waiters, entry)
+        self.stats["max_depth"] = max(self.stats["max_depth"], len(self._waiters))
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just before the cancellation
+                self._release()
+            else:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+            raise
+
+    def _release(self):
+        """Hand the slot to the next waiter, or free it."""
+        while self._waiters:
+            *_, waiter = heapq.heappop(self._waiters)
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+    def summary(self):
+        """Return the queue state and counters, e.g. for diagnostics."""
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "depth": self.depth,
+            **self.stats,
+        }
@@ -1,6 +1,5 @@
 """Setup device via Home Assistant UI Config Flow."""
 
-import json
 import logging
 
 import aiohttp
@@ -8,19 +7,44 @@ import voluptuous as vol
 
 from homeassistant import config_entries
 from homeassistant.const import CONF_HOST, CONF_NAME
+from homeassistant.core import callback
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.selector import TextSelector, TextSelectorConfig
 
-from .const import DOMAIN
+from .const import (
+    CONF_CONNECT_TIMEOUT,
+    CONF_MAX_IN_FLIGHT,
+    CONF_READ_TIMEOUT,
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_READ_TIMEOUT,
+    DOMAIN,
+    MAX_IN_FLIGHT,
+)
+from .discovery import async_scan_hosts, hosts_in_network
+from .probe import (
+    NotAPanelError,
+    async_probe_panel,
+    async_probe_panels,
+    cached_probe,
+    remember_probe,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
+CONF_HOSTS = "hosts"
+CONF_NETWORK = "network"
+CONF_PANELS = "panels"
 
-def get_nested_value(data, keys, default=None):
-    """Retrieve a nested value from a dictionary."""
-    for key in keys:
-        data = data.get(key, default)
-        if data is default:
-            break
-    return data
+
+def parse_host_lines(text):
+    """Parse ``host`` or ``host, name`` lines into ``{host: name}``."""
+    panels = {}
+    for line in text.splitlines():
+        host, _, name = line.partition(",")
+        host = host.strip()
+        if host:
+            panels[host] = name.strip() or host
+    return panels
 
 
 class CrestronTSW760ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
@@ -28,8 +52,26 @@ class CrestronTSW760ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
     VERSION = 1
 
+    def __init__(self):
+        """Initialize the flow."""
+        self._scan_hosts = []
+        self._scan_task = None
+        self._discovered = {}
+
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry):
+        """Return the options flow."""
+        return CrestronTSW760OptionsFlow(config_entry)
+
     async def async_step_user(self, user_input=None):
-        """Handle the initial step."""
+        """Let the user add one panel, a list of panels or scan for them."""
+        return self.async_show_menu(
+            step_id="user", menu_options=["manual", "bulk", "discover"]
+        )
+
+    async def async_step_manual(self, user_input=None):
+        """Add a single panel by host."""
         errors = {}
         if user_input is not None:
             host = user_input[CONF_HOST]
@@ -37,44 +79,19 @@ class CrestronTSW760ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
             # Validate the user input here
             try:
-                async with (
-                    aiohttp.ClientSession() as session,
-                    session.get(f"http://{host}/Device") as response,
-                ):
-                    response.raise_for_status()
-                    # Fetch additional information from the device
-                    response_text = await response.text()
-                    _LOGGER.debug("Received device response: %s", response_text)
-                    device_info = json.loads(response_text, strict=False)
-
-                    # Extract necessary information from device_info
-                    model = get_nested_value(
-                        device_info, ["Device", "DeviceInfo", "Model"], ""
-                    )
-                    serial_number = get_nested_value(
-                        device_info, ["Device", "DeviceInfo", "SerialNumber"], ""
-                    )
-                    mac_address = get_nested_value(
-                        device_info, ["Device", "DeviceInfo", "MacAddress"], ""
-                    )
-
-                # Create entry with the validated data
-                return self.async_create_entry(
-                    title=name,
-                    data={
-                        CONF_HOST: host,
-                        CONF_NAME: name,
-                        "model": model,
-                        "serial_number": serial_number,
-                        "mac_address": mac_address,
-                    },
-                )
-            except aiohttp.ClientError as err:
+                probe = await async_probe_panel(host)
+            except TimeoutError:
+                _LOGGER.error("Timed out connecting to %s", host)
+                errors["base"] = "timeout_connect"
+            except (aiohttp.ClientError, NotAPanelError) as err:
                 _LOGGER.error("Error connecting to device: %s", err)
                 errors["base"] = "cannot_connect"
+            else:
+                remember_probe(self.hass, probe)
+                return await self._async_create_panel_entry(probe, name)
 
         return self.async_show_form(
-            step_id="user",
+            step_id="manual",
             data_schema=vol.Schema(
                 {
                     vol.Required(CONF_HOST): str,
@@ -83,3 +100,211 @@ class CrestronTSW760ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             ),
             errors=errors,
         )
+
+    async def async_step_bulk(self, user_input=None):
+        """Validate a list of panels concurrently and add the reachable ones.
+
+        Every reachable panel gets its own import flow; the hosts that
+        could not be reached are offered again.
+        """
+        errors = {}
+        placeholders = {"failed": ""}
+        hosts_text = ""
+        if user_input is not None:
+            panels = parse_host_lines(user_input[CONF_HOSTS])
+            configured = self._async_current_ids()
+            results = await async_probe_panels(list(panels))
+            failed = {}
+            added = 0
+            for host, result in results.items():
+                if isinstance(result, BaseException):
+                    _LOGGER.error("Error connecting to %s: %s", host, result)
+                    failed[host] = panels[host]
+                    continue
+                if result.serial_number in configured:
+                    continue
+                self._async_import_panel(result, panels[host])
+                added += 1
+            if not panels:
+                errors["base"] = "no_hosts"
+            elif not failed:
+                return self.async_abort(
+                    reason="bulk_added",
+                    description_placeholders={"count": str(added)},
+                )
+            else:
+                errors["base"] = "bulk_cannot_connect"
+                placeholders["failed"] = ", ".join(failed)
+                hosts_text = "\n".join(
+                    host if name == host else f"{host}, {name}"
+                    for host, name in failed.items()
+                )
+
+        return self.async_show_form(
+            step_id="bulk",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(CONF_HOSTS, default=hosts_text): TextSelector(
+                        TextSelectorConfig(multiline=True)
+                    ),
+                }
+            ),
+            errors=errors,
+            description_placeholders=placeholders,
+        )
+
+    async def async_step_discover(self, user_input=None):
+        """Ask for the address range to scan."""
+        errors = {}
+        if user_input is not None:
+            try:
+                self._scan_hosts = hosts_in_network(user_input[CONF_NETWORK])
+            except ValueError as err:
+                _LOGGER.error("Cannot scan %s: %s", user_input[CONF_NETWORK], err)
+                errors["base"] = "invalid_network"
+            else:
+                return await self.async_step_scan()
+
+        return self.async_show_form(
+            step_id="discover",
+            data_schema=vol.Schema({vol.Required(CONF_NETWORK): str}),
+            errors=errors,
+        )
+
+    async def async_step_scan(self, user_input=None):
+        """Scan the range while showing progress."""
+        if self._scan_task is None:
+            self._scan_task = self.hass.async_create_task(self._async_scan())
+        if not self._scan_task.done():
+            return self.async_show_progress(
+                step_id="scan",
+                progress_action="scan",
+                progress_task=self._scan_task,
+            )
+        self._scan_task = None
+        return self.async_show_progress_done(next_step_id="pick")
+
+    async def _async_scan(self):
+        """Collect the panels found in the range that are not set up yet."""
+        known = set()
+        for entry in self._async_current_entries(include_ignore=False):
+            known |= {
+                entry.unique_id,
+                entry.data.get("serial_number"),
+                entry.data.get("mac_address"),
+            }
+        self._discovered = {}
+        async for probe in async_scan_hosts(self._scan_hosts, known - {None, ""}):
+            _LOGGER.info(
+                "Found %s %s at %s", probe.model, probe.serial_number, probe.host
+            )
+            self._discovered[probe.host] = probe
+
+    async def async_step_pick(self, user_input=None):
+        """Let the user choose which of the found panels to add."""
+        if not self._discovered:
+            return self.async_abort(reason="no_panels_found")
+        if user_input is not None:
+            hosts = user_input[CONF_PANELS]
+            for host in hosts:
+                probe = self._discovered[host]
+                self._async_import_panel(probe, f"{probe.model} {host}")
+            return self.async_abort(
+                reason="bulk_added", description_placeholders={"count": str(len(hosts))}
+            )
+
+        choices = {
+            host: f"{probe.model} {probe.serial_number} ({host})"
+            for host, probe in sorted(self._discovered.items())
+        }
+        return self.async_show_form(
+            step_id="pick",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(
+                        CONF_PANELS, default=list(choices)
+                    ): cv.multi_select(choices),
+                }
+            ),
+            description_placeholders={"count": str(len(choices))},
+        )
+
+    def _async_import_panel(self, probe, name):
+        """Add a probed panel through its own import flow."""
+        remember_probe(self.hass, probe)
+        self.hass.async_create_task(
+            self.hass.config_entries.flow.async_init(
+                DOMAIN,
+                context={"source": config_entries.SOURCE_IMPORT},
+                data={CONF_HOST: probe.host, CONF_NAME: name},
+            )
+        )
+
+    async def async_step_import(self, import_data):
+        """Add a panel validated elsewhere, e.g. by the bulk step."""
+        host = import_data[CONF_HOST]
+        probe = cached_probe(self.hass, host)
+        if probe is None:
+            try:
+                probe = await async_probe_panel(host)
+            except (aiohttp.ClientError, TimeoutError, NotAPanelError) as err:
+                _LOGGER.error("Error connecting to %s: %s", host, err)
+                return self.async_abort(reason="cannot_connect")
+            remember_probe(self.hass, probe)
+        return await self._async_create_panel_entry(
+            probe, import_data.get(CONF_NAME, host)
+        )
+
+    async def _async_create_panel_entry(self, probe, name):
+        """Create the entry for a probed panel unless it is already set up."""
+        if probe.serial_number:
+            await self.async_set_unique_id(probe.serial_number)
+            self._abort_if_unique_id_configured(updates={CONF_HOST: probe.host})
+
+        # Create entry with the validated data
+        return self.async_create_entry(
+            title=name,
+            data={
+                CONF_HOST: probe.host,
+                CONF_NAME: name,
+                "model": probe.model,
+                "serial_number": probe.serial_number,
+                "mac_address": probe.mac_address,
+            },
+        )
+
+
+class CrestronTSW760OptionsFlow(config_entries.OptionsFlow):
+    """Let the user tune how requests are sent to a panel."""
+
+    def __init__(self, config_entry):
+        """Initialize the options flow."""
+        self._entry = config_entry
+
+    async def async_step_init(self, user_input=None):
+        """Edit the request deadlines and the requests in flight."""
+        if user_input is not None:
+            return self.async_create_entry(title="", data=user_input)
+
+        options = self._entry.options
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(
+                        CONF_CONNECT_TIMEOUT,
+                        default=options.get(
+                            CONF_CONNECT_TIMEOUT, DEFAULT_CONNECT_TIMEOUT
+                        ),
+                    ): vol.All(vol.Coerce(float), vol.Range(min=0.5, max=60)),
+                    vol.Required(
+                        CONF_READ_TIMEOUT,
+                        default=options.get(CONF_READ_TIMEOUT, DEFAULT_READ_TIMEOUT),
+                    ): vol.All(vol.Coerce(float), vol.Range(min=1, max=300)),
+                    vol.Required(
+                        CONF_MAX_IN_FLIGHT,
+                        default=options.get(CONF_MAX_IN_FLIGHT, MAX_IN_FLIGHT),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1, max=8)),
+                }
+            ),
+        )
@@ -3,6 +3,134 @@
 DOMAIN = "crestron_tsw760"
 PLATFORMS = ["sensor", "switch", "number", "text"]
 
+# Key of the fleet-wide poll scheduler in hass.data[DOMAIN]
+DATA_SCHEDULER = "scheduler"
+# Key of recent config flow probes, by host, in hass.data[DOMAIN]
+DATA_PROBES = "probes"
+
+# Requests sent to a panel at once, configurable down to 1 in the options
+# flow; the panel's embedded web server copes badly with more
+CONF_MAX_IN_FLIGHT = "max_in_flight"
+MAX_IN_FLIGHT = 2
+
+# Writes below these prefixes (standby, reboot, ...) are sent ahead of
+# cosmetic settings and without the write debounce
+OPERATION_PREFIXES = (("Device", "DeviceOperations"),)
+
+# Connection pool settings for the per-panel HTTP client
+LIMIT_PER_HOST = MAX_IN_FLIGHT
+DNS_CACHE_TTL = 300
+KEEPALIVE_TIMEOUT = 60
+READ_CHUNK_SIZE = 16384
+
+# Request deadlines in seconds, configurable in the options flow
+CONF_CONNECT_TIMEOUT = "connect_timeout"
+CONF_READ_TIMEOUT = "read_timeout"
+DEFAULT_CONNECT_TIMEOUT = 5
+DEFAULT_READ_TIMEOUT = 10
+
+# Circuit breaker: stop contacting a panel after this many failures in a
+# row, probing it again after a reset timeout that doubles while it stays
+# unreachable
+BREAKER_FAILURE_THRESHOLD = 3
+BREAKER_RESET_TIMEOUT = 30
+BREAKER_MAX_RESET_TIMEOUT = 300
+
+# Subtrees dropped from every response while it is decoded
+EXCLUDED_KEYS = ["CertificateStore", "Ieee8021x"]
+
+# Adaptive polling, in seconds
+POLL_INTERVAL = 30
+ACTIVE_POLL_INTERVAL = 3
+ACTIVE_POLL_COUNT = 3
+IDLE_BACKOFF_FACTOR = 1.5
+IDLE_MAX_INTERVAL = 120
+OFFLINE_MAX_INTERVAL = 300
+
+# Push updates over the panel's event stream; while connected, polls only
+# check consistency
+PUSH_PATH = "/Device/Events"
+PUSH_CONSISTENCY_INTERVAL = 300
+PUSH_HEARTBEAT = 30
+PUSH_RECONNECT_MIN = 1
+PUSH_RECONNECT_MAX = 120
+
+# Fleet-wide limits on polls in flight
+FLEET_MAX_CONCURRENT_POLLS = 16
+FLEET_MAX_POLLS_PER_SUBNET = 4
+
+# Rapid writes are debounced and merged into a single POST per panel
+WRITE_DEBOUNCE = 0.3
+
+# Panels written to at once by the fleet services
+BULK_CONCURRENCY = 64
+
+# StatusId values reported for a successfully written property; some
+# endpoints (e.g. the EMS server URL) answer 1 instead of 0.
+WRITE_SUCCESS_STATUS_IDS = (0, 1)
+
+# Timing histograms keep this many recent samples per phase
+TIMING_WINDOW = 200
+
+# History of the device tree kept per panel: changes of the last day,
+# within a memory budget in bytes, with a keyframe at least every hour
+HISTORY_WINDOW = 24 * 3600
+HISTORY_BUDGET = 256 * 1024
+HISTORY_KEYFRAME_INTERVAL = 3600
+
+# Exchanges kept per panel while tracing, and the bytes kept of each body
+TRACE_SIZE = 50
+TRACE_BODY_LIMIT = 4096
+
+# Phases timed per panel, each exposed as an opt-in diagnostic sensor
+TIMED_PHASES = (
+    "poll_queue",
+    "queue_wait",
+    "connect",
+    "poll_wait",
+    "poll_download",
+    "poll_decode",
+    "extract",
+    "history",
+    "dispatch",
+    "poll_total",
+    "write_debounce",
+    "write_wait",
+    "write_download",
+    "write_decode",
+    "write_apply",
+    "write_total",
+)
+
+# Last good snapshot of each panel, restored on startup
+SNAPSHOT_VERSION = 1
+SNAPSHOT_SAVE_DELAY = 60
+ATTR_RESTORED = "restored"
+ATTR_SNAPSHOT_SAVED_AT = "snapshot_saved_at"
+
+# Probing a panel before it is added, in seconds
+PROBE_TIMEOUT = 5
+PROBE_CONCURRENCY = 16
+PROBE_MAX_AGE = 300
+
+# Scanning an address range for panels
+PANEL_HTTP_PORT = 80
+SCAN_CONCURRENCY = 64
+SCAN_CONNECT_TIMEOUT = 0.5
+SCAN_PROBE_TIMEOUT = 3
+SCAN_MAX_ADDRESSES = 4096
+
+# Polling planner: value paths are served by subtrees this many keys deep
+SUBTREE_DEPTH = 2
+DEVICE_INFO_PATH = ("Device", "DeviceInfo")
+
+# Schema discovery: leaves below these prefixes, or whose key starts with
+# ``READ_ONLY_KEY_PREFIX``, are read-only and become sensors
+READ_ONLY_PREFIXES = (DEVICE_INFO_PATH, ("Device", "Ethernet"))
+READ_ONLY_KEY_PREFIX = "Current"
+# Numeric leaves become number entities only when their range is known
+NUMBER_RANGES = {"Brightness": (0, 100), "Volume": (0, 100)}
+
 ENTITIES_TO_EXPOSE = [
     {
         "type": "switch",
@@ -46,6 +174,6 @@ ENTITIES_TO_EXPOSE = [
     {
         "type": "text",
         "name": "EMS URL",
-        "value_path": ["Device", "ThirdPartyApplications", "EMSUrl"],
+        "value_path": ["Device", "ThirdPartyApplications", "Ems", "ServerUrl"],
     },
 ]
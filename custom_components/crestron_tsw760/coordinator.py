@@ -1,96 +1,513 @@
 """Module that provides a DataUpdateCoordinator for fetching and updating data from a Crestron device."""
 
+import asyncio
 from datetime import timedelta
-import json
 import logging
+import time
 
 import aiohttp
 
+from homeassistant.core import callback
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 
-_LOGGER = logging.getLogger(__name__)
-
-EXCLUDED_KEYS = ["CertificateStore", "Ieee8021x"]
+from .api import NOT_MODIFIED, CrestronApiClient
+from .breaker import CircuitOpenError
+from .const import (
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_READ_TIMEOUT,
+    MAX_IN_FLIGHT,
+    SUBTREE_DEPTH,
+)
+from .descriptors import DESCRIPTORS, descriptors_by_platform, discover_descriptors
+from .history import TreeHistory
+from .paths import PathTrie, diff_flat, get_nested_value, set_nested_value
+from .planner import (
+    SUBTREE_UNSUPPORTED_STATUSES,
+    SubtreeNotSupportedError,
+    endpoint_url,
+    plan_endpoints,
+)
+from .polling import AdaptivePollInterval
+from .push import PushChannel
+from .scheduler import FleetScheduler
+from .timing import PhaseTimings
+from .writer import WriteCoalescer
 
-
-def filter_response_data(data, excluded_keys):
-    """Filter out specified keys from the response data."""
-    if isinstance(data, dict):
-        return {
-            k: filter_response_data(v, excluded_keys)
-            for k, v in data.items()
-            if k not in excluded_keys
-        }
-    if isinstance(data, list):
-        return [filter_response_data(item, excluded_keys) for item in data]
-    return data
+_LOGGER = logging.getLogger(__name__)
 
 
 class CrestronDataUpdateCoordinator(DataUpdateCoordinator):
     """Class to manage fetching Crestron data."""
 
-    def __init__(self, hass, host, name):
+    def __init__(
+        self,
+        hass,
+        host,
+        name,
+        scheduler=None,
+        store=None,
+        connect_timeout=DEFAULT_CONNECT_TIMEOUT,
+        read_timeout=DEFAULT_READ_TIMEOUT,
+        max_in_flight=MAX_IN_FLIGHT,
+    ):
         """Initialize the coordinator."""
         self.host = host
+        self.store = store
+        self.timings = PhaseTimings()
+        self.client = CrestronApiClient(
+            host,
+            limit_per_host=max_in_flight,
+            timings=self.timings,
+            connect_timeout=connect_timeout,
+            read_timeout=read_timeout,
+        )
+        self.push = PushChannel(
+            hass,
+            host,
+            self.async_apply_pushed_changes,
+            self._async_push_state_changed,
+            connect_timeout=connect_timeout,
+        )
+        self.scheduler = scheduler or FleetScheduler()
+        self.scheduler.register(self)
+        self.poll_interval = AdaptivePollInterval(host)
+        self._next_poll_due = None
         super().__init__(
-            hass, _LOGGER, name=name, update_interval=timedelta(seconds=30)
+            hass,
+            _LOGGER,
+            name=name,
+            update_interval=timedelta(seconds=self.poll_interval.seconds),
         )
         self.data = {}
+        self.writer = WriteCoalescer(
+            hass, self.client, self.async_apply_write_results
+        )
+        self.panel = None
+        self.restored = False
+        self.restored_at = None
+        self.values = {}
+        self.history = TreeHistory()
+        self.paths = PathTrie()
+        self.schema = PathTrie(
+            (descriptor.value_path, descriptor) for descriptor in DESCRIPTORS
+        )
+        self.discovered = None
+        self.discovered_by_platform = {}
+        self._endpoints = None
+        self.subtrees_supported = True
+        self._subtrees = {}
+        self._changed_paths = None
+        self._listener_index = None
+        self._notified_success = None
+        self.stats = {
+            "changed_paths": 0,
+            "notified_entities": 0,
+            "poll_interval": self.poll_interval.seconds,
+            "poll_reason": self.poll_interval.reason,
+            "poll_lag": 0.0,
+            "pushed_changes": 0,
+            "setup_ms": None,
+        }
+
+    def register_path(self, value_path):
+        """Register a value path that must be covered by every poll.
+
+        Registered paths are read once per refresh into ``values``, which
+        entities look up instead of walking the tree themselves.
+        """
+        value_path = tuple(value_path)
+        if value_path not in self.paths:
+            self.paths[value_path] = None
+            self.values[value_path] = get_nested_value(self.data, value_path)
+            self._endpoints = None
+
+    @property
+    def endpoints(self):
+        """Return the subtree prefixes polled on every refresh."""
+        if self._endpoints is None:
+            self._endpoints = plan_endpoints(self.paths)
+        return self._endpoints
+
+    async def async_discover_schema(self):
+        """Classify the leaves of the full device tree into ``schema``.
+
+        Panels polled by subtree are asked for the full tree once, in a
+        fleet slot like a poll; the result is stored with the snapshot so
+        later starts skip this.
+        """
+        if self.subtrees_supported or not self.data:
+            async with self.scheduler.async_slot(self.host, self.hass.loop.time()):
+                tree = await self.client.async_get_json("/Device")
+        else:
+            tree = self.data
+        self._set_discovered(discover_descriptors(tree, self.schema))
+        self._schedule_snapshot_save()
+
+    def _set_discovered(self, descriptors):
+        """Add discovered descriptors to the schema."""
+        self.discovered = tuple(
+            descriptor
+            for descriptor in descriptors
+            if descriptor.value_path not in self.schema
+        )
+        for descriptor in self.discovered:
+            self.schema[descriptor.value_path] = descriptor
+        self.discovered_by_platform = descriptors_by_platform(self.discovered)
+
+    async def async_restore_snapshot(self):
+        """Start from the stored snapshot, if there is one.
+
+        Returns whether a snapshot was restored. Entities report their
+        values as restored until the first live poll succeeds.
+        """
+        if self.store is None:
+            return False
+        snapshot = await self.store.async_load()
+        if snapshot is None:
+            return False
+        self.data = snapshot.data
+        self.restored_at = snapshot.saved_at
+        self.restored = True
+        if snapshot.schema is not None:
+            self._set_discovered(snapshot.schema)
+        self._refresh_values()
+        return True
+
+    async def async_shutdown(self):
+        """Send pending writes and close the panel's connections."""
+        await super().async_shutdown()
+        self.scheduler.unregister(self)
+        await self.push.async_stop()
+        await self.writer.async_flush()
+        await self.client.async_close()
+
+    async def _async_fetch_device_tree(self):
+        """Fetch the planned subtrees, falling back to the full tree.
+
+        Returns ``NOT_MODIFIED`` when the panel answered every request with
+        the same body as last time.
+        """
+        if self.subtrees_supported:
+            try:
+                return await self._async_fetch_subtrees()
+            except aiohttp.ClientResponseError as err:
+                if err.status not in SUBTREE_UNSUPPORTED_STATUSES:
+                    raise
+                self._disable_subtrees(err.status)
+            except SubtreeNotSupportedError as err:
+                self._disable_subtrees(err)
+        return await self.client.async_get_json("/Device", conditional=True)
+
+    def _disable_subtrees(self, reason):
+        """Fall back to polling the full device tree."""
+        _LOGGER.info(
+            "%s does not support subtree requests (%s), polling the full tree",
+            self.host,
+            reason,
+        )
+        self.subtrees_supported = False
+
+    async def _async_fetch_subtrees(self):
+        """Fetch all planned subtrees concurrently and merge them."""
+        endpoints = self.endpoints
+        responses = await asyncio.gather(
+            *(
+                self.client.async_get_json(endpoint_url(prefix), conditional=True)
+                for prefix in endpoints
+            )
+        )
+        if all(response is NOT_MODIFIED for response in responses):
+            return NOT_MODIFIED
+        merged = {}
+        for prefix, response_data in zip(endpoints, responses, strict=True):
+            if response_data is NOT_MODIFIED:
+                subtree = self._subtrees.get(prefix)
+                if subtree is None:
+                    # The cache was dropped while this poll was in flight
+                    response_data = await self.client.async_get_json(
+                        endpoint_url(prefix)
+                    )
+            if response_data is not NOT_MODIFIED:
+                subtree = get_nested_value(response_data, prefix)
+                if subtree is None:
+                    raise SubtreeNotSupportedError(
+                        f"{endpoint_url(prefix)} did not return its subtree"
+                    )
+                self._subtrees[prefix] = subtree
+            set_nested_value(merged, prefix, subtree)
+        return merged
+
+    def _invalidate_cache(self):
+        """Make the next poll decode every response again.
+
+        Needed whenever ``data`` is patched outside of a poll, since an
+        unchanged body would otherwise bring back the patched subtree.
+        """
+        self._subtrees.clear()
+        self.client.invalidate()
 
     async def _async_update_data(self):
         """Fetch data from the API."""
-        api_url = f"http://{self.host}/Device"
+        with self.timings.measure("poll_total"):
+            return await self._async_poll()
+
+    async def _async_poll(self):
+        """Poll the panel and update the snapshot."""
+        due = self._next_poll_due or self.hass.loop.time()
+        queued = time.perf_counter()
         try:
-            async with (
-                aiohttp.ClientSession() as session,
-                session.get(api_url) as response,
-            ):
-                response.raise_for_status()
-                response_text = await response.text()
-                _LOGGER.debug("Received device response: %s", response_text)
-                response_data = json.loads(response_text, strict=False)
-                filtered_data = filter_response_data(response_data, EXCLUDED_KEYS)
-                _LOGGER.debug("Filtered response: %s", filtered_data)
-                self.data = filtered_data
-                self.data["model"] = get_nested_value(
-                    response_data, ["Device", "DeviceInfo", "Model"], "Default Model"
-                )
-                self.data["SerialNumber"] = get_nested_value(
-                    response_data,
-                    ["Device", "DeviceInfo", "SerialNumber"],
-                    "Default Serial Number",
-                )
-                self.data["MacAddress"] = get_nested_value(
-                    response_data,
-                    ["Device", "DeviceInfo", "MacAddress"],
-                    "Default MAC Address",
-                )
-                return self.data
-        except aiohttp.ClientError:
+            # Do not take a fleet slot for a panel known to be unreachable
+            self.client.breaker.raise_if_open()
+            async with self.scheduler.async_slot(self.host, due) as lag:
+                self.timings.record("poll_queue", time.perf_counter() - queued)
+                self.stats["poll_lag"] = lag
+                response_data = await self._async_fetch_device_tree()
+        except CircuitOpenError as err:
+            self.poll_interval.update(success=False, changed=False)
+            self._apply_poll_interval()
+            _LOGGER.debug("Not polling %s: %s", self.host, err)
+            raise
+        except (aiohttp.ClientError, TimeoutError):
+            self.poll_interval.update(success=False, changed=False)
+            self._apply_poll_interval()
             _LOGGER.exception("Failed to fetch data from %s", self.host)
             raise
+        if response_data is NOT_MODIFIED:
+            # Keep the existing snapshot object; nothing to parse or diff
+            self._changed_paths = set()
+            self.poll_interval.update(success=True, changed=False)
+            self._apply_poll_interval()
+            self._mark_live()
+            return self.data
+        self._set_data(response_data)
+        self._changed_paths = self._refresh_values()
+        self._record_history()
+        self.poll_interval.update(success=True, changed=bool(self._changed_paths))
+        self._apply_poll_interval()
+        self._mark_live()
+        self._schedule_snapshot_save()
+        return self.data
+
+    def _set_data(self, response_data):
+        """Replace the snapshot with a decoded device tree."""
+        self.data = response_data
+        self.data["model"] = get_nested_value(
+            response_data, ["Device", "DeviceInfo", "Model"], "Default Model"
+        )
+        self.data["SerialNumber"] = get_nested_value(
+            response_data,
+            ["Device", "DeviceInfo", "SerialNumber"],
+            "Default Serial Number",
+        )
+        self.data["MacAddress"] = get_nested_value(
+            response_data,
+            ["Device", "DeviceInfo", "MacAddress"],
+            "Default MAC Address",
+        )
+
+    def _record_history(self):
+        """Add the polled device tree to the history."""
+        with self.timings.measure("history"):
+            self.history.record(self.data.get("Device", {}), ("Device",))
+
+    def seed_from_probe(self, probe):
+        """Start from the config flow's probe instead of fetching it again.
+
+        Returns whether the probe holds the whole tree. When it only holds
+        ``DeviceInfo`` the other values still need a refresh.
+        """
+        self._set_data(probe.data)
+        self._refresh_values()
+        self._record_history()
+        if not probe.subtrees_supported:
+            self.subtrees_supported = False
+            return True
+        return False
+
+    def _mark_live(self):
+        """Stop reporting restored values once a live poll succeeded."""
+        if self.restored:
+            self.restored = False
+            # Every entity drops its restored marker
+            self._changed_paths = None
+
+    def _schedule_snapshot_save(self):
+        """Persist the current tree for the next warm start."""
+        if self.store is not None:
+            self.store.async_schedule_save(self.data, self.discovered)
+
+    def _apply_poll_interval(self):
+        """Use the adaptive interval for the next scheduled poll."""
+        self.update_interval = timedelta(seconds=self.poll_interval.seconds)
+        self._next_poll_due = self.hass.loop.time() + self.poll_interval.seconds
+        self.stats["poll_interval"] = self.poll_interval.seconds
+        self.stats["poll_reason"] = self.poll_interval.reason
+
+    def _refresh_values(self, prefix=()):
+        """Re-read the registered paths and return the ones that changed.
+
+        With a ``prefix`` only the paths below it are read again.
+        """
+        with self.timings.measure("extract"):
+            values = self.paths.extract(self.data, prefix)
+            if prefix:
+                changed_paths = {
+                    path
+                    for path, value in values.items()
+                    if self.values.get(path) != value
+                }
+                self.values.update(values)
+            else:
+                changed_paths = diff_flat(self.values, values)
+                self.values = values
+        return changed_paths
 
-    async def async_update_api(self, value: str) -> None:
-        """Update the API with the new EMS URL."""
-        api_url = f"http://{self.host}/Device/ThirdPartyApplications"
-        payload = {"Device": {"ThirdPartyApplications": {"Ems": {"ServerUrl": value}}}}
+    @callback
+    def async_apply_write_results(self, confirmed, failed, ambiguous):
+        """Apply the outcome of a write to the cached tree.
 
+        Confirmed values are patched into ``data`` and pushed to their
+        entities right away. Entities of failed paths are re-rendered from
+        the cache, dropping any optimistic state. Paths the panel did not
+        report on get their subtree refreshed, unless the writes were
+        flushed while unloading.
+        """
+        with self.timings.measure("write_apply"):
+            self._apply_write_results(confirmed, failed, ambiguous)
+
+    def _apply_write_results(self, confirmed, failed, ambiguous):
+        """Patch ``data`` with write results and notify affected entities."""
+        for path, value in confirmed.items():
+            set_nested_value(self.data, path, value)
+        if confirmed:
+            self._invalidate_cache()
+            self.history.record_values(confirmed)
+            self._schedule_snapshot_save()
+        if not self._shutdown_requested:
+            # Poll again soon to catch side effects of the write
+            self.poll_interval.note_activity()
+            self._apply_poll_interval()
+            self._schedule_refresh()
+        changed_paths = self._refresh_values()
+        changed_paths.update(failed)
+        if changed_paths:
+            self._changed_paths = changed_paths
+            self.async_update_listeners()
+        if self._shutdown_requested:
+            # Writes flushed on unload; the client is about to close
+            return
+        for prefix in {path[:SUBTREE_DEPTH] for path in ambiguous}:
+            self.hass.async_create_task(self.async_refresh_subtree(prefix))
+
+    @callback
+    def async_apply_pushed_changes(self, changes):
+        """Patch values pushed by the panel into ``data`` and notify.
+
+        Only the registered paths at or below a changed path are read
+        again, and only their entities are updated.
+        """
+        for path, value in changes.items():
+            set_nested_value(self.data, path, value)
+        self._invalidate_cache()
+        self.history.record_values(changes)
+        self.stats["pushed_changes"] += len(changes)
+        changed_paths = set()
+        for path in changes:
+            changed_paths |= self._refresh_values(path)
+        self._schedule_snapshot_save()
+        if changed_paths:
+            self._changed_paths = changed_paths
+            self.async_update_listeners()
+
+    @callback
+    def _async_push_state_changed(self, connected):
+        """Slow polling down while pushed changes arrive, and catch up after.
+
+        Changes made while the event stream was down are picked up by a
+        refresh as soon as it is (re)connected or lost.
+        """
+        if self._shutdown_requested:
+            return
+        self.poll_interval.set_push(connected)
+        self._apply_poll_interval()
+        self.hass.async_create_task(self.async_request_refresh())
+
+    async def async_refresh_subtree(self, prefix):
+        """Re-fetch a single subtree and push the paths that changed in it."""
+        if self._shutdown_requested:
+            return
+        if not self.subtrees_supported:
+            await self.async_request_refresh()
+            return
         try:
-            async with (
-                aiohttp.ClientSession() as session,
-                session.post(api_url, json=payload) as response,
-            ):
-                response.raise_for_status()
-                _LOGGER.debug("Updated EMS URL to %s", value)
-        except aiohttp.ClientError:
-            _LOGGER.exception("Failed to update EMS URL to %s", value)
-            raise
+            response_data = await self.client.async_get_json(endpoint_url(prefix))
+        except aiohttp.ClientError as err:
+            _LOGGER.warning(
+                "Failed to refresh %s on %s: %s", endpoint_url(prefix), self.host, err
+            )
+            return
+        subtree = get_nested_value(response_data, prefix)
+        if subtree is None:
+            return
+        set_nested_value(self.data, prefix, subtree)
+        self._invalidate_cache()
+        self.history.record(subtree, prefix)
+        changed_paths = self._refresh_values(prefix)
+        if changed_paths:
+            self._changed_paths = changed_paths
+            self.async_update_listeners()
+
+    @callback
+    def async_add_listener(self, update_callback, context=None):
+        """Listen for data updates, keyed by the entity's value path."""
+        remove = super().async_add_listener(update_callback, context)
+        self._listener_index = None
+
+        @callback
+        def remove_listener():
+            remove()
+            self._listener_index = None
+
+        return remove_listener
+
+    def _build_listener_index(self):
+        """Index listeners by their value path."""
+        self._listener_index = {}
+        for update_callback, context in self._listeners.values():
+            self._listener_index.setdefault(context, []).append(update_callback)
+
+    @callback
+    def async_update_listeners(self):
+        """Update only the listeners whose value changed.
+
+        All listeners are updated when availability flipped or when the
+        data was replaced without a diff (e.g. ``async_set_updated_data``).
+        """
+        with self.timings.measure("dispatch"):
+            self._notify_listeners()
+
+    def _notify_listeners(self):
+        """Call the listeners affected by the last update."""
+        changed_paths = self._changed_paths
+        self._changed_paths = None
+        if changed_paths is None or self._notified_success != self.last_update_success:
+            self._notified_success = self.last_update_success
+            self.stats["changed_paths"] = (
+                len(changed_paths) if changed_paths is not None else 0
+            )
+            self.stats["notified_entities"] = len(self._listeners)
+            super().async_update_listeners()
+            return
 
+        if self._listener_index is None:
+            self._build_listener_index()
+        to_notify = {}
+        # Listeners without a value path always get every update
+        for path in (*changed_paths, None):
+            for update_callback in self._listener_index.get(path, ()):
+                to_notify[update_callback] = None
 
-def get_nested_value(data, keys, default=None):
-    """Retrieve a nested value from a dictionary."""
-    for key in keys:
-        data = data.get(key, default)
-        if data is default:
-            break
-    return data
+        self.stats["changed_paths"] = len(changed_paths)
+        self.stats["notified_entities"] = len(to_notify)
+        for update_callback in to_notify:
+            update_callback()
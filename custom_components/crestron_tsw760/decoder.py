@@ -0,0 +1,346 @@
+"""JSON decoding of device responses, dropping excluded members."""
+
+import json
+import re
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - Home Assistant ships orjson
+    orjson = None
+
+# Bytes that may end a skipped scalar value
+_VALUE_TOKEN = re.compile(rb'["{}\[\],]')
+_NON_WHITESPACE = re.compile(rb"\S")
+_WHITESPACE = frozenset(b" \t\r\n")
+
+_COLON = ord(":")
+_COMMA = ord(",")
+_QUOTE = ord('"')
+_BACKSLASH = ord("\\")
+_OPEN = frozenset(b"{[")
+# Bytes that may come right before a quote opening a string
+_BEFORE_STRING = frozenset(b"{[,: \t\r\n")
+
+_CONTROL = bytes(range(0x20))
+
+
+def _string_end(data, pos):
+    """Return the index after the quote closing a string, or -1.
+
+    ``pos`` is inside the string and not in the middle of an escape.
+    Searching with ``bytes.find`` keeps long strings out of the regex
+    engine.
+    """
+    start = pos
+    while True:
+        quote = data.find(b'"', pos)
+        if quote < 0:
+            return -1
+        escape = quote
+        while escape > start and data[escape - 1] == _BACKSLASH:
+            escape -= 1
+        if not (quote - escape) % 2:
+            return quote + 1
+        pos = quote + 1
+
+
+def _string_start(data, pos, index):
+    """Return the index of the quote opening the string around ``index``.
+
+    Returns -1 when ``index`` is not inside a string. ``pos`` is outside
+    strings and there is no backslash between it and ``index``, so every
+    quote in between is unescaped. A quote after anything but
+    whitespace or ``{[,:`` closes a string; only otherwise are the quotes
+    counted.
+    """
+    quote = data.rfind(b'"', pos, index)
+    if quote < 0:
+        return -1
+    if quote > pos and data[quote - 1] not in _BEFORE_STRING:
+        return -1
+    return quote if data.count(b'"', pos, index) % 2 else -1
+
+
+def stdlib_loads(data):
+    """Decode with the standard library, tolerating control characters."""
+    return json.loads(data, strict=False)
+
+
+def has_control_characters(data):
+    """Return whether ``data`` holds any raw control character.
+
+    Deleting them with ``bytes.translate`` and comparing lengths is an
+    order of magnitude faster than a regex search over a large body.
+    """
+    return len(data.translate(None, _CONTROL)) != len(data)
+
+
+def orjson_loads(data):
+    """Decode with orjson, accepting whatever ``stdlib_loads`` accepts.
+
+    orjson rejects raw control characters in strings, so bodies holding
+    any are checked for up front and decoded by the standard library.
+    """
+    if isinstance(data, str):
+        data = data.encode()
+    if has_control_characters(data):
+        return stdlib_loads(data)
+    try:
+        return orjson.loads(data)
+    except orjson.JSONDecodeError:
+        # e.g. NaN or integers beyond 64 bits; decode like the stdlib does
+        return stdlib_loads(data)
+
+
+# Available decode backends. The default picks one per body: orjson
+# decodes the pruned panel bodies about three times faster than the
+# standard library, which takes the bodies holding control characters.
+BACKENDS = {"json": stdlib_loads}
+DEFAULT_LOADS = stdlib_loads
+if orjson is not None:
+    BACKENDS["orjson"] = orjson_loads
+    DEFAULT_LOADS = orjson_loads
+
+
+class PruningJsonDecoder:
+    """Decode a JSON document fed in chunks, dropping excluded members.
+
+    Members whose key is in ``excluded_keys`` are skipped as the body
+    streams in, so no Python objects are built for them, and only the rest
+    of the document is handed to ``loads``. The kept bytes are searched
+    for the excluded keys with ``bytes.find``, and a skipped container is
+    crossed from bracket to bracket, so neither takes a Python step per
+    string. ``bytes_skipped`` counts the bytes dropped.
+    """
+
+    def __init__(self, excluded_keys, loads=None):
+        """Initialize the decoder."""
+        self._excluded = [json.dumps(key).encode() for key in excluded_keys]
+        # Bytes of an excluded key that may end a chunk
+        self._key_tail = max((len(key) for key in self._excluded), default=1) - 1
+        self._loads = loads or DEFAULT_LOADS
+        self._pending = b""
+        self._output = bytearray()
+        self._skip_depth = None
+        self._skip_in_string = False
+        self._drop_comma = False
+        self.bytes_received = 0
+        self.bytes_skipped = 0
+
+    def feed(self, chunk):
+        """Consume the next chunk of the document."""
+        self.bytes_received += len(chunk)
+        data = self._pending + chunk if self._pending else chunk
+        size = len(data)
+        pos = 0
+        while pos < size:
+            if self._skip_depth is None:
+                pos = self._keep(data, pos, size)
+            else:
+                start = pos
+                pos = self._skip(data, pos, size)
+                self.bytes_skipped += (pos if pos >= 0 else size + pos) - start
+            if pos < 0:
+                break
+        self._pending = data[pos:] if pos < 0 else b""
+
+    def close(self):
+        """Finish decoding and return the pruned document."""
+        if self._pending:
+            # The held back end of the document, or a truncated one; the
+            # backend reports the latter.
+            self._emit(self._pending)
+            self._pending = b""
+        return self._loads(self._output)
+
+    def _keep(self, data, pos, size):
+        """Copy bytes to the output up to the next excluded member.
+
+        Returns the position to continue from, or a negative offset from
+        the end of ``data`` when more input is needed.
+        """
+        while True:
+            start = -1
+            for key in self._excluded:
+                found = data.find(key, pos)
+                if found >= 0 and (start < 0 or found < start):
+                    start, end = found, found + len(key)
+            if start < 0:
+                # Hold back the start of a key cut off by the chunk
+                quote = data.find(b'"', max(pos, size - self._key_tail), size)
+                if quote < 0:
+                    self._emit(data[pos:])
+                    return size
+                self._emit(data[pos:quote])
+                return quote - size
+            if self._escaped(data, pos, start):
+                self._emit(data[pos : start + 1])
+                pos = start + 1
+                continue
+            colon = _NON_WHITESPACE.search(data, end)
+            if colon is None:
+                self._emit(data[pos:start])
+                return start - size
+            if data[colon.start()] != _COLON:
+                self._emit(data[pos:end])
+                pos = end
+                continue
+            self._emit(data[pos:start])
+            self._begin_skip()
+            self.bytes_skipped += colon.end() - start
+            return colon.end()
+
+    def _escaped(self, data, pos, quote):
+        """Return whether the quote at index ``quote`` is escaped.
+
+        Inside a string every quote is escaped, and in a valid document
+        an unescaped quote followed by a key cannot close a string, so
+        an unescaped match is a key or a value of its own.
+        """
+        escape = quote
+        while escape > pos and data[escape - 1] == _BACKSLASH:
+            escape -= 1
+        count = quote - escape
+        if escape == pos:
+            # The backslashes may go on in the bytes already kept
+            output = self._output
+            end = len(output)
+            while end and output[end - 1] == _BACKSLASH:
+                end -= 1
+            count += len(output) - end
+        return count % 2 == 1
+
+    def _skip(self, data, pos, size):
+        """Discard bytes up to the end of the excluded member's value."""
+        if self._skip_in_string:
+            # Large skipped strings (certificates) are dropped chunk by chunk
+            # instead of being carried over and rescanned.
+            end = _string_end(data, pos)
+            if end < 0:
+                return self._skip_unfinished_string(data, size, pos)
+            self._skip_in_string = False
+            pos = end
+        elif self._skip_depth == 0:
+            match = _NON_WHITESPACE.search(data, pos)
+            if match is None:
+                return size
+            pos = match.start()
+            first = data[pos]
+            if first == _QUOTE:
+                self._skip_in_string = True
+                return self._skip(data, pos + 1, size)
+            if first not in _OPEN:
+                # A scalar ends at the comma or bracket after it
+                match = _VALUE_TOKEN.search(data, pos)
+                if match is None:
+                    return size
+                self._skip_depth = None
+                return match.start()
+            self._skip_depth = 1
+            pos += 1
+        if self._skip_depth:
+            return self._skip_container(data, pos, size)
+        self._skip_depth = None
+        return pos
+
+    def _skip_container(self, data, pos, size):
+        """Discard a container up to its closing bracket.
+
+        Brackets are found with single byte searches, which
+        ``bytes.find`` does with ``memchr``, and a bracket inside a string
+        is passed by crossing that string. A string holding a backslash
+        is crossed before looking at the brackets after it.
+        """
+        find = data.find
+        depth = self._skip_depth
+        # Next index of each bracket and backslash, ``size`` for none
+        bound = size + 1
+        open_brace = find(b"{", pos) % bound
+        close_brace = find(b"}", pos) % bound
+        open_bracket = find(b"[", pos) % bound
+        close_bracket = find(b"]", pos) % bound
+        backslash = find(b"\\", pos) % bound
+        while True:
+            bracket = min(open_brace, close_brace, open_bracket, close_bracket)
+            if backslash < bracket:
+                # Outside strings there are no backslashes
+                opening = _string_start(data, pos, backslash)
+            else:
+                opening = _string_start(data, pos, bracket)
+            if opening >= 0:
+                end = _string_end(data, opening + 1)
+                if end < 0:
+                    self._skip_depth = depth
+                    self._skip_in_string = True
+                    return self._skip_unfinished_string(data, size, opening + 1)
+                pos = end
+            elif bracket == size:
+                self._skip_depth = depth
+                return size
+            elif data[bracket] in _OPEN:
+                pos = bracket + 1
+                if open_brace < pos:
+                    open_brace = find(b"{", pos) % bound
+                if open_bracket < pos:
+                    open_bracket = find(b"[", pos) % bound
+                close = min(close_brace, close_bracket)
+                if (
+                    close < open_brace
+                    and close < open_bracket
+                    and close < backslash
+                    and _string_start(data, pos, close) < 0
+                ):
+                    # Nothing nested, e.g. a certificate: cross it whole
+                    pos = close + 1
+                else:
+                    depth += 1
+            else:
+                depth -= 1
+                pos = bracket + 1
+                if not depth:
+                    self._skip_depth = None
+                    return pos
+            if open_brace < pos:
+                open_brace = find(b"{", pos) % bound
+            if close_brace < pos:
+                close_brace = find(b"}", pos) % bound
+            if open_bracket < pos:
+                open_bracket = find(b"[", pos) % bound
+            if close_bracket < pos:
+                close_bracket = find(b"]", pos) % bound
+            if backslash < pos:
+                backslash = find(b"\\", pos) % bound
+
+    def _skip_unfinished_string(self, data, size, content_start):
+        """Drop the rest of the chunk inside a skipped string.
+
+        A trailing unpaired backslash is kept back, since it escapes the
+        first byte of the next chunk.
+        """
+        escape = size
+        while escape > content_start and data[escape - 1] == _BACKSLASH:
+            escape -= 1
+        return -1 if (size - escape) % 2 else size
+
+    def _begin_skip(self):
+        """Start skipping a member, removing the comma that separated it."""
+        output = self._output
+        end = len(output)
+        while end and output[end - 1] in _WHITESPACE:
+            end -= 1
+        if end and output[end - 1] == _COMMA:
+            del output[end - 1 :]
+        else:
+            self._drop_comma = True
+        self._skip_depth = 0
+
+    def _emit(self, data):
+        """Append kept bytes to the output."""
+        if self._drop_comma:
+            stripped = data.lstrip()
+            if not stripped:
+                return
+            if stripped[:1] == b",":
+                data = stripped[1:]
+            self._drop_comma = False
+        self._output += data
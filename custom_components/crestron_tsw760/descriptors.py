@@ -0,0 +1,160 @@
+"""Immutable descriptions shared by the entities of every panel."""
+
+from dataclasses import asdict, dataclass
+
+from homeassistant.const import CONF_NAME
+from homeassistant.helpers.device_registry import DeviceInfo
+
+from .const import (
+    DOMAIN,
+    ENTITIES_TO_EXPOSE,
+    EXCLUDED_KEYS,
+    NUMBER_RANGES,
+    READ_ONLY_KEY_PREFIX,
+    READ_ONLY_PREFIXES,
+)
+
+
+def slugify_name(name):
+    """Return the lowercase, underscored form used in unique IDs."""
+    return name.replace(" ", "_").lower()
+
+
+@dataclass(frozen=True, slots=True)
+class PathDescriptor:
+    """One exposed value path and how its entity behaves."""
+
+    type: str
+    name: str
+    key: str
+    value_path: tuple
+    native_min_value: float | None = None
+    native_max_value: float | None = None
+    discovered: bool = False
+
+
+DESCRIPTORS = tuple(
+    PathDescriptor(
+        type=entity["type"],
+        name=entity["name"],
+        key=slugify_name(entity["name"]),
+        value_path=tuple(entity["value_path"]),
+        native_min_value=entity.get("native_min_value"),
+        native_max_value=entity.get("native_max_value"),
+    )
+    for entity in ENTITIES_TO_EXPOSE
+)
+
+
+def descriptors_by_platform(descriptors):
+    """Group descriptors into ``{platform: (descriptor, ...)}``."""
+    grouped = {}
+    for descriptor in descriptors:
+        grouped.setdefault(descriptor.type, []).append(descriptor)
+    return {platform: tuple(group) for platform, group in grouped.items()}
+
+
+# Looked up by every platform of every entry instead of filtering DESCRIPTORS
+DESCRIPTORS_BY_PLATFORM = descriptors_by_platform(DESCRIPTORS)
+
+
+def discover_descriptors(tree, known_paths=()):
+    """Classify the leaves of a device tree that are not in ``known_paths``.
+
+    Read-only leaves become sensors, booleans switches, numbers with a
+    known range numbers and strings texts; other numbers are read-only.
+    Lists and the excluded subtrees are not descended into.
+    """
+    descriptors = []
+    _discover(tree.get("Device"), ("Device",), known_paths, descriptors)
+    return tuple(descriptors)
+
+
+def _discover(node, path, known_paths, descriptors):
+    """Add descriptors for the leaves below ``path``."""
+    if not isinstance(node, dict):
+        return
+    for key, value in node.items():
+        value_path = (*path, key)
+        if key in EXCLUDED_KEYS or isinstance(value, list):
+            continue
+        if isinstance(value, dict):
+            _discover(value, value_path, known_paths, descriptors)
+            continue
+        if value_path in known_paths:
+            continue
+        name = " ".join(value_path[1:])
+        descriptors.append(
+            PathDescriptor(
+                type=_classify(value_path, value),
+                name=name,
+                key=slugify_name(name),
+                value_path=value_path,
+                native_min_value=NUMBER_RANGES.get(key, (None, None))[0],
+                native_max_value=NUMBER_RANGES.get(key, (None, None))[1],
+                discovered=True,
+            )
+        )
+
+
+def _classify(value_path, value):
+    """Return the platform exposing a leaf."""
+    if value_path[-1].startswith(READ_ONLY_KEY_PREFIX) or any(
+        value_path[: len(prefix)] == prefix for prefix in READ_ONLY_PREFIXES
+    ):
+        return "sensor"
+    if isinstance(value, bool):
+        return "switch"
+    if isinstance(value, int | float):
+        return "number" if value_path[-1] in NUMBER_RANGES else "sensor"
+    if isinstance(value, str):
+        return "text"
+    return "sensor"
+
+
+def descriptors_to_json(descriptors):
+    """Return the stored form of discovered descriptors."""
+    return [asdict(descriptor) for descriptor in descriptors]
+
+
+def descriptors_from_json(items):
+    """Rebuild stored descriptors, or return None when they do not fit."""
+    try:
+        return tuple(
+            PathDescriptor(**{**item, "value_path": tuple(item["value_path"])})
+            for item in items
+        )
+    except (KeyError, TypeError):
+        return None
+
+
+@dataclass(frozen=True, slots=True)
+class PanelInfo:
+    """Identity of one panel, shared by all of its entities."""
+
+    name: str
+    slug: str
+    device_info: DeviceInfo
+
+
+def build_panel_info(coordinator, config_entry):
+    """Return the panel info for a config entry's coordinator."""
+    name = config_entry.data.get(CONF_NAME, "default_name")
+    serial_number = coordinator.data.get("SerialNumber", "")
+    return PanelInfo(
+        name=name,
+        slug=slugify_name(name),
+        device_info=DeviceInfo(
+            identifiers={(DOMAIN, serial_number)},
+            name=name,
+            manufacturer="Crestron",
+            model=coordinator.data.get("model", ""),
+            serial_number=serial_number,
+            connections={("mac", coordinator.data.get("MacAddress", ""))},
+        ),
+    )
+
+
+def entity_unique_id(panel, descriptor):
+    """Return the unique ID of a panel's entity for a descriptor."""
+    return f"{panel.slug}_{descriptor.key}_{panel.name} {descriptor.name}"
@@ -0,0 +1,77 @@
+"""Diagnostics support for Crestron TSW-760."""
+
+import re
+
+from homeassistant.components.diagnostics import REDACTED, async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_HOST
+from homeassistant.core import HomeAssistant
+
+from .const import DATA_SCHEDULER, DOMAIN
+
+TO_REDACT = {"SerialNumber", "MacAddress"}
+# The same details as stored in the config entry
+ENTRY_TO_REDACT = {CONF_HOST, "serial_number", "mac_address"}
+# The same keys in the (possibly truncated) JSON bodies of traced requests
+_REDACT_BODY = re.compile(
+    r'("(?:' + "|".join(sorted(TO_REDACT)) + r')"\s*:\s*)"[^"]*(?:"|$)'
+)
+
+
+def redact_trace(trace):
+    """Redact ``TO_REDACT`` values in the bodies of traced exchanges."""
+    for exchange in trace["exchanges"]:
+        for key in ("request_body", "response_body"):
+            if exchange[key]:
+                exchange[key] = _REDACT_BODY.sub(rf'\1"{REDACTED}"', exchange[key])
+    return trace
+
+
+def redact_history(segments):
+    """Redact ``TO_REDACT`` leaves in an exported history."""
+    for segment in segments:
+        for values in (
+            segment["keyframe"],
+            *(delta["set"] for delta in segment["deltas"]),
+        ):
+            for path in values:
+                if path.rpartition(".")[2] in TO_REDACT:
+                    values[path] = REDACTED
+    return segments
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, config_entry: ConfigEntry
+) -> dict:
+    """Return diagnostics for a config entry."""
+    coordinator = hass.data[DOMAIN][config_entry.entry_id]
+    return {
+        "entry": async_redact_data(config_entry.data, ENTRY_TO_REDACT),
+        "coordinator": {
+            "last_update_success": coordinator.last_update_success,
+            "restored": coordinator.restored,
+            "restored_at": coordinator.restored_at,
+            "poll_interval": coordinator.poll_interval.seconds,
+            "poll_reason": coordinator.poll_interval.reason,
+            "subtrees_supported": coordinator.subtrees_supported,
+            "endpoints": [list(prefix) for prefix in coordinator.endpoints],
+            "polled_paths": len(coordinator.paths),
+            "discovered_leaves": (
+                None if coordinator.discovered is None else len(coordinator.discovered)
+            ),
+            "stats": dict(coordinator.stats),
+        },
+        "client": dict(coordinator.client.stats),
+        "breaker": coordinator.client.breaker.summary(),
+        "queue": coordinator.client.queue.summary(),
+        "push": coordinator.push.summary(),
+        "writer": dict(coordinator.writer.stats),
+        "scheduler": dict(hass.data[DOMAIN][DATA_SCHEDULER].stats),
+        "timings": coordinator.timings.summary(),
+        "trace": redact_trace(coordinator.client.trace.summary()),
+        "history": {
+            **coordinator.history.summary(),
+            "export": redact_history(coordinator.history.export()),
+        },
+        "data": async_redact_data(coordinator.data, TO_REDACT),
+    }
@@ -0,0 +1,101 @@
+"""Find TSW-760 panels by scanning an address range."""
+
+import asyncio
+import ipaddress
+import logging
+
+import aiohttp
+
+from .const import (
+    PANEL_HTTP_PORT,
+    SCAN_CONCURRENCY,
+    SCAN_CONNECT_TIMEOUT,
+    SCAN_MAX_ADDRESSES,
+    SCAN_PROBE_TIMEOUT,
+)
+from .probe import NotAPanelError, async_probe_panel
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def hosts_in_network(network):
+    """Return the host addresses of a CIDR range such as ``10.0.4.0/22``.
+
+    Raises ``ValueError`` for an invalid range or one larger than
+    ``SCAN_MAX_ADDRESSES``.
+    """
+    network = ipaddress.ip_network(network.strip(), strict=False)
+    if network.num_addresses > SCAN_MAX_ADDRESSES:
+        raise ValueError(f"{network} has more than {SCAN_MAX_ADDRESSES} addresses")
+    return [str(address) for address in network.hosts()]
+
+
+async def _async_port_open(host, timeout=SCAN_CONNECT_TIMEOUT):
+    """Return whether ``host`` accepts connections on the panel's port."""
+    try:
+        async with asyncio.timeout(timeout):
+            _, writer = await asyncio.open_connection(host, PANEL_HTTP_PORT)
+    except (OSError, TimeoutError):
+        return False
+    writer.close()
+    try:
+        await writer.wait_closed()
+    except OSError:
+        pass
+    return True
+
+
+async def _async_scan_host(host):
+    """Return the probe of ``host``, or None when it is not a panel."""
+    if not await _async_port_open(host):
+        return None
+    try:
+        return await async_probe_panel(host, timeout=SCAN_PROBE_TIMEOUT)
+    except (aiohttp.ClientError, TimeoutError, NotAPanelError) as err:
+        _LOGGER.debug("%s is not a TSW-760: %s", host, err)
+        return None
+
+
+async def async_scan_hosts(hosts, known=(), concurrency=SCAN_CONCURRENCY):
+    """Probe ``hosts`` and yield every panel found as soon as it answers.
+
+    At most ``concurrency`` hosts are probed at once, each first with a
+    short TCP connect so unused addresses are skipped quickly. Panels
+    whose serial number or MAC address is in ``known``, or was already
+    yielded, are skipped.
+    """
+    pending = iter(hosts)
+    found = asyncio.Queue()
+    seen = set(known)
+
+    async def worker():
+        try:
+            for host in pending:
+                try:
+                    probe = await _async_scan_host(host)
+                except Exception:  # noqa: BLE001 - one host must not end the scan
+                    _LOGGER.exception("Unexpected error while probing %s", host)
+                    continue
+                if probe is not None:
+                    found.put_nowait(probe)
+        finally:
+            # Tell the consumer this worker is done
+            found.put_nowait(None)
+
+    workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+    remaining = len(workers)
+    try:
+        while remaining:
+            probe = await found.get()
+            if probe is None:
+                remaining -= 1
+                continue
+            identifiers = {probe.serial_number, probe.mac_address} - {""}
+            if identifiers & seen:
+                continue
+            seen |= identifiers
+            yield probe
+    finally:
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
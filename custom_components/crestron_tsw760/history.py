@@ -0,0 +1,219 @@
+"""Compact history of how a panel's device tree changed."""
+
+from collections import deque
+import sys
+import time
+
+from .const import HISTORY_BUDGET, HISTORY_KEYFRAME_INTERVAL, HISTORY_WINDOW
+from .paths import flatten_tree
+
+# Stands for a leaf that disappeared from the tree
+REMOVED = object()
+# Rough cost of one path in a keyframe or delta, besides its value
+_ENTRY_BYTES = 100
+
+
+def _leaves(tree, prefix):
+    """Return ``{path: value}`` for the leaves of ``tree`` at ``prefix``."""
+    if isinstance(tree, dict):
+        return dict(flatten_tree(tree, prefix))
+    return {prefix: tree}
+
+
+def _cost(values):
+    """Estimate the memory held by a keyframe or delta."""
+    return sum(_ENTRY_BYTES + sys.getsizeof(value) for value in values.values())
+
+
+class _Segment:
+    """A keyframe and the deltas recorded after it."""
+
+    __slots__ = ("at", "keyframe", "deltas", "size", "delta_size")
+
+    def __init__(self, at, keyframe):
+        """Start a segment from a full copy of the leaves."""
+        self.at = at
+        self.keyframe = keyframe
+        self.deltas = []
+        self.size = _cost(keyframe)
+        self.delta_size = 0
+
+
+class TreeHistory:
+    """Record the leaves of a device tree as keyframes and deltas.
+
+    Every recorded tree is compared with the previous one and only the
+    leaves that changed are kept. A full keyframe is taken every
+    ``keyframe_interval`` seconds, or sooner once the deltas since the
+    last one outweigh it, so any point in time is rebuilt from a keyframe
+    and the deltas after it. Whole segments older than ``window`` seconds
+    are dropped, and the oldest ones go early when the history exceeds
+    ``budget`` bytes.
+    """
+
+    def __init__(
+        self,
+        window=HISTORY_WINDOW,
+        budget=HISTORY_BUDGET,
+        keyframe_interval=HISTORY_KEYFRAME_INTERVAL,
+    ):
+        """Initialize the history."""
+        self._window = window
+        self._budget = budget
+        self._keyframe_interval = keyframe_interval
+        self._segments = deque()
+        self._current = {}
+        # One tuple per path, shared by every keyframe and delta
+        self._paths = {}
+        self.size = 0
+
+    def record(self, tree, prefix=(), at=None):
+        """Record the subtree at ``prefix``; leaves missing from it are removed."""
+        leaves = _leaves(tree, prefix)
+        delta = {
+            path: value
+            for path, value in leaves.items()
+            if self._current.get(path, REMOVED) != value
+        }
+        depth = len(prefix)
+        for path in self._current:
+            if path[:depth] == prefix and path not in leaves:
+                delta[path] = REMOVED
+        self._append(delta, at)
+
+    def record_values(self, values, at=None):
+        """Record single changed values, e.g. pushed by the panel."""
+        delta = {}
+        for path, value in values.items():
+            for leaf, leaf_value in _leaves(value, tuple(path)).items():
+                if self._current.get(leaf, REMOVED) != leaf_value:
+                    delta[leaf] = leaf_value
+        self._append(delta, at)
+
+    def _append(self, delta, at):
+        """Store a delta and apply it, starting a new segment when due."""
+        if not delta:
+            return
+        at = time.time() if at is None else at
+        delta = {self._paths.setdefault(path, path): v for path, v in delta.items()}
+        segment = self._segments[-1] if self._segments else None
+        if segment is None:
+            # The first tree is the initial state rather than a change
+            self._apply(delta)
+            self._add_segment(at)
+            return
+        cost = _cost(delta)
+        if (
+            at - segment.at >= self._keyframe_interval
+            or segment.delta_size + cost > segment.size
+            or self.size + cost > self._budget
+        ):
+            segment = self._add_segment(at)
+        segment.deltas.append((at, delta))
+        segment.delta_size += cost
+        self.size += cost
+        self._apply(delta)
+        self._prune(at)
+
+    def _apply(self, delta):
+        """Update the current leaves with a delta."""
+        for path, value in delta.items():
+            if value is REMOVED:
+                self._current.pop(path, None)
+            else:
+                self._current[path] = value
+
+    def _add_segment(self, at):
+        """Start a new segment with a keyframe of the current leaves."""
+        segment = _Segment(at, dict(self._current))
+        self._segments.append(segment)
+        self.size += segment.size
+        return segment
+
+    def _prune(self, now):
+        """Drop the oldest segments outside the window or over the budget."""
+        cutoff = now - self._window
+        while len(self._segments) > 1 and (
+            self._segments[1].at <= cutoff or self.size > self._budget
+        ):
+            segment = self._segments.popleft()
+            self.size -= segment.size + segment.delta_size
+
+    def state_at(self, at, prefix=()):
+        """Return the ``{path: value}`` leaves below ``prefix`` at time ``at``.
+
+        Returns None when ``at`` is before the oldest keyframe.
+        """
+        segment = None
+        for candidate in self._segments:
+            if candidate.at > at:
+                break
+            segment = candidate
+        if segment is None:
+            return None
+        leaves = dict(segment.keyframe)
+        for delta_at, delta in segment.deltas:
+            if delta_at > at:
+                break
+            for path, value in delta.items():
+                if value is REMOVED:
+                    leaves.pop(path, None)
+                else:
+                    leaves[path] = value
+        depth = len(prefix)
+        return {
+            path: value for path, value in leaves.items() if path[:depth] == prefix
+        }
+
+    def changes(self, prefix=(), since=None):
+        """Yield ``(at, path, value)`` for every change below ``prefix``.
+
+        Changes are yielded oldest first; ``value`` is ``REMOVED`` for a
+        leaf that disappeared. Keyframes are not changes and are skipped.
+        """
+        depth = len(prefix)
+        for segment in self._segments:
+            for at, delta in segment.deltas:
+                if since is not None and at < since:
+                    continue
+                for path, value in delta.items():
+                    if path[:depth] == prefix:
+                        yield at, path, value
+
+    def summary(self):
+        """Return the size of the history, e.g. for diagnostics."""
+        return {
+            "segments": len(self._segments),
+            "deltas": sum(len(segment.deltas) for segment in self._segments),
+            "bytes": self.size,
+            "budget": self._budget,
+            "window": self._window,
+            "oldest": self._segments[0].at if self._segments else None,
+        }
+
+    def export(self):
+        """Return every segment with dotted paths, e.g. for diagnostics."""
+        return [
+            {
+                "at": segment.at,
+                "keyframe": _dotted(segment.keyframe),
+                "deltas": [
+                    {
+                        "at": at,
+                        "set": _dotted(
+                            {p: v for p, v in delta.items() if v is not REMOVED}
+                        ),
+                        "removed": [
+                            ".".join(p) for p, v in delta.items() if v is REMOVED
+                        ],
+                    }
+                    for at, delta in segment.deltas
+                ],
+            }
+            for segment in self._segments
+        ]
+
+
+def _dotted(values):
+    """Key ``{path: value}`` by dotted path."""
+    return {".".join(path): value for path, value in values.items()}
@@ -0,0 +1,159 @@
+"""Helpers for addressing leaves of the device tree by path."""
+
+_MISSING = object()
+# Key under which a trie node stores the ``(path, value)`` ending there
+_LEAF = object()
+
+
+def get_nested_value(data, keys, default=None):
+    """Retrieve a nested value from a dictionary."""
+    for key in keys:
+        if not isinstance(data, dict):
+            return default
+        data = data.get(key, _MISSING)
+        if data is _MISSING:
+            return default
+    return data
+
+
+class PathTrie:
+    """Map value paths to values, stored as a tree of keys.
+
+    Paths sharing a prefix share its nodes, so reading every path from a
+    device tree walks each prefix once, and the paths below a prefix are
+    found without scanning the others.
+    """
+
+    __slots__ = ("_root", "_size")
+
+    def __init__(self, items=()):
+        """Initialize the trie with ``(path, value)`` pairs."""
+        self._root = {}
+        self._size = 0
+        for path, value in items:
+            self[path] = value
+
+    def __len__(self):
+        """Return the number of paths."""
+        return self._size
+
+    def __iter__(self):
+        """Iterate over the paths."""
+        return (path for path, _ in self.items())
+
+    def __contains__(self, path):
+        """Return whether ``path`` is in the trie."""
+        return self.get(path, _MISSING) is not _MISSING
+
+    def __setitem__(self, path, value):
+        """Store ``value`` at ``path``."""
+        path = tuple(path)
+        node = self._root
+        for key in path:
+            node = node.setdefault(key, {})
+        if _LEAF not in node:
+            self._size += 1
+        node[_LEAF] = (path, value)
+
+    def get(self, path, default=None):
+        """Return the value at ``path``, or ``default``."""
+        node = self._node(path)
+        if node is None or _LEAF not in node:
+            return default
+        return node[_LEAF][1]
+
+    def items(self, prefix=()):
+        """Yield ``(path, value)`` for every path starting with ``prefix``."""
+        node = self._node(prefix)
+        if node is not None:
+            yield from _walk_items(node)
+
+    def values(self, prefix=()):
+        """Yield the value of every path starting with ``prefix``."""
+        return (value for _, value in self.items(prefix))
+
+    def extract(self, data, prefix=()):
+        """Read the paths starting with ``prefix`` from a device tree.
+
+        Returns ``{path: value}``, with None for paths missing from
+        ``data``.
+        """
+        values = {}
+        node = self._node(prefix)
+        if node is not None:
+            _extract(node, get_nested_value(data, prefix), values)
+        return values
+
+    def _node(self, path):
+        """Return the node of ``path``, or None."""
+        node = self._root
+        for key in path:
+            node = node.get(key)
+            if node is None:
+                return None
+        return node
+
+
+def _walk_items(node):
+    """Yield the ``(path, value)`` pairs of a trie node and its children."""
+    for key, child in node.items():
+        if key is _LEAF:
+            yield child
+        else:
+            yield from _walk_items(child)
+
+
+def _extract(node, data, values):
+    """Read the leaves below a trie node from the matching part of a tree."""
+    for key, child in node.items():
+        if key is _LEAF:
+            values[child[0]] = data
+        else:
+            _extract(child, data.get(key) if isinstance(data, dict) else None, values)
+
+
+def diff_flat(old, new):
+    """Return the paths added, removed or changed between two flat mappings."""
+    changed = {
+        path for path, value in new.items() if old.get(path, _MISSING) != value
+    }
+    changed.update(path for path in old if path not in new)
+    return changed
+
+
+def flatten_tree(tree, prefix=()):
+    """Yield ``(path, value)`` for every leaf of a nested tree."""
+    for key, value in tree.items():
+        if isinstance(value, dict):
+            yield from flatten_tree(value, (*prefix, key))
+        else:
+            yield (*prefix, key), value
+
+
+def build_payload(path, value):
+    """Return a nested payload setting ``value`` at ``path``."""
+    payload = value
+    for key in reversed(path):
+        payload = {key: payload}
+    return payload
+
+
+def merge_tree(target, source):
+    """Deep-merge ``source`` into ``target`` and return ``target``."""
+    for key, value in source.items():
+        existing = target.get(key)
+        if isinstance(existing, dict) and isinstance(value, dict):
+            merge_tree(existing, value)
+        else:
+            target[key] = value
+    return target
+
+
+def set_nested_value(data, keys, value):
+    """Set a nested value in a dictionary, creating missing levels."""
+    for key in keys[:-1]:
+        child = data.get(key)
+        if not isinstance(child, dict):
+            child = data[key] = {}
+        data = child
+    data[keys[-1]] = value
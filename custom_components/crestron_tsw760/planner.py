@@ -0,0 +1,34 @@
+"""Work out which parts of the device tree need to be polled."""
+
+from .const import DEVICE_INFO_PATH, SUBTREE_DEPTH
+
+# Statuses returned by firmware that cannot serve subtree requests
+SUBTREE_UNSUPPORTED_STATUSES = (400, 404, 405, 501)
+
+
+class SubtreeNotSupportedError(Exception):
+    """Raised when a panel does not answer a subtree request with its subtree."""
+
+
+def plan_endpoints(value_paths, depth=SUBTREE_DEPTH):
+    """Return the smallest set of subtree prefixes covering the value paths.
+
+    Each value path is cut down to its first ``depth`` keys, so
+    ``Device.Display.Lcd.Brightness`` is served by ``/Device/Display``.
+    Prefixes already covered by a shorter prefix are dropped.
+    """
+    prefixes = sorted(
+        {tuple(path[:depth]) for path in value_paths} | {DEVICE_INFO_PATH}
+    )
+    endpoints = []
+    for prefix in prefixes:
+        if endpoints and prefix[: len(endpoints[-1])] == endpoints[-1]:
+            continue
+        endpoints.append(prefix)
+    return endpoints
+
+
+def endpoint_url(prefix):
+    """Return the API path serving a subtree prefix."""
+    return "/" + "/".join(prefix)
+
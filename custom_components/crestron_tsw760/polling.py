@@ -0,0 +1,109 @@
+"""Adaptive poll interval for a single panel."""
+
+import zlib
+
+from .const import (
+    ACTIVE_POLL_COUNT,
+    ACTIVE_POLL_INTERVAL,
+    IDLE_BACKOFF_FACTOR,
+    IDLE_MAX_INTERVAL,
+    OFFLINE_MAX_INTERVAL,
+    POLL_INTERVAL,
+    PUSH_CONSISTENCY_INTERVAL,
+)
+
+REASON_STARTUP = "startup"
+REASON_ACTIVE = "active"
+REASON_NORMAL = "normal"
+REASON_IDLE = "idle"
+REASON_UNREACHABLE = "unreachable"
+REASON_PUSH = "push"
+
+
+class AdaptivePollInterval:
+    """Work out how long to wait before polling a panel again.
+
+    - Poll every ``ACTIVE_POLL_INTERVAL`` for a few polls after a write or a
+      change in the tree.
+    - Back off gradually towards ``IDLE_MAX_INTERVAL`` while nothing changes.
+    - Back off exponentially towards ``OFFLINE_MAX_INTERVAL`` while the panel
+      is unreachable.
+    - Only check consistency every ``PUSH_CONSISTENCY_INTERVAL`` while the
+      panel pushes its changes.
+
+    The first interval is scaled by a stable per-host phase so panels set up
+    together spread out over the interval instead of polling in lockstep.
+    """
+
+    def __init__(self, host):
+        """Initialize the interval."""
+        self._phase = 0.5 + (zlib.crc32(host.encode()) % 1000) / 1000
+        self._active_polls = 0
+        self._idle_polls = 0
+        self._failures = 0
+        self._started = False
+        self._push = False
+        self.seconds = POLL_INTERVAL * self._phase
+        self.reason = REASON_STARTUP
+
+    def set_push(self, connected):
+        """Switch between push updates and regular polling."""
+        self._push = connected
+        self._active_polls = 0
+        self._idle_polls = 0
+        if connected:
+            self._set(PUSH_CONSISTENCY_INTERVAL * self._phase, REASON_PUSH)
+        else:
+            self._set(ACTIVE_POLL_INTERVAL, REASON_ACTIVE)
+
+    def note_activity(self):
+        """Poll quickly for a while, e.g. after a write.
+
+        Not needed while the panel pushes the side effects itself.
+        """
+        if self._push:
+            return
+        self._active_polls = ACTIVE_POLL_COUNT
+        self._idle_polls = 0
+        self._set(ACTIVE_POLL_INTERVAL, REASON_ACTIVE)
+
+    def update(self, success, changed):
+        """Work out the next interval from the outcome of a poll."""
+        if not success:
+            self._started = True
+            self._failures += 1
+            self._set(
+                min(
+                    POLL_INTERVAL * self._phase * 2**self._failures,
+                    OFFLINE_MAX_INTERVAL,
+                ),
+                REASON_UNREACHABLE,
+            )
+            return
+        self._failures = 0
+        if self._push:
+            self._set(PUSH_CONSISTENCY_INTERVAL * self._phase, REASON_PUSH)
+            return
+        if not self._started:
+            # The first refresh only establishes the baseline; keep the
+            # phase-shifted interval so panels fan out.
+            self._started = True
+            return
+        if changed:
+            self._active_polls = ACTIVE_POLL_COUNT
+            self._idle_polls = 0
+        if self._active_polls:
+            self._active_polls -= 1
+            self._set(ACTIVE_POLL_INTERVAL, REASON_ACTIVE)
+            return
+        self._idle_polls += 1
+        seconds = min(
+            POLL_INTERVAL * IDLE_BACKOFF_FACTOR ** (self._idle_polls - 1),
+            IDLE_MAX_INTERVAL,
+        )
+        self._set(seconds, REASON_NORMAL if seconds == POLL_INTERVAL else REASON_IDLE)
+
+    def _set(self, seconds, reason):
+        """Store the next interval and why it was chosen."""
+        self.seconds = seconds
+        self.reason = reason
@@ -0,0 +1,127 @@
+"""Identify panels before they are added."""
+
+import asyncio
+from dataclasses import dataclass
+import time
+
+import aiohttp
+
+from .api import CrestronApiClient
+from .const import (
+    DATA_PROBES,
+    DEVICE_INFO_PATH,
+    DOMAIN,
+    PROBE_CONCURRENCY,
+    PROBE_MAX_AGE,
+    PROBE_TIMEOUT,
+)
+from .paths import get_nested_value
+from .planner import SUBTREE_UNSUPPORTED_STATUSES, endpoint_url
+
+
+class NotAPanelError(Exception):
+    """Raised when a host answers but does not report any DeviceInfo."""
+
+
+@dataclass(frozen=True, slots=True)
+class PanelProbe:
+    """What a panel reported about itself when it was probed.
+
+    ``data`` is the decoded response: just ``Device.DeviceInfo`` when the
+    panel serves subtrees, otherwise the whole filtered tree.
+    """
+
+    host: str
+    model: str
+    serial_number: str
+    mac_address: str
+    data: dict
+    subtrees_supported: bool
+    probed_at: float
+
+
+async def async_probe_panel(host, timeout=PROBE_TIMEOUT):
+    """Read a panel's DeviceInfo, giving up after ``timeout`` seconds.
+
+    Raises ``aiohttp.ClientError``, ``TimeoutError`` or ``NotAPanelError``,
+    the latter also when the host answers with something other than JSON.
+    """
+    client = CrestronApiClient(host)
+    try:
+        async with asyncio.timeout(timeout):
+            return await _async_probe(client, host)
+    except ValueError as err:
+        raise NotAPanelError(f"{host} did not answer with JSON: {err}") from err
+    finally:
+        await client.async_close()
+
+
+async def _async_probe(client, host):
+    """Fetch the DeviceInfo subtree, or the full tree on older firmware."""
+    data = None
+    try:
+        data = await client.async_get_json(endpoint_url(DEVICE_INFO_PATH))
+    except aiohttp.ClientResponseError as err:
+        if err.status not in SUBTREE_UNSUPPORTED_STATUSES:
+            raise
+    subtrees_supported = get_nested_value(data, DEVICE_INFO_PATH) is not None
+    if not subtrees_supported:
+        data = await client.async_get_json("/Device")
+    device_info = get_nested_value(data, DEVICE_INFO_PATH)
+    if not isinstance(device_info, dict):
+        raise NotAPanelError(f"{host} did not report its DeviceInfo")
+    return PanelProbe(
+        host=host,
+        model=device_info.get("Model", ""),
+        serial_number=device_info.get("SerialNumber", ""),
+        mac_address=device_info.get("MacAddress", ""),
+        data=data,
+        subtrees_supported=subtrees_supported,
+        probed_at=time.monotonic(),
+    )
+
+
+async def async_probe_panels(hosts, concurrency=PROBE_CONCURRENCY):
+    """Probe many hosts concurrently.
+
+    Returns ``{host: PanelProbe or exception}``; at most ``concurrency``
+    probes are in flight at once.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def probe(host):
+        async with semaphore:
+            return await async_probe_panel(host)
+
+    results = await asyncio.gather(
+        *(probe(host) for host in hosts), return_exceptions=True
+    )
+    return dict(zip(hosts, results, strict=True))
+
+
+def remember_probe(hass, probe):
+    """Keep a probe so setting up its entry does not fetch it again."""
+    probes = hass.data.setdefault(DOMAIN, {}).setdefault(DATA_PROBES, {})
+    for host in [
+        host
+        for host, cached in probes.items()
+        if probe.probed_at - cached.probed_at > PROBE_MAX_AGE
+    ]:
+        del probes[host]
+    probes[probe.host] = probe
+
+
+def cached_probe(hass, host):
+    """Return a recent probe of ``host``, if any."""
+    probe = hass.data.get(DOMAIN, {}).get(DATA_PROBES, {}).get(host)
+    if probe is None or time.monotonic() - probe.probed_at > PROBE_MAX_AGE:
+        return None
+    return probe
+
+
+def pop_probe(hass, host):
+    """Return and forget a recent probe of ``host``, if any."""
+    probe = cached_probe(hass, host)
+    hass.data.get(DOMAIN, {}).get(DATA_PROBES, {}).pop(host, None)
+    return probe
+
@@ -0,0 +1,189 @@
+"""Receive the changes a panel pushes over its event stream."""
+
+import asyncio
+import logging
+import random
+
+import aiohttp
+
+from .const import (
+    DEFAULT_CONNECT_TIMEOUT,
+    PUSH_HEARTBEAT,
+    PUSH_PATH,
+    PUSH_RECONNECT_MAX,
+    PUSH_RECONNECT_MIN,
+)
+from .decoder import DEFAULT_LOADS
+from .planner import SUBTREE_UNSUPPORTED_STATUSES
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class PushNotSupportedError(Exception):
+    """Raised when a panel's firmware has no event stream."""
+
+
+def parse_changes(message):
+    """Map the ``Changes[]`` of an event by value path.
+
+    Each change names the parent object in ``Path`` (``Device.Display``),
+    the changed leaf in ``Property`` (``CurrentState``) and its ``Value``,
+    like the results of a write. Malformed entries are ignored.
+    """
+    changes = {}
+    if not isinstance(message, dict):
+        return changes
+    for change in message.get("Changes") or []:
+        if not isinstance(change, dict) or "Value" not in change:
+            continue
+        parent = change.get("Path")
+        prop = change.get("Property")
+        if not isinstance(parent, str) or not isinstance(prop, str):
+            continue
+        changes[(*parent.split("."), prop)] = change["Value"]
+    return changes
+
+
+def _refused_for_good(status):
+    """Return whether a failed upgrade is not worth retrying.
+
+    Only server errors and 429 are transient; any other answer, a 401 or
+    a redirect included, would be the same on every attempt.
+    """
+    if status in SUBTREE_UNSUPPORTED_STATUSES:
+        return True
+    return status != 429 and status < 500
+
+
+class PushChannel:
+    """Keep a websocket open to a panel's event stream.
+
+    Every event is handed to ``on_changes`` as ``{path: value}``, and
+    ``on_state`` is called with True once connected and with False once
+    the connection is lost. Lost connections are retried with exponential
+    backoff. A panel refusing the upgrade for good (404 from firmware
+    without the endpoint, but also 401, 403 or a redirect) is not retried.
+    """
+
+    def __init__(
+        self,
+        hass,
+        host,
+        on_changes,
+        on_state,
+        connect_timeout=DEFAULT_CONNECT_TIMEOUT,
+    ):
+        """Initialize the channel."""
+        self._hass = hass
+        self.host = host
+        self._on_changes = on_changes
+        self._on_state = on_state
+        self._timeout = aiohttp.ClientTimeout(total=None, sock_connect=connect_timeout)
+        self._session = None
+        self._task = None
+        self.connected = False
+        self.supported = True
+        self.stats = {
+            "connects": 0,
+            "disconnects": 0,
+            "events": 0,
+            "invalid_events": 0,
+            "changes": 0,
+        }
+
+    def start(self):
+        """Connect in the background."""
+        if self._task is None:
+            self._task = self._hass.async_create_background_task(
+                self._async_run(), f"crestron_tsw760 push {self.host}"
+            )
+
+    async def async_stop(self):
+        """Disconnect and stop reconnecting."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def _async_run(self):
+        """Stay connected, backing off while the panel cannot be reached.
+
+        However the task ends, a connection it reported is reported lost,
+        so the coordinator never keeps waiting for pushes that stopped.
+        """
+        backoff = PUSH_RECONNECT_MIN
+        try:
+            while True:
+                try:
+                    await self._async_listen()
+                except PushNotSupportedError as err:
+                    _LOGGER.info(
+                        "%s has no event stream, polling only: %s", self.host, err
+                    )
+                    self.supported = False
+                    return
+                except (aiohttp.ClientError, TimeoutError) as err:
+                    _LOGGER.debug("Event stream of %s failed: %s", self.host, err)
+                except Exception:  # noqa: BLE001 - reconnect rather than stop
+                    _LOGGER.exception(
+                        "Unexpected error on the event stream of %s", self.host
+                    )
+                if self.connected:
+                    # Back off from scratch after a connection that worked
+                    backoff = PUSH_RECONNECT_MIN
+                    self._set_connected(False)
+                await asyncio.sleep(backoff * random.uniform(0.5, 1.0))
+                backoff = min(backoff * 2, PUSH_RECONNECT_MAX)
+        finally:
+            if self.connected:
+                self._set_connected(False)
+
+    async def _async_listen(self):
+        """Connect and apply events until the connection closes."""
+        if self._session is None:
+            # A connection of its own, so it never holds a request slot
+            self._session = aiohttp.ClientSession(timeout=self._timeout)
+        try:
+            websocket = await self._session.ws_connect(
+                f"ws://{self.host}{PUSH_PATH}", heartbeat=PUSH_HEARTBEAT
+            )
+        except aiohttp.WSServerHandshakeError as err:
+            if _refused_for_good(err.status):
+                raise PushNotSupportedError(err) from err
+            raise
+        try:
+            self.stats["connects"] += 1
+            self._set_connected(True)
+            async for message in websocket:
+                if message.type is not aiohttp.WSMsgType.TEXT:
+                    break
+                self.stats["events"] += 1
+                try:
+                    changes = parse_changes(DEFAULT_LOADS(message.data))
+                except ValueError as err:
+                    # Skip the garbled event; the next poll catches up
+                    self.stats["invalid_events"] += 1
+                    _LOGGER.debug("Invalid event from %s: %s", self.host, err)
+                    continue
+                if changes:
+                    self.stats["changes"] += len(changes)
+                    self._on_changes(changes)
+        finally:
+            await websocket.close()
+
+    def _set_connected(self, connected):
+        """Record a connection state change and report it."""
+        self.connected = connected
+        if not connected:
+            self.stats["disconnects"] += 1
+        self._on_state(connected)
+
+    def summary(self):
+        """Return the channel state and counters, e.g. for diagnostics."""
+        return {"connected": self.connected, "supported": self.supported, **self.stats}
@@ -0,0 +1,142 @@
+"""Fleet-wide limit on concurrent panel polls."""
+
+import asyncio
+from collections import Counter
+from contextlib import asynccontextmanager
+import heapq
+import ipaddress
+import itertools
+from urllib.parse import urlsplit
+
+from .const import FLEET_MAX_CONCURRENT_POLLS, FLEET_MAX_POLLS_PER_SUBNET
+
+
+def subnet_of(host):
+    """Return the subnet a panel is grouped under for concurrency limits."""
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        # host:port or [v6]:port
+        try:
+            address = ipaddress.ip_address(urlsplit(f"//{host}").hostname or "")
+        except ValueError:
+            return host
+    prefix = 24 if address.version == 4 else 64
+    return str(ipaddress.ip_network(f"{address}/{prefix}", strict=False))
+
+
+class FleetScheduler:
+    """Bound how many panel polls run at once across all config entries.
+
+    Every coordinator polls inside ``async_slot``. A slot is granted when
+    both the global and the panel's per-subnet limit allow it; waiting
+    polls are served most overdue first. Polls waiting on a saturated
+    subnet never hold up those for a subnet with room to spare.
+    """
+
+    def __init__(
+        self,
+        max_concurrent=FLEET_MAX_CONCURRENT_POLLS,
+        max_per_subnet=FLEET_MAX_POLLS_PER_SUBNET,
+    ):
+        """Initialize the scheduler."""
+        self._max_concurrent = max_concurrent
+        self._max_per_subnet = max_per_subnet
+        self._in_flight = 0
+        self._subnet_in_flight = Counter()
+        self._subnet_waiting = Counter()
+        self._waiters = []
+        self._sequence = itertools.count()
+        self.coordinators = set()
+        self.stats = {
+            "polls": 0,
+            "in_flight": 0,
+            "queue_depth": 0,
+            "last_poll_lag": 0.0,
+            "max_poll_lag": 0.0,
+        }
+
+    def register(self, coordinator):
+        """Track a coordinator polling through this scheduler."""
+        self.coordinators.add(coordinator)
+
+    def unregister(self, coordinator):
+        """Stop tracking a coordinator."""
+        self.coordinators.discard(coordinator)
+
+    @asynccontextmanager
+    async def async_slot(self, host, due):
+        """Hold a poll slot for ``host``; ``due`` is the loop time it was due."""
+        loop = asyncio.get_running_loop()
+        subnet = subnet_of(host)
+        # Waiters for the same subnet go first; others are all blocked on a
+        # limit, or they would have been started when a slot was released
+        if not self._subnet_waiting[subnet] and self._has_capacity(subnet):
+            self._take(subnet)
+        else:
+            future = loop.create_future()
+            heapq.heappush(self._waiters, (due, next(self._sequence), subnet, future))
+            self._subnet_waiting[subnet] += 1
+            self.stats["queue_depth"] = len(self._waiters)
+            try:
+                await future
+            except asyncio.CancelledError:
+                if future.cancelled():
+                    self._stop_waiting(subnet)
+                else:
+                    self._release(subnet)
+                raise
+        lag = max(loop.time() - due, 0.0)
+        self.stats["polls"] += 1
+        self.stats["last_poll_lag"] = lag
+        self.stats["max_poll_lag"] = max(self.stats["max_poll_lag"], lag)
+        try:
+            yield lag
+        finally:
+            self._release(subnet)
+
+    def _has_capacity(self, subnet):
+        """Return whether a poll for ``subnet`` may start now."""
+        return (
+            self._in_flight < self._max_concurrent
+            and self._subnet_in_flight[subnet] < self._max_per_subnet
+        )
+
+    def _stop_waiting(self, subnet):
+        """Account for a poll that no longer waits for ``subnet``."""
+        self._subnet_waiting[subnet] -= 1
+        if not self._subnet_waiting[subnet]:
+            del self._subnet_waiting[subnet]
+
+    def _take(self, subnet):
+        """Account for a started poll."""
+        self._in_flight += 1
+        self._subnet_in_flight[subnet] += 1
+        self.stats["in_flight"] = self._in_flight
+
+    def _release(self, subnet):
+        """Account for a finished poll and start the most overdue waiters.
+
+        Waiters whose subnet is still saturated are passed over, so they do
+        not block the waiters behind them.
+        """
+        self._in_flight -= 1
+        self._subnet_in_flight[subnet] -= 1
+        if not self._subnet_in_flight[subnet]:
+            del self._subnet_in_flight[subnet]
+        blocked = []
+        while self._waiters and self._in_flight < self._max_concurrent:
+            waiter = heapq.heappop(self._waiters)
+            future = waiter[3]
+            if future.done():
+                continue
+            if self._subnet_in_flight[waiter[2]] >= self._max_per_subnet:
+                blocked.append(waiter)
+                continue
+            self._stop_waiting(waiter[2])
+            self._take(waiter[2])
+            future.set_result(None)
+        for waiter in blocked:
+            heapq.heappush(self._waiters, waiter)
+        self.stats["in_flight"] = self._in_flight
+        self.stats["queue_depth"] = len(self._waiters)
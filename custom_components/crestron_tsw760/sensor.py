@@ -1,58 +1,155 @@
 """Sensor Component."""
 
-from homeassistant.components.sensor import SensorEntity
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorStateClass,
+)
+from homeassistant.const import UnitOfTime
 
-from . import CrestronEntity
-from .const import DOMAIN, ENTITIES_TO_EXPOSE
+from . import (
+    CrestronDiagnosticEntity,
+    CrestronEntity,
+    async_platform_descriptors,
+)
+from .breaker import STATE_CLOSED, STATE_HALF_OPEN, STATE_OPEN
+from .const import DOMAIN, TIMED_PHASES
 
 
 async def async_setup_entry(hass, config_entry, async_add_entities):
     """Docstring."""
     coordinator = hass.data[DOMAIN][config_entry.entry_id]
-    name = config_entry.data.get("name", "default_name")
+    panel = coordinator.panel
     entities = [
-        CrestronSensor(
-            coordinator,
-            f"{name} {entity['name']}",
-            entity["value_path"],
-            f"{name}_{entity['name']}".replace(" ", "_").lower(),
-            config_entry,
-        )
-        for entity in ENTITIES_TO_EXPOSE
-        if entity["type"] == "sensor"
+        CrestronSensor(coordinator, panel, descriptor)
+        for descriptor in async_platform_descriptors(hass, config_entry, "sensor")
     ]
-    async_add_entities(entities, update_before_add=True)
+    entities.append(
+        CrestronPollIntervalSensor(
+            coordinator, panel, "Poll Interval", "poll_interval"
+        )
+    )
+    entities.append(CrestronCircuitSensor(coordinator, panel, "Circuit", "circuit"))
+    entities.append(
+        CrestronQueueSensor(coordinator, panel, "Command Queue", "command_queue")
+    )
+    entities.extend(
+        CrestronPhaseTimingSensor(coordinator, panel, phase)
+        for phase in TIMED_PHASES
+    )
+    async_add_entities(entities)
 
 
 class CrestronSensor(CrestronEntity, SensorEntity):
     """Represenation of a Crestron Sensor entity."""
 
-    def __init__(
-        self,
-        coordinator,
-        name,
-        value_path,
-        entity_id,
-        config_entry,
-    ):
-        """Initialize the CrestronSensor entity."""
-        super().__init__(coordinator, name, value_path, entity_id, config_entry)
-        self._attr_name = name
-        self._entity_id = entity_id
-        self._value_path = value_path
-        self._attr_state = self._extract_value()
+    @property
+    def state(self):
+        """Extract the sensor's current value."""
+        return self._extract_value()
+
+
+class CrestronPollIntervalSensor(CrestronDiagnosticEntity, SensorEntity):
+    """Diagnostic sensor showing the adaptive poll interval and its reason."""
+
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_native_unit_of_measurement = UnitOfTime.SECONDS
 
     @property
-    def unique_id(self):
-        """Return a unique ID for the entity."""
-        return f"{self._entity_id}_{self._attr_name}"
+    def native_value(self):
+        """Return the interval until the next poll."""
+        return round(self.coordinator.poll_interval.seconds, 1)
 
     @property
-    def name(self):
-        """Return the name of the entity."""
-        return self._attr_name
+    def extra_state_attributes(self):
+        """Return why the interval was chosen."""
+        return {"reason": self.coordinator.poll_interval.reason}
+
+
+class CrestronCircuitSensor(CrestronDiagnosticEntity, SensorEntity):
+    """Diagnostic sensor showing the state of the panel's circuit breaker."""
+
+    _attr_device_class = SensorDeviceClass.ENUM
+    _attr_options = [STATE_CLOSED, STATE_OPEN, STATE_HALF_OPEN]
 
     @property
-    def state(self):
-        """Extract the sensor's current value."""
-        return self._extract_value()
+    def native_value(self):
+        """Return whether requests are sent to the panel."""
+        return self.coordinator.client.breaker.state
+
+    @property
+    def extra_state_attributes(self):
+        """Return the trip count and the failures behind the state."""
+        summary = self.coordinator.client.breaker.summary()
+        return {
+            "trips": summary["trips"],
+            "consecutive_failures": summary["consecutive_failures"],
+            "rejected": summary["rejected"],
+            "retry_in": summary["retry_in"],
+            "last_error": summary["last_error"],
+        }
+
+
+class CrestronQueueSensor(CrestronDiagnosticEntity, SensorEntity):
+    """Diagnostic sensor showing how many requests wait for the panel.
+
+    Disabled by default. The wait times are in the Queue wait time sensor.
+    """
+
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_entity_registry_enabled_default = False
+
+    @property
+    def native_value(self):
+        """Return the number of waiting requests."""
+        return self.coordinator.client.queue.depth
+
+    @property
+    def extra_state_attributes(self):
+        """Return the limit, the peak depth and the superseded writes."""
+        summary = self.coordinator.client.queue.summary()
+        return {
+            "limit": summary["limit"],
+            "in_flight": summary["in_flight"],
+            "max_depth": summary["max_depth"],
+            "jumped": summary["jumped"],
+            "writes_superseded": self.coordinator.writer.stats["writes_superseded"],
+        }
+
+
+class CrestronPhaseTimingSensor(CrestronDiagnosticEntity, SensorEntity):
+    """Diagnostic sensor showing the p95 duration of one poll or write phase.
+
+    Disabled by default; enable it to graph where a slow panel spends its
+    time. The attributes carry p50, max and the sample count.
+    """
+
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_entity_registry_enabled_default = False
+
+    def __init__(self, coordinator, panel, phase):
+        """Initialize the timing sensor."""
+        super().__init__(
+            coordinator,
+            panel,
+            f"{phase.replace('_', ' ').capitalize()} Time",
+            f"{phase}_time",
+        )
+        self._phase = phase
+
+    @property
+    def native_value(self):
+        """Return the 95th percentile of the recent samples."""
+        return self.coordinator.timings.get(self._phase)["p95"]
+
+    @property
+    def extra_state_attributes(self):
+        """Return p50, max and the number of samples."""
+        summary = self.coordinator.timings.get(self._phase)
+        return {
+            "p50": summary["p50"],
+            "max": summary["max"],
+            "count": summary["count"],
+        }
@@ -0,0 +1,318 @@
+"""Services acting on many panels at once."""
+
+import asyncio
+from datetime import timedelta
+import logging
+import time
+
+import aiohttp
+import voluptuous as vol
+
+from homeassistant.core import HomeAssistant, ServiceCall, SupportsResponse, callback
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import config_validation as cv, device_registry as dr
+from homeassistant.helpers.service import async_extract_referenced_entity_ids
+from homeassistant.util import dt as dt_util
+
+from .commands import PRIORITY_OPERATION, write_priority
+from .const import BULK_CONCURRENCY, DOMAIN
+from .coordinator import CrestronDataUpdateCoordinator
+from .history import REMOVED
+from .paths import flatten_tree, get_nested_value
+
+_LOGGER = logging.getLogger(__name__)
+
+SERVICE_BULK_SET = "bulk_set"
+SERVICE_APPLY_PROFILE = "apply_profile"
+SERVICE_QUERY_HISTORY = "query_history"
+ATTR_VALUE_PATH = "value_path"
+ATTR_VALUE = "value"
+ATTR_PROFILE = "profile"
+ATTR_PATH = "path"
+ATTR_SINCE = "since"
+ATTR_AT = "at"
+
+SETTING_VALUE = vol.Any(bool, int, float, str)
+
+
+def parse_path_prefix(value):
+    """Validate ``Device`` or a dotted path below it, such as ``Device.Display``."""
+    path = tuple(cv.string(value).split("."))
+    if path[0] != "Device" or not all(path):
+        raise vol.Invalid(f"{value} is not a path in the Device tree")
+    return path
+
+
+def parse_value_path(value):
+    """Validate a ``Device.Display.Lcd.Brightness`` style value path."""
+    path = parse_path_prefix(value)
+    if len(path) < 2:
+        raise vol.Invalid(f"{value} is not a path below Device")
+    return path
+
+
+def parse_profile(value):
+    """Validate a partial ``Device`` tree and return its ``{path: value}``.
+
+    The ``Device`` key may be left out.
+    """
+    if not isinstance(value, dict) or not value:
+        raise vol.Invalid("The profile must be a non-empty partial Device tree")
+    if list(value) != ["Device"]:
+        value = {"Device": value}
+    leaves = {}
+    for path, leaf in flatten_tree(value):
+        if not isinstance(leaf, bool | int | float | str):
+            raise vol.Invalid(f"{'.'.join(path)} must be a single value")
+        leaves[path] = leaf
+    if not leaves:
+        raise vol.Invalid("The profile sets no values")
+    return leaves
+
+
+BULK_SET_SCHEMA = vol.Schema(
+    {
+        **cv.TARGET_SERVICE_FIELDS,
+        vol.Required(ATTR_VALUE_PATH): parse_value_path,
+        vol.Required(ATTR_VALUE): SETTING_VALUE,
+    }
+)
+
+APPLY_PROFILE_SCHEMA = vol.Schema(
+    {
+        **cv.TARGET_SERVICE_FIELDS,
+        vol.Required(ATTR_PROFILE): parse_profile,
+    }
+)
+
+QUERY_HISTORY_SCHEMA = vol.Schema(
+    {
+        **cv.TARGET_SERVICE_FIELDS,
+        vol.Optional(ATTR_PATH, default="Device"): parse_path_prefix,
+        vol.Optional(ATTR_SINCE, default=timedelta(hours=24)): cv.positive_time_period,
+        vol.Optional(ATTR_AT): cv.datetime,
+    }
+)
+
+
+@callback
+def async_target_coordinators(hass: HomeAssistant, call: ServiceCall):
+    """Return the coordinators of the panels a service call targets.
+
+    Panels are targeted by device, or by area for every panel in it.
+    """
+    selected = async_extract_referenced_entity_ids(hass, call)
+    device_registry = dr.async_get(hass)
+    coordinators = {}
+    for device_id in selected.referenced_devices:
+        device = device_registry.async_get(device_id)
+        if device is None:
+            continue
+        for entry_id in device.config_entries:
+            coordinator = hass.data.get(DOMAIN, {}).get(entry_id)
+            if isinstance(coordinator, CrestronDataUpdateCoordinator):
+                coordinators[entry_id] = coordinator
+    if not coordinators:
+        raise ServiceValidationError("No Crestron TSW-760 panels were targeted")
+    return list(coordinators.values())
+
+
+async def async_gather_panels(coordinators, action, concurrency=BULK_CONCURRENCY):
+    """Run ``action(coordinator)`` for many panels and aggregate the results.
+
+    At most ``concurrency`` panels are contacted at once. Each action
+    returns a dict describing its panel's result; an action raising any
+    error, such as a timeout or a garbled response, counts as failed for
+    that panel only.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(coordinator):
+        result = {"name": coordinator.panel.name, "error": None}
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                result.update(await action(coordinator))
+            except (aiohttp.ClientError, TimeoutError) as err:
+                result["error"] = str(err) or type(err).__name__
+                result["success"] = False
+            except Exception as err:  # noqa: BLE001 - reported for this panel only
+                _LOGGER.exception("Unexpected error on %s", coordinator.host)
+                result["error"] = str(err) or type(err).__name__
+                result["success"] = False
+            result["latency_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        return coordinator.host, result
+
+    panels = dict(await asyncio.gather(*(run(c) for c in coordinators)))
+    succeeded = sum(1 for result in panels.values() if result["success"])
+    return {
+        "succeeded": succeeded,
+        "failed": len(panels) - succeeded,
+        "panels": panels,
+    }
+
+
+async def _async_bulk_set(hass: HomeAssistant, call: ServiceCall):
+    """Write one value to every targeted panel."""
+    coordinators = async_target_coordinators(hass, call)
+    value_path = call.data[ATTR_VALUE_PATH]
+    value = call.data[ATTR_VALUE]
+
+    async def write(coordinator):
+        outcome = await coordinator.writer.async_write(
+            value_path, value, immediate=True
+        )
+        if outcome is None:
+            return {
+                "success": False,
+                "status_id": None,
+                "status_info": None,
+                "error": "No result reported",
+            }
+        return {
+            "success": outcome.success,
+            "status_id": outcome.status_id,
+            "status_info": outcome.status_info,
+        }
+
+    response = await async_gather_panels(coordinators, write)
+    _LOGGER.debug(
+        "Set %s on %s panels, %s failed",
+        ".".join(value_path),
+        len(coordinators),
+        response["failed"],
+    )
+    return response
+
+
+def _is_setting(coordinators, path):
+    """Return whether ``path`` is a writable setting of any of the panels."""
+    if write_priority(path) == PRIORITY_OPERATION:
+        return False
+    for coordinator in coordinators:
+        descriptor = coordinator.schema.get(path)
+        if descriptor is not None and descriptor.type != "sensor":
+            return True
+    return False
+
+
+async def _async_apply_profile(hass: HomeAssistant, call: ServiceCall):
+    """Send each targeted panel the profile values it does not have yet.
+
+    Values equal to the panel's polled state are skipped, so a panel that
+    already matches the profile is not contacted at all. A panel whose
+    state is restored or from a failed poll is refreshed first, and sent
+    every value if that refresh fails too.
+    """
+    coordinators = async_target_coordinators(hass, call)
+    profile = call.data[ATTR_PROFILE]
+    unknown = [path for path in profile if not _is_setting(coordinators, path)]
+    if unknown:
+        raise ServiceValidationError(
+            "Not settings of the targeted panels: "
+            + ", ".join(".".join(path) for path in unknown)
+        )
+
+    async def apply(coordinator):
+        result = {"success": True, "changed": [], "skipped": [], "failed": {}}
+        if coordinator.restored or not coordinator.last_update_success:
+            await coordinator.async_refresh()
+        fresh = coordinator.last_update_success and not coordinator.restored
+        changes = {}
+        for path, value in profile.items():
+            if fresh and get_nested_value(coordinator.data, path) == value:
+                result["skipped"].append(".".join(path))
+            else:
+                changes[path] = value
+        outcomes = await coordinator.writer.async_write_many(changes, immediate=True)
+        for path, outcome in outcomes.items():
+            if outcome is not None and outcome.success:
+                result["changed"].append(".".join(path))
+            else:
+                result["success"] = False
+                result["failed"][".".join(path)] = (
+                    "No result reported" if outcome is None else outcome.status_info
+                )
+        return result
+
+    response = await async_gather_panels(coordinators, apply)
+    _LOGGER.debug(
+        "Applied %s profile values to %s panels, %s failed",
+        len(profile),
+        len(coordinators),
+        response["failed"],
+    )
+    return response
+
+
+@callback
+def _async_query_history(hass: HomeAssistant, call: ServiceCall):
+    """Return the recorded changes below a path, and optionally past values.
+
+    Only the history kept in memory is read; no panel is contacted.
+    """
+    coordinators = async_target_coordinators(hass, call)
+    prefix = call.data[ATTR_PATH]
+    since = (dt_util.utcnow() - call.data[ATTR_SINCE]).timestamp()
+    at = call.data.get(ATTR_AT)
+    panels = {}
+    for coordinator in coordinators:
+        changes = []
+        for changed_at, path, value in coordinator.history.changes(prefix, since):
+            change = {
+                "at": dt_util.utc_from_timestamp(changed_at).isoformat(),
+                "path": ".".join(path),
+                "value": None if value is REMOVED else value,
+            }
+            if value is REMOVED:
+                change["removed"] = True
+            changes.append(change)
+        result = {"name": coordinator.panel.name, "changes": changes}
+        if at is not None:
+            state = coordinator.history.state_at(
+                dt_util.as_utc(at).timestamp(), prefix
+            )
+            result["state"] = (
+                None
+                if state is None
+                else {".".join(path): value for path, value in state.items()}
+            )
+        panels[coordinator.host] = result
+    return {"panels": panels}
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the integration's services."""
+
+    async def async_bulk_set(call: ServiceCall):
+        return await _async_bulk_set(hass, call)
+
+    async def async_apply_profile(call: ServiceCall):
+        return await _async_apply_profile(hass, call)
+
+    @callback
+    def async_query_history(call: ServiceCall):
+        return _async_query_history(hass, call)
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_BULK_SET,
+        async_bulk_set,
+        schema=BULK_SET_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_APPLY_PROFILE,
+        async_apply_profile,
+        schema=APPLY_PROFILE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_QUERY_HISTORY,
+        async_query_history,
+        schema=QUERY_HISTORY_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
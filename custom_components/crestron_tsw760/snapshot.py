@@ -0,0 +1,65 @@
+"""Persist the last good snapshot of a panel for warm starts."""
+
+from dataclasses import dataclass
+
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN, SNAPSHOT_SAVE_DELAY, SNAPSHOT_VERSION
+from .descriptors import descriptors_from_json, descriptors_to_json
+
+
+@dataclass(frozen=True, slots=True)
+class Snapshot:
+    """A stored device tree and the leaves discovered in the full tree.
+
+    ``schema`` is None when the panel has not been discovered yet.
+    """
+
+    data: dict
+    saved_at: str | None
+    schema: tuple | None
+
+
+class SnapshotStore:
+    """Save a panel's filtered device tree so setup can start from it.
+
+    Saves are debounced: every successful poll schedules one, but the
+    file is written at most once per ``SNAPSHOT_SAVE_DELAY`` with the
+    latest tree, and once more when Home Assistant stops.
+    """
+
+    def __init__(self, hass, entry_id):
+        """Initialize the store."""
+        self._store = Store(hass, SNAPSHOT_VERSION, f"{DOMAIN}.{entry_id}.snapshot")
+        self._data = None
+        self._schema = None
+
+    async def async_load(self):
+        """Return the last Snapshot, or None."""
+        stored = await self._store.async_load()
+        if not isinstance(stored, dict) or not isinstance(stored.get("data"), dict):
+            return None
+        schema = stored.get("schema")
+        if isinstance(schema, list):
+            schema = descriptors_from_json(schema)
+        else:
+            schema = None
+        return Snapshot(stored["data"], stored.get("saved_at"), schema)
+
+    def async_schedule_save(self, data, schema=None):
+        """Save ``data`` and the discovered ``schema`` after the debounce delay."""
+        self._data = data
+        self._schema = schema
+        self._store.async_delay_save(self._data_to_save, SNAPSHOT_SAVE_DELAY)
+
+    def _data_to_save(self):
+        """Return the stored form of the latest snapshot."""
+        stored = {"saved_at": dt_util.utcnow().isoformat(), "data": self._data}
+        if self._schema is not None:
+            stored["schema"] = descriptors_to_json(self._schema)
+        return stored
+
+    async def async_remove(self):
+        """Delete the stored snapshot."""
+        await self._store.async_remove()
@@ -1,14 +1,14 @@
 """Switch Component."""
 
-import json
 import logging
 
 import aiohttp
 
 from homeassistant.components.switch import SwitchEntity
+from homeassistant.const import EntityCategory
 
-from . import CrestronEntity
-from .const import DOMAIN, ENTITIES_TO_EXPOSE
+from . import CrestronDiagnosticEntity, CrestronEntity, async_platform_descriptors
+from .const import DOMAIN
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -17,100 +17,61 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
     """Set up the Crestron switch platform."""
 
     coordinator = hass.data[DOMAIN][config_entry.entry_id]
-    name = config_entry.data.get("name", "default_name")
     entities = [
-        CrestronSwitch(
-            coordinator,
-            f"{name} {entity['name']}",
-            entity["value_path"],
-            f"{name}_{entity['name']}".replace(" ", "_").lower(),
-            config_entry,
-        )
-        for entity in ENTITIES_TO_EXPOSE
-        if entity["type"] == "switch"
+        CrestronSwitch(coordinator, coordinator.panel, descriptor)
+        for descriptor in async_platform_descriptors(hass, config_entry, "switch")
     ]
+    entities.append(
+        CrestronTraceSwitch(coordinator, coordinator.panel, "Trace Requests", "trace")
+    )
     async_add_entities(entities)
 
 
 class CrestronSwitch(CrestronEntity, SwitchEntity):
     """Representation of a Crestron Switch entity."""
 
-    def __init__(self, coordinator, name, value_path, entity_id, config_entry):
-        """Initialize the CrestronSwitch entity."""
-        super().__init__(coordinator, name, value_path, entity_id, config_entry)
-        self._attr_name = name
-        self._entity_id = entity_id
-        self._value_path = value_path
-        self._attr_is_on = self._extract_value()
-
-    @property
-    def unique_id(self):
-        """Return a unique ID for the entity."""
-        return f"{self._entity_id}_{self._attr_name}"
-
-    @property
-    def name(self):
-        """Return the name of the entity."""
-        return self._attr_name
-
     @property
     def is_on(self):
         """Return true if the switch is on."""
-        return self._attr_is_on
+        return self._extract_value()
 
     async def async_turn_on(self, **kwargs):
         """Turn the switch on."""
-        self._attr_is_on = True
         await self.async_update_api(True)
-        self.async_write_ha_state()
 
     async def async_turn_off(self, **kwargs):
         """Turn the switch off."""
-        self._attr_is_on = False
         await self.async_update_api(False)
-        self.async_write_ha_state()
 
     async def async_update_api(self, state: bool) -> None:
         """Update the API with the new switch state."""
-        api_url = f"http://{self.coordinator.host}/Device"
-        payload = self._create_payload(state)
         try:
             _LOGGER.debug("Setting state for %s to %s", self._attr_name, state)
-
-            async with (
-                aiohttp.ClientSession() as session,
-                session.post(api_url, json=payload) as response,
-            ):
-                response.raise_for_status()
-                # Fetch additional information from the device
-                response_text = await response.text()
-                _LOGGER.debug("Received device response: %s", response_text)
-                response_data = json.loads(response_text, strict=False)
-
-                _LOGGER.debug("Set state response: %s", response_data)
-                await self._handle_response(response_data)
+            outcome = await self.coordinator.writer.async_write(self.value_path, state)
+            self._handle_result(outcome)
 
         except aiohttp.ClientError:
             _LOGGER.exception("Failed to set state for %s.", self._attr_name)
 
-    def _create_payload(self, state: bool):
-        """Create the payload for the API request."""
-        payload = {}
-        current_level = payload
-        for key in self.value_path:
-            current_level[key] = {}
-            previous_level = current_level
-            current_level = current_level[key]
-        previous_level[self.value_path[-1]] = state
-        return payload
-
-    async def _handle_response(self, response_data):
-        """Handle the response from the API."""
-        for action in response_data.get("Actions", []):
-            for result in action.get("Results", []):
-                if result.get("StatusId") != 0:
-                    _LOGGER.error(
-                        "Failed to set property %s. Error: %s",
-                        result.get("Property"),
-                        result.get("StatusInfo"),
-                    )
+
+class CrestronTraceSwitch(CrestronDiagnosticEntity, SwitchEntity):
+    """Switch capturing the panel's requests for its diagnostics download."""
+
+    _attr_entity_category = EntityCategory.CONFIG
+    _attr_icon = "mdi:bug"
+
+    @property
+    def is_on(self):
+        """Return whether requests are being captured."""
+        return self.coordinator.client.trace.enabled
+
+    async def async_turn_on(self, **kwargs):
+        """Start capturing, dropping what an earlier capture kept."""
+        self.coordinator.client.trace.clear()
+        self.coordinator.client.trace.enabled = True
+        self.async_write_ha_state()
+
+    async def async_turn_off(self, **kwargs):
+        """Stop capturing; the captured requests stay downloadable."""
+        self.coordinator.client.trace.enabled = False
+        self.async_write_ha_state()
@@ -0,0 +1,76 @@
+"""Rolling timing histograms for the phases of polls and writes."""
+
+from collections import deque
+from contextlib import contextmanager
+import time
+
+from .const import TIMING_WINDOW
+
+_EMPTY_SUMMARY = {"count": 0, "p50": None, "p95": None, "max": None, "last": None}
+
+
+class RollingHistogram:
+    """Keep the most recent samples of a duration."""
+
+    __slots__ = ("_samples", "count")
+
+    def __init__(self, size=TIMING_WINDOW):
+        """Initialize the histogram."""
+        self._samples = deque(maxlen=size)
+        self.count = 0
+
+    def add(self, seconds):
+        """Record a sample."""
+        self._samples.append(seconds)
+        self.count += 1
+
+    def summary(self):
+        """Return p50, p95 and max of the window in milliseconds."""
+        if not self._samples:
+            return dict(_EMPTY_SUMMARY)
+        ordered = sorted(self._samples)
+        size = len(ordered)
+        return {
+            "count": self.count,
+            "p50": round(ordered[int(size * 0.5)] * 1000, 2),
+            "p95": round(ordered[min(int(size * 0.95), size - 1)] * 1000, 2),
+            "max": round(ordered[-1] * 1000, 2),
+            "last": round(self._samples[-1] * 1000, 2),
+        }
+
+
+class PhaseTimings:
+    """Rolling histograms keyed by phase name (``poll_wait``, ...)."""
+
+    def __init__(self, size=TIMING_WINDOW):
+        """Initialize the timings."""
+        self._size = size
+        self._histograms = {}
+
+    def record(self, phase, seconds):
+        """Record how long one run of ``phase`` took."""
+        histogram = self._histograms.get(phase)
+        if histogram is None:
+            histogram = self._histograms[phase] = RollingHistogram(self._size)
+        histogram.add(seconds)
+
+    @contextmanager
+    def measure(self, phase):
+        """Time the enclosed block, including when it raises."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(phase, time.perf_counter() - start)
+
+    def get(self, phase):
+        """Return the summary of one phase."""
+        histogram = self._histograms.get(phase)
+        return histogram.summary() if histogram is not None else dict(_EMPTY_SUMMARY)
+
+    def summary(self):
+        """Return the summary of every phase seen so far."""
+        return {
+            phase: histogram.summary()
+            for phase, histogram in sorted(self._histograms.items())
+        }
@@ -0,0 +1,131 @@
+"""Keep the most recent requests to a panel for troubleshooting."""
+
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+import hashlib
+import json
+import time
+
+from .const import TRACE_BODY_LIMIT, TRACE_SIZE
+
+
+@dataclass(frozen=True, slots=True)
+class TraceEntry:
+    """One request and the panel's response, with bodies truncated."""
+
+    at: float
+    method: str
+    path: str
+    status: int | None
+    wait_ms: float | None
+    duration_ms: float
+    request_body: str | None
+    response_body: str
+    response_bytes: int
+    response_hash: str | None
+    error: str | None
+
+
+class TraceCapture:
+    """Collect one exchange while it is in progress."""
+
+    __slots__ = (
+        "_body",
+        "_digest",
+        "_limit",
+        "_start",
+        "at",
+        "error",
+        "method",
+        "path",
+        "request_body",
+        "response_bytes",
+        "status",
+        "wait",
+    )
+
+    def __init__(self, method, path, payload, limit):
+        """Start capturing a request."""
+        self.at = time.time()
+        self._start = time.perf_counter()
+        self._limit = limit
+        self._body = bytearray()
+        self._digest = hashlib.blake2b(digest_size=16)
+        self.method = method.upper()
+        self.path = path
+        self.request_body = None if payload is None else json.dumps(payload)[:limit]
+        self.status = None
+        self.wait = None
+        self.response_bytes = 0
+        self.error = None
+
+    def respond(self, status):
+        """Note the status once the response headers arrived."""
+        self.status = status
+        self.wait = time.perf_counter() - self._start
+
+    def feed(self, chunk):
+        """Add a chunk of the response body."""
+        self.response_bytes += len(chunk)
+        self._digest.update(chunk)
+        if len(self._body) < self._limit:
+            self._body += chunk[: self._limit - len(self._body)]
+
+    def entry(self):
+        """Return the finished exchange."""
+        return TraceEntry(
+            at=self.at,
+            method=self.method,
+            path=self.path,
+            status=self.status,
+            wait_ms=None if self.wait is None else round(self.wait * 1000, 2),
+            duration_ms=round((time.perf_counter() - self._start) * 1000, 2),
+            request_body=self.request_body,
+            response_body=self._body.decode(errors="replace"),
+            response_bytes=self.response_bytes,
+            response_hash=self._digest.hexdigest() if self.response_bytes else None,
+            error=self.error,
+        )
+
+
+class ExchangeTrace:
+    """Ring buffer of a panel's most recent requests.
+
+    Capturing is off by default and costs nothing then; it is switched on
+    per panel at runtime. Only the last ``size`` exchanges are kept, each
+    with at most ``body_limit`` bytes of the request and response bodies
+    and a hash of the whole response body.
+    """
+
+    def __init__(self, size=TRACE_SIZE, body_limit=TRACE_BODY_LIMIT):
+        """Initialize the trace."""
+        self.enabled = False
+        self._body_limit = body_limit
+        self._entries = deque(maxlen=size)
+
+    @contextmanager
+    def capture(self, method, path, payload=None):
+        """Capture the exchange run in the block, yielding None when off."""
+        if not self.enabled:
+            yield None
+            return
+        capture = TraceCapture(method, path, payload, self._body_limit)
+        try:
+            yield capture
+        except BaseException as err:
+            capture.error = f"{type(err).__name__}: {err}"
+            raise
+        finally:
+            self._entries.append(capture.entry())
+
+    def clear(self):
+        """Forget the captured exchanges."""
+        self._entries.clear()
+
+    def summary(self):
+        """Return the captured exchanges, oldest first, e.g. for diagnostics."""
+        return {
+            "enabled": self.enabled,
+            "exchanges": [asdict(entry) for entry in self._entries],
+        }
@@ -0,0 +1,210 @@
+"""Coalesce property writes to a Crestron panel."""
+
+import asyncio
+from dataclasses import dataclass
+import logging
+import time
+
+from .commands import PRIORITY_WRITE, write_priority
+from .const import WRITE_DEBOUNCE, WRITE_SUCCESS_STATUS_IDS
+from .paths import build_payload, merge_tree
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class WriteOutcome:
+    """Result the panel reported for one written property."""
+
+    status_id: int | None
+    status_info: str | None
+
+    @property
+    def success(self):
+        """Return whether the panel accepted the value."""
+        return self.status_id in WRITE_SUCCESS_STATUS_IDS
+
+
+def parse_write_results(response_data):
+    """Map the ``Actions[].Results[]`` of a write response by value path.
+
+    Each result names the parent object in ``Path`` (``Device.Display.Lcd``)
+    and the written leaf in ``Property`` (``Brightness``). Malformed entries
+    are ignored, leaving their paths ambiguous to the caller.
+    """
+    outcomes = {}
+    if not isinstance(response_data, dict):
+        return outcomes
+    for action in response_data.get("Actions") or []:
+        if not isinstance(action, dict):
+            continue
+        for result in action.get("Results") or []:
+            if not isinstance(result, dict):
+                continue
+            parent = result.get("Path")
+            prop = result.get("Property")
+            if not isinstance(parent, str) or not isinstance(prop, str):
+                continue
+            outcomes[(*parent.split("."), prop)] = WriteOutcome(
+                result.get("StatusId"), result.get("StatusInfo")
+            )
+    return outcomes
+
+
+class WriteCoalescer:
+    """Debounce and merge writes to a panel into a single POST.
+
+    Rapid writes to the same value path keep only the latest value, and
+    writes to different paths that are pending together are deep-merged
+    into one ``/Device`` payload. Every caller waiting on a path receives
+    the panel's result for that path.
+
+    Batches wait in the panel's command queue, still taking newer values,
+    until they get a slot. Device operations such as standby skip the
+    debounce and are queued ahead of other writes.
+
+    After each POST ``on_results`` is called with the confirmed
+    ``{path: value}`` writes, the failed paths and the paths the panel
+    did not report on.
+    """
+
+    def __init__(self, hass, client, on_results, delay=WRITE_DEBOUNCE):
+        """Initialize the coalescer."""
+        self._hass = hass
+        self._client = client
+        self._on_results = on_results
+        self._delay = delay
+        self._pending = {}
+        self._pending_since = None
+        self._timer = None
+        # Priorities of the send tasks waiting for a queue slot
+        self._queued = []
+        self._tasks = set()
+        self.stats = {"writes_requested": 0, "writes_superseded": 0, "posts": 0}
+
+    async def async_write(self, value_path, value, immediate=False):
+        """Queue a write and return the panel's result for its path.
+
+        The result is the path's WriteOutcome, or None when the panel did
+        not report one. ``immediate`` skips the debounce, like device
+        operations do. While the panel's circuit is open this raises
+        ``CircuitOpenError`` at once instead of queueing the write.
+        """
+        path = tuple(value_path)
+        outcomes = await self.async_write_many({path: value}, immediate)
+        return outcomes[path]
+
+    async def async_write_many(self, values, immediate=False):
+        """Queue writes to several paths and return ``{path: outcome}``.
+
+        The writes are sent together, in the same POST.
+        """
+        if not values:
+            return {}
+        self._client.breaker.raise_if_open()
+        if not self._pending:
+            self._pending_since = time.perf_counter()
+        futures = {}
+        for value_path, value in values.items():
+            path = tuple(value_path)
+            futures[path] = self._hass.loop.create_future()
+            self.stats["writes_requested"] += 1
+            if path in self._pending:
+                self.stats["writes_superseded"] += 1
+                waiters = self._pending[path][1]
+            else:
+                waiters = []
+            waiters.append(futures[path])
+            self._pending[path] = (value, waiters)
+        if self._timer is not None:
+            self._timer.cancel()
+        priority = min(write_priority(pending) for pending in self._pending)
+        delay = 0 if immediate or priority < PRIORITY_WRITE else self._delay
+        self._timer = self._hass.loop.call_later(delay, self._flush, priority)
+        with self._client.timings.measure("write_total"):
+            outcomes = await asyncio.gather(*futures.values())
+        return dict(zip(futures, outcomes, strict=True))
+
+    def _take_batch(self):
+        """Return the pending writes and start a new batch."""
+        self._client.timings.record(
+            "write_debounce", time.perf_counter() - self._pending_since
+        )
+        batch, self._pending = self._pending, {}
+        return batch
+
+    def _flush(self, priority):
+        """Queue the pending batch once the debounce delay has passed.
+
+        A batch already waiting for a slot takes the new writes along,
+        unless they need a better place in the queue.
+        """
+        self._timer = None
+        if any(queued <= priority for queued in self._queued):
+            return
+        task = self._hass.async_create_task(self._async_send_pending(priority))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def async_flush(self):
+        """Send pending writes immediately and wait for every send to finish.
+
+        Called on shutdown, so no send is left running once the client is
+        closed.
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._pending:
+            await self._async_send_pending(
+                min(write_priority(path) for path in self._pending)
+            )
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def _async_send_pending(self, priority):
+        """Wait for a queue slot, then send whatever is pending by then."""
+        self._queued.append(priority)
+        queued = True
+        try:
+            async with self._client.queue.async_slot(priority):
+                self._queued.remove(priority)
+                queued = False
+                if self._pending:
+                    await self._async_send(self._take_batch())
+        finally:
+            if queued:
+                self._queued.remove(priority)
+
+    async def _async_send(self, batch):
+        """POST a batch of writes and fan the results out to the waiters."""
+        payload = {}
+        for path, (value, _) in batch.items():
+            merge_tree(payload, build_payload(path, value))
+        self.stats["posts"] += 1
+        _LOGGER.debug("Writing %s values to %s", len(batch), self._client.host)
+        try:
+            response_data = await self._client.async_post_json("/Device", payload)
+        except Exception as err:  # noqa: BLE001 - handed to every waiting caller
+            for _, waiters in batch.values():
+                for waiter in waiters:
+                    if not waiter.done():
+                        waiter.set_exception(err)
+            self._on_results({}, list(batch), [])
+            return
+        outcomes = parse_write_results(response_data)
+        confirmed = {}
+        failed = []
+        ambiguous = []
+        for path, (value, waiters) in batch.items():
+            outcome = outcomes.get(path)
+            if outcome is None:
+                ambiguous.append(path)
+            elif outcome.success:
+                confirmed[path] = value
+            else:
+                failed.append(path)
+            for waiter in waiters:
+                if not waiter.done():
+                    waiter.set_result(outcome)
+        self._on_results(confirmed, failed, ambiguous)
@@ -0,0 +1,7 @@
+"""Shared test setup for the Crestron TSW-760 integration."""
+
+import os
+import sys
+
+# Import the integration as ``custom_components.crestron_tsw760``
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
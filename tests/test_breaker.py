@@ -0,0 +1,128 @@
+"""Tests for the per-panel circuit breaker."""
+
+import asyncio
+
+from aiohttp import web
+import pytest
+
+from custom_components.crestron_tsw760 import breaker as breaker_module
+from custom_components.crestron_tsw760.api import CrestronApiClient
+from custom_components.crestron_tsw760.breaker import (
+    STATE_CLOSED,
+    STATE_HALF_OPEN,
+    STATE_OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+)
+
+
+class FakeClock:
+    """Stand-in for the ``time`` module with a settable monotonic clock."""
+
+    def __init__(self):
+        """Start the clock at zero."""
+        self.now = 0.0
+
+    def monotonic(self):
+        """Return the current time."""
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Control the time seen by the breaker."""
+    fake = FakeClock()
+    monkeypatch.setattr(breaker_module, "time", fake)
+    return fake
+
+
+def trip(breaker):
+    """Fail requests until the circuit opens."""
+    for _ in range(3):
+        breaker.record_failure(OSError("unreachable"))
+
+
+def test_opens_after_threshold(clock):
+    """Consecutive failures open the circuit, which then rejects requests."""
+    breaker = CircuitBreaker("panel", threshold=3, reset_timeout=30)
+    breaker.record_failure(OSError())
+    breaker.record_success()
+    breaker.record_failure(OSError())
+    breaker.record_failure(OSError())
+    assert breaker.state == STATE_CLOSED
+    assert breaker.record_failure(OSError()) is True
+    assert breaker.state == STATE_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.raise_if_open()
+    assert breaker.stats["trips"] == 1
+    assert breaker.stats["rejected"] == 1
+
+
+def test_probe_closes_or_backs_off(clock):
+    """After the reset timeout one probe decides, doubling the wait on failure."""
+    breaker = CircuitBreaker(
+        "panel", threshold=3, reset_timeout=30, max_reset_timeout=50
+    )
+    trip(breaker)
+    clock.now = 30
+    assert breaker.probe_due
+    breaker.raise_if_open()
+    breaker.begin_probe()
+    assert breaker.state == STATE_HALF_OPEN
+    # Requests arriving during the probe are left to wait for it
+    breaker.raise_if_open()
+    breaker.record_failure(OSError())
+    assert breaker.state == STATE_OPEN
+    assert breaker.summary()["reset_timeout"] == 50
+    clock.now = 79
+    with pytest.raises(CircuitOpenError):
+        breaker.raise_if_open()
+    clock.now = 80
+    breaker.begin_probe()
+    breaker.record_success()
+    assert breaker.state == STATE_CLOSED
+    assert breaker.summary()["reset_timeout"] == 30
+
+
+def test_aborted_probe_allows_the_next(clock):
+    """A cancelled probe reopens the circuit with the next probe due at once."""
+    breaker = CircuitBreaker("panel", threshold=3, reset_timeout=30)
+    trip(breaker)
+    clock.now = 30
+    breaker.begin_probe()
+    breaker.abort_probe()
+    assert breaker.state == STATE_OPEN
+    assert breaker.probe_due
+
+
+def test_requests_wait_for_the_probe(clock):
+    """Concurrent requests are held while the circuit is probed, not rejected."""
+
+    async def run():
+        async def answer(request):
+            await asyncio.sleep(0.01)
+            return web.json_response({"Device": {}})
+
+        app = web.Application()
+        app.router.add_get("/{tail:.*}", answer)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        client = CrestronApiClient(f"127.0.0.1:{runner.addresses[0][1]}")
+        try:
+            trip(client.breaker)
+            clock.now = 30
+            results = await asyncio.gather(
+                *(client.async_get_json(f"/Device/Part{i}") for i in range(5)),
+                return_exceptions=True,
+            )
+        finally:
+            await client.async_close()
+            await runner.cleanup()
+        assert results == [{"Device": {}}] * 5
+        assert client.breaker.state == STATE_CLOSED
+        assert client.breaker.stats["probes"] == 1
+        assert client.breaker.stats["rejected"] == 0
+
+    asyncio.run(run())
@@ -0,0 +1,109 @@
+"""Tests for the per-panel command queue."""
+
+import asyncio
+
+from custom_components.crestron_tsw760.commands import (
+    PRIORITY_OPERATION,
+    PRIORITY_POLL,
+    PRIORITY_WRITE,
+    CommandQueue,
+    write_priority,
+)
+
+
+def test_write_priority():
+    """Device operations go ahead of settings."""
+    assert write_priority(("Device", "DeviceOperations", "Reboot")) == (
+        PRIORITY_OPERATION
+    )
+    assert write_priority(("Device", "Display", "Lcd", "Brightness")) == (
+        PRIORITY_WRITE
+    )
+
+
+async def send(queue, name, priority, order, release):
+    """Hold a queue slot until ``release`` is set, noting the order."""
+    async with queue.async_slot(priority):
+        order.append(name)
+        await release.wait()
+
+
+def test_serves_by_priority_then_arrival():
+    """Waiting requests go lowest priority value first, then in order."""
+
+    async def run():
+        queue = CommandQueue(limit=1)
+        order = []
+        release = asyncio.Event()
+        tasks = [
+            asyncio.create_task(send(queue, name, priority, order, release))
+            for name, priority in (
+                ("poll-1", PRIORITY_POLL),
+                ("poll-2", PRIORITY_POLL),
+                ("write", PRIORITY_WRITE),
+                ("standby", PRIORITY_OPERATION),
+                ("poll-3", PRIORITY_POLL),
+            )
+        ]
+        await asyncio.sleep(0)
+        assert order == ["poll-1"]
+        assert queue.depth == 4
+        release.set()
+        await asyncio.gather(*tasks)
+        assert order == ["poll-1", "standby", "write", "poll-2", "poll-3"]
+        assert queue.stats["jumped"] == 2
+        assert queue.in_flight == 0
+
+    asyncio.run(run())
+
+
+def test_limit_and_reentry():
+    """At most ``limit`` slots are held; a holder does not queue again."""
+
+    async def run():
+        queue = CommandQueue(limit=2)
+        order = []
+        release = asyncio.Event()
+
+        async def nested():
+            async with queue.async_slot():
+                async with queue.async_slot():
+                    order.append("nested")
+
+        tasks = [
+            asyncio.create_task(send(queue, f"poll-{i}", PRIORITY_POLL, order, release))
+            for i in range(3)
+        ]
+        await asyncio.sleep(0)
+        assert order == ["poll-0", "poll-1"]
+        assert queue.in_flight == 2
+        release.set()
+        await asyncio.gather(*tasks)
+        await asyncio.wait_for(nested(), 1)
+        assert order[-1] == "nested"
+        assert queue.in_flight == 0
+
+    asyncio.run(run())
+
+
+def test_cancelled_waiter_is_removed():
+    """A request cancelled while waiting leaves the queue consistent."""
+
+    async def run():
+        queue = CommandQueue(limit=1)
+        order = []
+        release = asyncio.Event()
+        first = asyncio.create_task(send(queue, "a", PRIORITY_POLL, order, release))
+        await asyncio.sleep(0)
+        waiting = asyncio.create_task(send(queue, "b", PRIORITY_POLL, order, release))
+        await asyncio.sleep(0)
+        waiting.cancel()
+        await asyncio.gather(waiting, return_exceptions=True)
+        assert queue.depth == 0
+        release.set()
+        await first
+        await send(queue, "c", PRIORITY_POLL, order, release)
+        assert order == ["a", "c"]
+        assert queue.in_flight == 0
+
+    asyncio.run(run())
@@ -0,0 +1,144 @@
+"""Tests for the panel coordinator against the in-process simulator."""
+
+import asyncio
+import contextlib
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import device_registry as dr, entity_registry as er
+
+from custom_components.crestron_tsw760.const import DOMAIN
+from custom_components.crestron_tsw760.coordinator import (
+    CrestronDataUpdateCoordinator,
+)
+from tools.tsw760_simulator import PanelSimulator
+
+BRIGHTNESS = ("Device", "Display", "Lcd", "Brightness")
+STATE = ("Device", "Display", "CurrentState")
+
+
+@contextlib.asynccontextmanager
+async def panel_coordinator(config_dir, **options):
+    """Yield a refreshed coordinator for a simulated panel, and the simulator."""
+    simulator = PanelSimulator(**options)
+    port = await simulator.async_start("127.0.0.1", 0)
+    hass = HomeAssistant(str(config_dir))
+    hass.data[DOMAIN] = {}
+    await dr.async_load(hass)
+    await er.async_load(hass)
+    coordinator = CrestronDataUpdateCoordinator(hass, f"127.0.0.1:{port}", "Panel")
+    coordinator.register_path(BRIGHTNESS)
+    try:
+        await coordinator.async_refresh()
+        yield coordinator, simulator
+    finally:
+        if not coordinator._shutdown_requested:
+            await coordinator.async_shutdown()
+        await simulator.async_stop()
+        await hass.async_stop(force=True)
+
+
+def test_no_refresh_after_shutdown(tmp_path):
+    """Write results flushed on unload patch the cache but fetch nothing."""
+
+    async def run():
+        async with panel_coordinator(tmp_path) as (coordinator, simulator):
+            gets = simulator.stats["gets"]
+            await coordinator.async_shutdown()
+            coordinator.async_apply_write_results(
+                {BRIGHTNESS: 10}, set(), {("Device", "Display", "Lcd", "Contrast")}
+            )
+            coordinator._async_push_state_changed(False)
+            await coordinator.hass.async_block_till_done()
+            assert coordinator.values[BRIGHTNESS] == 10
+            assert coordinator._unsub_refresh is None
+            assert coordinator.client._session is None
+            assert simulator.stats["gets"] == gets
+
+    asyncio.run(run())
+
+
+def test_write_results_patch_the_cache(tmp_path):
+    """Confirmed writes are applied at once; unreported ones are re-fetched."""
+
+    async def run():
+        async with panel_coordinator(tmp_path) as (coordinator, simulator):
+            panel = simulator.panel(coordinator.host)
+            gets = simulator.stats["gets"]
+            coordinator.async_apply_write_results({BRIGHTNESS: 10}, set(), set())
+            assert coordinator.values[BRIGHTNESS] == 10
+            assert coordinator.data["Device"]["Display"]["Lcd"]["Brightness"] == 10
+            assert simulator.stats["gets"] == gets
+            # The panel did not report on the write, and applied another value
+            panel["tree"]["Device"]["Display"]["Lcd"]["Brightness"] = 55
+            coordinator.async_apply_write_results({}, set(), {BRIGHTNESS})
+            await coordinator.hass.async_block_till_done()
+            assert coordinator.values[BRIGHTNESS] == 55
+
+    asyncio.run(run())
+
+
+def test_polls_planned_subtrees(tmp_path):
+    """Only the subtrees holding registered paths are fetched."""
+
+    async def run():
+        async with panel_coordinator(tmp_path) as (coordinator, simulator):
+            assert coordinator.subtrees_supported
+            assert set(coordinator._subtrees) == {
+                ("Device", "Display"),
+                ("Device", "DeviceInfo"),
+            }
+            assert set(coordinator.data["Device"]) == {"Display", "DeviceInfo"}
+            assert coordinator.values[BRIGHTNESS] is not None
+
+    asyncio.run(run())
+
+
+def test_falls_back_to_the_full_tree(tmp_path):
+    """A subtree the panel does not serve switches to polling ``/Device``."""
+
+    async def run():
+        async with panel_coordinator(tmp_path) as (coordinator, simulator):
+            missing = ("Device", "Missing", "Value")
+            coordinator.register_path(missing)
+            await coordinator.async_refresh()
+            assert coordinator.last_update_success
+            assert not coordinator.subtrees_supported
+            assert "DeviceOperations" in coordinator.data["Device"]
+            assert coordinator.values[BRIGHTNESS] is not None
+            assert coordinator.values[missing] is None
+
+    asyncio.run(run())
+
+
+def test_only_changed_entities_are_notified(tmp_path):
+    """Listeners are called for their own path changing, or for everything."""
+
+    async def run():
+        async with panel_coordinator(tmp_path) as (coordinator, simulator):
+            coordinator.register_path(STATE)
+            await coordinator.async_refresh()
+            calls = []
+            for context in (BRIGHTNESS, STATE, None):
+                coordinator.async_add_listener(
+                    lambda context=context: calls.append(context), context
+                )
+            tree = simulator.panel(coordinator.host)["tree"]
+            await coordinator.async_refresh()
+            assert calls == [None]
+            calls.clear()
+            tree["Device"]["Display"]["Lcd"]["Brightness"] = 5
+            await coordinator.async_refresh()
+            assert calls == [BRIGHTNESS, None]
+            assert coordinator.stats["changed_paths"] == 1
+            calls.clear()
+            coordinator.async_apply_pushed_changes({STATE: "Standby"})
+            assert calls == [STATE, None]
+            calls.clear()
+            # Availability changed: every entity is updated
+            simulator.error_rate = 1.0
+            await coordinator.async_refresh()
+            assert not coordinator.last_update_success
+            assert len(calls) == 3
+            assert set(calls) == {BRIGHTNESS, STATE, None}
+
+    asyncio.run(run())
@@ -0,0 +1,132 @@
+"""Tests for decoding and pruning panel responses."""
+
+import json
+import random
+
+import pytest
+
+from custom_components.crestron_tsw760.decoder import BACKENDS, PruningJsonDecoder
+
+EXCLUDED = ["CertificateStore", "Ieee8021x"]
+
+
+def decode(body, chunk_size, loads=None):
+    """Feed ``body`` in chunks and return the decoded document."""
+    decoder = PruningJsonDecoder(EXCLUDED, loads)
+    for start in range(0, len(body), chunk_size):
+        decoder.feed(body[start : start + chunk_size])
+    return decoder.close()
+
+
+def prune(data):
+    """Return ``data`` without the excluded members, pruning after decoding."""
+    if isinstance(data, dict):
+        return {key: prune(value) for key, value in data.items() if key not in EXCLUDED}
+    if isinstance(data, list):
+        return [prune(item) for item in data]
+    return data
+
+
+def random_value(rng, depth):
+    """Return a random JSON value, excluded keys and awkward strings included."""
+    kind = rng.randrange(7 if depth < 4 else 4)
+    if kind == 0:
+        return rng.choice([None, True, False, 0, -1.5, 10**6])
+    if kind in (1, 2, 3):
+        return "".join(
+            rng.choice(
+                ['"', "\\", "a", "é", "\t", ":", ",", "{", "}", "[", "]", " "]
+                + ["CertificateStore"]
+            )
+            for _ in range(rng.randrange(8))
+        )
+    if kind in (4, 5):
+        keys = ["A", "B", "CertificateStore", "Ieee8021x", 'q"uote', "back\\"]
+        return {
+            rng.choice(keys): random_value(rng, depth + 1)
+            for _ in range(rng.randrange(5))
+        }
+    return [random_value(rng, depth + 1) for _ in range(rng.randrange(4))]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 16384])
+def test_prunes_excluded_members(chunk_size):
+    """Excluded members are dropped wherever they are, other values kept."""
+    tree = {
+        "Device": {
+            "CertificateStore": {"Certificates": [{"Pem": "x" * 5000}]},
+            "NetworkAdapters": {"Ieee8021x": {"Enabled": True}, "Dhcp": True},
+            "Display": {"Name": "CertificateStore", "Tags": ["Ieee8021x"]},
+        }
+    }
+    body = json.dumps(tree).encode()
+    assert decode(body, chunk_size) == {
+        "Device": {
+            "NetworkAdapters": {"Dhcp": True},
+            "Display": {"Name": "CertificateStore", "Tags": ["Ieee8021x"]},
+        }
+    }
+
+
+@pytest.mark.parametrize("name", list(BACKENDS))
+def test_tolerates_control_characters(name):
+    """Raw control characters in strings decode like json with strict=False."""
+    body = b'{"Device": {"Name": "TSW-760\tLobby", "CertificateStore": "a\x01b"}}'
+    assert decode(body, 7, BACKENDS[name]) == {
+        "Device": {"Name": "TSW-760\tLobby"}
+    }
+
+
+@pytest.mark.parametrize("name", list(BACKENDS))
+def test_backends_accept_text(name):
+    """Backends decode the str payload of websocket text frames."""
+    assert BACKENDS[name]('{"Name": "a\tb"}') == {"Name": "a\tb"}
+
+
+@pytest.mark.parametrize("chunk_size", [16, 16384])
+def test_truncated_body_raises(chunk_size):
+    """A body cut off mid-document is reported as invalid JSON."""
+    body = json.dumps({"Device": {"CertificateStore": "x" * 100}}).encode()
+    with pytest.raises(ValueError):
+        decode(body[:-5], chunk_size)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 5, 16384])
+def test_counts_bytes(chunk_size):
+    """Received bytes and the bytes of the dropped members are counted."""
+    body = b'{"A": 1, "CertificateStore": ["x\\\\", {"y": "]"}], "B": 2}'
+    decoder = PruningJsonDecoder(EXCLUDED)
+    for start in range(0, len(body), chunk_size):
+        decoder.feed(body[start : start + chunk_size])
+    assert decoder.close() == {"A": 1, "B": 2}
+    assert decoder.bytes_received == len(body)
+    assert decoder.bytes_skipped == len(b'"CertificateStore": ["x\\\\", {"y": "]"}]')
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 16384])
+def test_keys_inside_strings_are_kept(chunk_size):
+    """Excluded keys quoted inside strings or used as values stay."""
+    tree = {
+        "Note": '{"CertificateStore": [1, 2]}',
+        "Path": "C:\\",
+        "Tags": ["Ieee8021x", "CertificateStore"],
+        "Skipped": {
+            "CertificateStore": ["\\", '"]', "[{", ", ]", ": {", {"}": "]"}],
+            "Ieee8021x": "\\",
+        },
+    }
+    body = json.dumps(tree).encode()
+    assert decode(body, chunk_size) == prune(tree)
+
+
+def test_matches_full_decode():
+    """Decoding matches pruning the full decode."""
+    rng = random.Random(760)
+    for _ in range(500):
+        tree = random_value(rng, 0)
+        body = json.dumps(
+            tree,
+            ensure_ascii=rng.random() < 0.5,
+            separators=rng.choice([(",", ":"), (", ", ": "), (" ,\n", " :\t")]),
+        ).encode()
+        assert decode(body, rng.randrange(1, 64)) == prune(tree)
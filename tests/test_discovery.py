@@ -0,0 +1,60 @@
+"""Tests for scanning an address range for panels."""
+
+import asyncio
+
+from aiohttp import web
+import pytest
+
+from custom_components.crestron_tsw760 import discovery
+from custom_components.crestron_tsw760.probe import async_probe_panel
+from tools.tsw760_simulator import PanelSimulator
+
+
+def test_hosts_in_network():
+    """Ranges expand to their host addresses, within the scan limit."""
+    assert discovery.hosts_in_network(" 10.0.4.0/30 ") == ["10.0.4.1", "10.0.4.2"]
+    assert len(discovery.hosts_in_network("10.0.4.17/22")) == 1022
+    for invalid in ("10.0.4.0/8", "panels"):
+        with pytest.raises(ValueError):
+            discovery.hosts_in_network(invalid)
+
+
+def test_scan_yields_each_panel_once(monkeypatch):
+    """Panels are found, other hosts skipped and known panels left out."""
+
+    async def run():
+        simulator = PanelSimulator()
+        port = await simulator.async_start("127.0.0.1", 0)
+        # A second panel, already set up
+        await web.TCPSite(simulator._runner, "127.0.0.4", port).start()
+        # Another web server on the panel port of the next address
+        async def greet(request):
+            return web.Response(text="Hello")
+
+        app = web.Application()
+        app.router.add_get("/{path:.*}", greet)
+        other = web.AppRunner(app)
+        await other.setup()
+        await web.TCPSite(other, "127.0.0.2", port).start()
+        monkeypatch.setattr(discovery, "PANEL_HTTP_PORT", port)
+        monkeypatch.setattr(
+            discovery,
+            "async_probe_panel",
+            lambda host, timeout: async_probe_panel(f"{host}:{port}", timeout),
+        )
+        known = simulator.panel(f"127.0.0.4:{port}")["tree"]["Device"]["DeviceInfo"]
+        try:
+            found = [
+                probe
+                async for probe in discovery.async_scan_hosts(
+                    ["127.0.0.1", "127.0.0.2", "127.0.0.3", "127.0.0.4", "127.0.0.1"],
+                    known=[known["SerialNumber"]],
+                    concurrency=2,
+                )
+            ]
+        finally:
+            await other.cleanup()
+            await simulator.async_stop()
+        assert [probe.host for probe in found] == [f"127.0.0.1:{port}"]
+
+    asyncio.run(run())
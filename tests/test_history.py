@@ -0,0 +1,73 @@
+"""Tests for the delta-encoded device tree history."""
+
+from custom_components.crestron_tsw760.history import REMOVED, TreeHistory
+
+
+def tree(brightness, state="On", **extra):
+    """Return a small device tree."""
+    return {
+        "Device": {
+            "Display": {"Lcd": {"Brightness": brightness}, "CurrentState": state},
+            **extra,
+        }
+    }
+
+
+BRIGHTNESS = ("Device", "Display", "Lcd", "Brightness")
+STATE = ("Device", "Display", "CurrentState")
+
+
+def test_state_at_rebuilds_past_trees():
+    """Any recorded time is rebuilt from its keyframe and deltas."""
+    history = TreeHistory(keyframe_interval=1000)
+    history.record(tree(50), at=100)
+    history.record(tree(60), at=110)
+    history.record(tree(60, "Off"), at=120)
+    assert history.state_at(99) is None
+    assert history.state_at(105) == {BRIGHTNESS: 50, STATE: "On"}
+    assert history.state_at(115) == {BRIGHTNESS: 60, STATE: "On"}
+    assert history.state_at(500, ("Device", "Display", "Lcd")) == {BRIGHTNESS: 60}
+    assert list(history.changes()) == [(110, BRIGHTNESS, 60), (120, STATE, "Off")]
+    assert list(history.changes(since=115)) == [(120, STATE, "Off")]
+    # Identical trees record nothing
+    history.record(tree(60, "Off"), at=130)
+    assert history.summary()["deltas"] == 2
+
+
+def test_subtrees_and_single_values():
+    """A recorded subtree removes its missing leaves; values patch leaves."""
+    history = TreeHistory()
+    history.record(tree(50, Audio={"Volume": 10}), at=100)
+    history.record({"Lcd": {}}, ("Device", "Display", "Lcd"), at=110)
+    history.record_values({("Device", "Audio"): {"Volume": 20}}, at=120)
+    assert history.state_at(120) == {STATE: "On", ("Device", "Audio", "Volume"): 20}
+    assert list(history.changes(("Device", "Display"))) == [(110, BRIGHTNESS, REMOVED)]
+    export = history.export()
+    assert export[0]["keyframe"]["Device.Display.Lcd.Brightness"] == 50
+    assert export[0]["deltas"][0] == {
+        "at": 110,
+        "set": {},
+        "removed": ["Device.Display.Lcd.Brightness"],
+    }
+
+
+def test_keyframes_and_window():
+    """New segments start on schedule and old ones leave the window."""
+    history = TreeHistory(window=100, keyframe_interval=30)
+    for step in range(10):
+        history.record(tree(step), at=step * 20)
+    summary = history.summary()
+    assert summary["segments"] < 10
+    assert summary["oldest"] >= 180 - 100 - 30
+    assert history.state_at(180) == {BRIGHTNESS: 9, STATE: "On"}
+    assert history.state_at(0) is None
+
+
+def test_budget_drops_oldest_segments():
+    """The history stays within its byte budget, keeping the latest state."""
+    history = TreeHistory(budget=5000, keyframe_interval=10**9)
+    for step in range(200):
+        history.record(tree(step, Name="x" * 50), at=step)
+        assert history.size <= 5000
+    assert history.summary()["oldest"] > 0
+    assert history.state_at(199)[BRIGHTNESS] == 199
@@ -0,0 +1,127 @@
+"""Tests for the device tree path helpers."""
+
+from custom_components.crestron_tsw760.paths import (
+    PathTrie,
+    build_payload,
+    diff_flat,
+    flatten_tree,
+    get_nested_value,
+    merge_tree,
+    set_nested_value,
+)
+
+TREE = {
+    "Device": {
+        "Display": {"Lcd": {"Brightness": 40}, "CurrentState": "On"},
+        "DeviceInfo": {"Model": "TSW-760", "SerialNumber": "1234"},
+        "Audio": {"Volume": 0, "Muted": False},
+    }
+}
+
+
+def test_get_nested_value():
+    """Values are found by path, falsy ones included."""
+    assert get_nested_value(TREE, ("Device", "Display", "Lcd", "Brightness")) == 40
+    assert get_nested_value(TREE, ["Device", "Audio", "Volume"]) == 0
+    assert get_nested_value(TREE, ("Device", "Audio", "Muted")) is False
+    assert get_nested_value(TREE, ()) is TREE
+
+
+def test_get_nested_value_missing():
+    """Missing paths and paths through leaves return the default."""
+    assert get_nested_value(TREE, ("Device", "Nope")) is None
+    assert get_nested_value(TREE, ("Device", "Nope"), "x") == "x"
+    assert get_nested_value(TREE, ("Device", "Audio", "Volume", "Deeper"), 1) == 1
+    assert get_nested_value(None, ("Device",), 2) == 2
+
+
+def test_path_trie_mapping():
+    """The trie stores, counts and finds paths like a mapping."""
+    trie = PathTrie([(("Device", "Display", "Lcd", "Brightness"), "b")])
+    trie[("Device", "Display", "CurrentState")] = "s"
+    trie[["Device", "Display", "CurrentState"]] = "s2"
+    assert len(trie) == 2
+    assert ("Device", "Display", "CurrentState") in trie
+    assert ("Device", "Display") not in trie
+    assert trie.get(("Device", "Display", "CurrentState")) == "s2"
+    assert trie.get(("Device", "Audio"), "none") == "none"
+    assert set(trie) == {
+        ("Device", "Display", "Lcd", "Brightness"),
+        ("Device", "Display", "CurrentState"),
+    }
+
+
+def test_path_trie_prefix():
+    """Items and values are limited to the paths below a prefix."""
+    trie = PathTrie(
+        [
+            (("Device", "Display", "Lcd", "Brightness"), 1),
+            (("Device", "Display", "CurrentState"), 2),
+            (("Device", "Audio", "Volume"), 3),
+        ]
+    )
+    assert dict(trie.items(("Device", "Display"))) == {
+        ("Device", "Display", "Lcd", "Brightness"): 1,
+        ("Device", "Display", "CurrentState"): 2,
+    }
+    assert sorted(trie.values(("Device",))) == [1, 2, 3]
+    assert list(trie.items(("Device", "Nope"))) == []
+
+
+def test_path_trie_extract():
+    """Extracting reads every path, with None for missing ones."""
+    paths = [
+        ("Device", "Display", "Lcd", "Brightness"),
+        ("Device", "Audio", "Volume"),
+        ("Device", "Audio", "Volume", "Deeper"),
+        ("Device", "Missing", "Leaf"),
+    ]
+    trie = PathTrie((path, None) for path in paths)
+    assert trie.extract(TREE) == {
+        ("Device", "Display", "Lcd", "Brightness"): 40,
+        ("Device", "Audio", "Volume"): 0,
+        ("Device", "Audio", "Volume", "Deeper"): None,
+        ("Device", "Missing", "Leaf"): None,
+    }
+    assert trie.extract(TREE, ("Device", "Display")) == {
+        ("Device", "Display", "Lcd", "Brightness"): 40
+    }
+    for path in paths:
+        assert trie.extract(TREE)[path] == get_nested_value(TREE, path)
+
+
+def test_diff_flat():
+    """Added, removed and changed paths are reported."""
+    old = {("a",): 1, ("b",): 2, ("c",): 3}
+    new = {("a",): 1, ("b",): 5, ("d",): 4}
+    assert diff_flat(old, new) == {("b",), ("c",), ("d",)}
+    assert diff_flat(new, new) == set()
+
+
+def test_flatten_tree():
+    """Every leaf is yielded with its full path."""
+    assert dict(flatten_tree(TREE["Device"]["Display"], ("Device", "Display"))) == {
+        ("Device", "Display", "Lcd", "Brightness"): 40,
+        ("Device", "Display", "CurrentState"): "On",
+    }
+
+
+def test_build_and_merge_payloads():
+    """Payloads for several paths merge into one tree."""
+    payload = build_payload(("Device", "Display", "Lcd", "Brightness"), 50)
+    assert payload == {"Device": {"Display": {"Lcd": {"Brightness": 50}}}}
+    merge_tree(payload, build_payload(("Device", "Display", "CurrentState"), "Off"))
+    merge_tree(payload, build_payload(("Device", "Display", "Lcd", "Brightness"), 60))
+    assert payload == {
+        "Device": {"Display": {"Lcd": {"Brightness": 60}, "CurrentState": "Off"}}
+    }
+
+
+def test_set_nested_value():
+    """Missing levels are created and leaves in the way replaced."""
+    data = {"Device": {"Audio": 1}}
+    set_nested_value(data, ("Device", "Display", "Lcd", "Brightness"), 10)
+    set_nested_value(data, ("Device", "Audio", "Volume"), 20)
+    assert data == {
+        "Device": {"Display": {"Lcd": {"Brightness": 10}}, "Audio": {"Volume": 20}}
+    }
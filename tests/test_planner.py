@@ -0,0 +1,42 @@
+"""Tests for planning the subtrees to poll."""
+
+from custom_components.crestron_tsw760.planner import endpoint_url, plan_endpoints
+
+
+def test_paths_are_served_by_their_subtree():
+    """Value paths are cut down to their subtree, which is requested once."""
+    endpoints = plan_endpoints(
+        [
+            ("Device", "Display", "Lcd", "Brightness"),
+            ("Device", "Display", "CurrentState"),
+            ("Device", "Audio", "Volume"),
+        ]
+    )
+    assert endpoints == [
+        ("Device", "Audio"),
+        ("Device", "DeviceInfo"),
+        ("Device", "Display"),
+    ]
+
+
+def test_device_info_is_always_polled():
+    """The device info subtree is polled even with no value paths."""
+    assert plan_endpoints([]) == [("Device", "DeviceInfo")]
+
+
+def test_covered_prefixes_are_dropped():
+    """A prefix below a shorter planned prefix is not requested again."""
+    endpoints = plan_endpoints(
+        [("Device", "Name"), ("Device", "Display", "Lcd", "Brightness")], depth=3
+    )
+    assert endpoints == [
+        ("Device", "DeviceInfo"),
+        ("Device", "Display", "Lcd"),
+        ("Device", "Name"),
+    ]
+    assert plan_endpoints([("Device",)]) == [("Device",)]
+
+
+def test_endpoint_url():
+    """A prefix maps to the REST path of its subtree."""
+    assert endpoint_url(("Device", "Display")) == "/Device/Display"
@@ -0,0 +1,97 @@
+"""Tests for the adaptive poll interval."""
+
+import pytest
+
+from custom_components.crestron_tsw760.const import (
+    ACTIVE_POLL_COUNT,
+    ACTIVE_POLL_INTERVAL,
+    IDLE_MAX_INTERVAL,
+    OFFLINE_MAX_INTERVAL,
+    POLL_INTERVAL,
+    PUSH_CONSISTENCY_INTERVAL,
+)
+from custom_components.crestron_tsw760.polling import (
+    REASON_ACTIVE,
+    REASON_IDLE,
+    REASON_NORMAL,
+    REASON_PUSH,
+    REASON_STARTUP,
+    REASON_UNREACHABLE,
+    AdaptivePollInterval,
+)
+
+
+def started(host="10.0.0.1"):
+    """Return an interval past its first refresh."""
+    interval = AdaptivePollInterval(host)
+    interval.update(True, False)
+    return interval
+
+
+def test_first_interval_is_spread_by_host():
+    """Panels start on a stable, per-host share of the interval."""
+    intervals = [AdaptivePollInterval(f"10.0.0.{i}") for i in range(20)]
+    seconds = {interval.seconds for interval in intervals}
+    assert len(seconds) > 10
+    assert all(0.5 * POLL_INTERVAL <= s < 1.5 * POLL_INTERVAL for s in seconds)
+    assert AdaptivePollInterval("10.0.0.1").seconds == intervals[1].seconds
+    assert intervals[0].reason == REASON_STARTUP
+    # The first refresh keeps the spread
+    first = intervals[0].seconds
+    intervals[0].update(True, True)
+    assert intervals[0].seconds == first
+
+
+def test_activity_polls_quickly_then_backs_off():
+    """After a change a few quick polls follow, then idle back-off."""
+    interval = started()
+    interval.update(True, True)
+    reasons = [(interval.seconds, interval.reason)]
+    for _ in range(ACTIVE_POLL_COUNT + 6):
+        interval.update(True, False)
+        reasons.append((interval.seconds, interval.reason))
+    assert reasons[:ACTIVE_POLL_COUNT] == [
+        (ACTIVE_POLL_INTERVAL, REASON_ACTIVE)
+    ] * ACTIVE_POLL_COUNT
+    assert reasons[ACTIVE_POLL_COUNT] == (POLL_INTERVAL, REASON_NORMAL)
+    idle = [seconds for seconds, _ in reasons[ACTIVE_POLL_COUNT + 1 :]]
+    assert idle == sorted(idle)
+    assert idle[0] > POLL_INTERVAL
+    assert idle[-1] == IDLE_MAX_INTERVAL
+    assert interval.reason == REASON_IDLE
+
+
+def test_note_activity():
+    """A write switches to quick polling at once."""
+    interval = started()
+    for _ in range(5):
+        interval.update(True, False)
+    interval.note_activity()
+    assert (interval.seconds, interval.reason) == (ACTIVE_POLL_INTERVAL, REASON_ACTIVE)
+
+
+def test_unreachable_backs_off_exponentially():
+    """Failures double the interval up to the offline cap; success resets."""
+    interval = started()
+    seconds = []
+    for _ in range(12):
+        interval.update(False, False)
+        seconds.append(interval.seconds)
+    assert interval.reason == REASON_UNREACHABLE
+    assert seconds[1] == pytest.approx(2 * seconds[0])
+    assert seconds[-1] == OFFLINE_MAX_INTERVAL
+    interval.update(True, False)
+    assert interval.seconds == POLL_INTERVAL
+
+
+def test_push_slows_polling():
+    """While changes are pushed only consistency checks are polled."""
+    interval = started()
+    interval.set_push(True)
+    assert interval.reason == REASON_PUSH
+    assert interval.seconds >= 0.5 * PUSH_CONSISTENCY_INTERVAL
+    interval.note_activity()
+    interval.update(True, True)
+    assert interval.reason == REASON_PUSH
+    interval.set_push(False)
+    assert (interval.seconds, interval.reason) == (ACTIVE_POLL_INTERVAL, REASON_ACTIVE)
@@ -0,0 +1,143 @@
+"""Tests for probing panels before they are added."""
+
+import asyncio
+import functools
+import types
+
+import aiohttp
+from aiohttp import web
+import pytest
+
+from custom_components.crestron_tsw760 import probe as probe_module
+from custom_components.crestron_tsw760.probe import (
+    NotAPanelError,
+    async_probe_panel,
+    async_probe_panels,
+    cached_probe,
+    pop_probe,
+    remember_probe,
+)
+from tools.tsw760_simulator import PanelSimulator
+
+DEVICE_INFO = {"Model": "TSW-760", "SerialNumber": "1234", "MacAddress": "m"}
+
+
+async def serve(handler):
+    """Serve every GET with ``handler`` and return the runner."""
+    app = web.Application()
+    app.router.add_get("/{path:.*}", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", 0).start()
+    return runner
+
+
+def host_of(runner):
+    """Return the ``host:port`` a runner listens on."""
+    return f"127.0.0.1:{runner.addresses[0][1]}"
+
+
+def test_probe_reads_device_info():
+    """A panel serving subtrees is identified from DeviceInfo alone."""
+
+    async def run():
+        simulator = PanelSimulator()
+        port = await simulator.async_start("127.0.0.1", 0)
+        try:
+            probe = await async_probe_panel(f"127.0.0.1:{port}")
+        finally:
+            await simulator.async_stop()
+        device_info = simulator.panel(probe.host)["tree"]["Device"]["DeviceInfo"]
+        assert probe.subtrees_supported
+        assert probe.serial_number == device_info["SerialNumber"]
+        assert list(probe.data["Device"]) == ["DeviceInfo"]
+        assert simulator.stats["gets"] == 1
+
+    asyncio.run(run())
+
+
+def test_probe_falls_back_to_full_tree():
+    """Firmware without subtree endpoints is probed through ``/Device``."""
+
+    async def run():
+        async def handler(request):
+            if request.path != "/Device":
+                raise web.HTTPNotFound
+            return web.json_response({"Device": {"DeviceInfo": DEVICE_INFO}})
+
+        runner = await serve(handler)
+        try:
+            probe = await async_probe_panel(host_of(runner))
+        finally:
+            await runner.cleanup()
+        assert not probe.subtrees_supported
+        assert probe.model == "TSW-760"
+
+    asyncio.run(run())
+
+
+@pytest.mark.parametrize(
+    ("body", "content_type"),
+    [("<html></html>", "text/html"), ('{"Device": {"Name": "printer"}}', None)],
+)
+def test_other_hosts_are_not_panels(body, content_type):
+    """Hosts answering without JSON or without DeviceInfo are rejected."""
+
+    async def run():
+        async def handler(request):
+            return web.Response(text=body, content_type=content_type)
+
+        runner = await serve(handler)
+        try:
+            with pytest.raises(NotAPanelError):
+                await async_probe_panel(host_of(runner))
+        finally:
+            await runner.cleanup()
+
+    asyncio.run(run())
+
+
+def test_probes_run_concurrently_with_timeouts(monkeypatch):
+    """Every host gets its own result; a slow host times out alone."""
+    monkeypatch.setattr(
+        probe_module,
+        "async_probe_panel",
+        functools.partial(async_probe_panel, timeout=0.2),
+    )
+
+    async def run():
+        async def handler(request):
+            if request.host.startswith("localhost"):
+                await asyncio.sleep(1)
+            return web.json_response({"Device": {"DeviceInfo": DEVICE_INFO}})
+
+        runner = await serve(handler)
+        port = runner.addresses[0][1]
+        try:
+            results = await async_probe_panels(
+                [f"127.0.0.1:{port}", f"localhost:{port}", "127.0.0.1:1"]
+            )
+        finally:
+            await runner.cleanup()
+        assert results[f"127.0.0.1:{port}"].serial_number == "1234"
+        assert isinstance(results[f"localhost:{port}"], TimeoutError)
+        assert isinstance(results["127.0.0.1:1"], aiohttp.ClientError)
+
+    asyncio.run(run())
+
+
+def test_remembered_probes_are_used_once(monkeypatch):
+    """Setup takes a recent probe once; stale probes are not used."""
+    hass = types.SimpleNamespace(data={})
+    clock = types.SimpleNamespace(monotonic=lambda: 1000.0)
+    monkeypatch.setattr(probe_module, "time", clock)
+    probe = probe_module.PanelProbe(
+        "10.0.0.1", "TSW-760", "1234", "m", {}, True, probed_at=1000.0
+    )
+    remember_probe(hass, probe)
+    assert cached_probe(hass, "10.0.0.1") is probe
+    assert pop_probe(hass, "10.0.0.1") is probe
+    assert pop_probe(hass, "10.0.0.1") is None
+    remember_probe(hass, probe)
+    clock.monotonic = lambda: 1000.0 + probe_module.PROBE_MAX_AGE + 1
+    assert cached_probe(hass, "10.0.0.1") is None
@@ -0,0 +1,95 @@
+"""Tests for the panel event stream."""
+
+import asyncio
+
+import aiohttp
+from aiohttp import web
+import pytest
+
+from custom_components.crestron_tsw760.push import PushChannel, parse_changes
+
+
+def test_parse_changes():
+    """Changes are keyed by their parent path and property."""
+    message = {
+        "Changes": [
+            {"Path": "Device.Display", "Property": "CurrentState", "Value": "Off"},
+            {"Path": "Device.Display.Lcd", "Property": "Brightness", "Value": 0},
+        ]
+    }
+    assert parse_changes(message) == {
+        ("Device", "Display", "CurrentState"): "Off",
+        ("Device", "Display", "Lcd", "Brightness"): 0,
+    }
+
+
+@pytest.mark.parametrize(
+    "message",
+    [
+        None,
+        [],
+        {},
+        {"Changes": None},
+        {"Changes": ["Device.Display"]},
+        {"Changes": [{"Path": "Device.Display", "Property": "CurrentState"}]},
+        {"Changes": [{"Path": ["Device"], "Property": "Name", "Value": "x"}]},
+        {"Changes": [{"Path": "Device", "Property": None, "Value": "x"}]},
+    ],
+)
+def test_parse_changes_ignores_malformed(message):
+    """Malformed events and entries yield no changes."""
+    assert parse_changes(message) == {}
+
+
+async def start_server(status):
+    """Serve the event stream endpoint answering plain HTTP ``status``."""
+
+    async def refuse(request):
+        return web.Response(status=status)
+
+    app = web.Application()
+    app.router.add_get("/Device/Events", refuse)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    return runner
+
+
+@pytest.mark.parametrize("status", [302, 401, 403, 404, 501])
+def test_refused_upgrade_is_not_retried(status):
+    """A panel refusing the upgrade for good leaves the panel polled only."""
+
+    async def run():
+        runner = await start_server(status)
+        states = []
+        channel = PushChannel(
+            None, f"127.0.0.1:{runner.addresses[0][1]}", None, states.append
+        )
+        try:
+            await asyncio.wait_for(channel._async_run(), 1)
+        finally:
+            await channel.async_stop()
+            await runner.cleanup()
+        assert channel.supported is False
+        assert states == []
+
+    asyncio.run(run())
+
+
+@pytest.mark.parametrize("status", [429, 500, 503])
+def test_transient_refusal_is_retried(status):
+    """Server errors are raised to be retried with backoff."""
+
+    async def run():
+        runner = await start_server(status)
+        channel = PushChannel(None, f"127.0.0.1:{runner.addresses[0][1]}", None, None)
+        try:
+            with pytest.raises(aiohttp.WSServerHandshakeError):
+                await channel._async_listen()
+        finally:
+            await channel.async_stop()
+            await runner.cleanup()
+        assert channel.supported is True
+
+    asyncio.run(run())
@@ -0,0 +1,98 @@
+"""Tests for the fleet-wide poll scheduler."""
+
+import asyncio
+
+import pytest
+
+from custom_components.crestron_tsw760.scheduler import FleetScheduler, subnet_of
+
+
+@pytest.mark.parametrize(
+    ("host", "subnet"),
+    [
+        ("10.0.4.17", "10.0.4.0/24"),
+        ("10.0.4.17:8760", "10.0.4.0/24"),
+        ("[fd00::1]:80", "fd00::/64"),
+        ("panel.local", "panel.local"),
+    ],
+)
+def test_subnet_of(host, subnet):
+    """Panels are grouped by /24 or /64, hostnames on their own."""
+    assert subnet_of(host) == subnet
+
+
+async def hold(scheduler, host, started, release, due=0.0):
+    """Poll ``host`` until ``release`` is set, noting when it started."""
+    async with scheduler.async_slot(host, due):
+        started.append(host)
+        await release.wait()
+
+
+def test_idle_subnet_starts_past_saturated_one():
+    """A poll for a subnet with room is not queued behind a full subnet."""
+
+    async def run():
+        scheduler = FleetScheduler(max_concurrent=4, max_per_subnet=1)
+        started = []
+        release = asyncio.Event()
+        tasks = [
+            asyncio.create_task(hold(scheduler, f"10.0.0.{i}", started, release))
+            for i in (1, 2, 3)
+        ]
+        await asyncio.sleep(0)
+        tasks.append(asyncio.create_task(hold(scheduler, "10.0.1.1", started, release)))
+        await asyncio.sleep(0)
+        assert started == ["10.0.0.1", "10.0.1.1"]
+        assert scheduler.stats["queue_depth"] == 2
+        release.set()
+        await asyncio.gather(*tasks)
+        assert started[2:] == ["10.0.0.2", "10.0.0.3"]
+        assert scheduler.stats["in_flight"] == 0
+
+    asyncio.run(run())
+
+
+def test_global_limit_serves_most_overdue_first():
+    """Once the fleet is full, the most overdue waiting poll goes next."""
+
+    async def run():
+        scheduler = FleetScheduler(max_concurrent=1, max_per_subnet=1)
+        started = []
+        first = asyncio.Event()
+        later = asyncio.Event()
+        later.set()
+        tasks = [asyncio.create_task(hold(scheduler, "10.0.0.1", started, first))]
+        await asyncio.sleep(0)
+        for host, due in (("10.0.1.1", 5.0), ("10.0.2.1", 1.0), ("10.0.3.1", 3.0)):
+            tasks.append(
+                asyncio.create_task(hold(scheduler, host, started, later, due))
+            )
+        await asyncio.sleep(0)
+        assert started == ["10.0.0.1"]
+        first.set()
+        await asyncio.gather(*tasks)
+        assert started == ["10.0.0.1", "10.0.2.1", "10.0.3.1", "10.0.1.1"]
+
+    asyncio.run(run())
+
+
+def test_cancelled_waiter_frees_its_place():
+    """A poll cancelled while waiting does not hold up its subnet."""
+
+    async def run():
+        scheduler = FleetScheduler(max_concurrent=4, max_per_subnet=1)
+        started = []
+        release = asyncio.Event()
+        first = asyncio.create_task(hold(scheduler, "10.0.0.1", started, release))
+        await asyncio.sleep(0)
+        waiting = asyncio.create_task(hold(scheduler, "10.0.0.2", started, release))
+        await asyncio.sleep(0)
+        waiting.cancel()
+        await asyncio.gather(waiting, return_exceptions=True)
+        release.set()
+        await first
+        await hold(scheduler, "10.0.0.3", started, release)
+        assert started == ["10.0.0.1", "10.0.0.3"]
+        assert scheduler.stats["in_flight"] == 0
+
+    asyncio.run(run())
@@ -0,0 +1,234 @@
+"""Tests for the services acting on many panels."""
+
+import asyncio
+import types
+
+import pytest
+import voluptuous as vol
+
+from homeassistant.core import ServiceCall
+from homeassistant.exceptions import ServiceValidationError
+
+from custom_components.crestron_tsw760 import services
+from custom_components.crestron_tsw760.const import DOMAIN
+from custom_components.crestron_tsw760.descriptors import DESCRIPTORS
+from custom_components.crestron_tsw760.paths import PathTrie
+from custom_components.crestron_tsw760.writer import WriteOutcome
+
+BRIGHTNESS = ("Device", "Display", "Lcd", "Brightness")
+VOLUME = ("Device", "Display", "Audio", "Volume")
+OK = WriteOutcome(0, "OK")
+
+
+class FakePanel:
+    """Stand-in for a panel's coordinator and its writer."""
+
+    def __init__(self, host, data=None, outcome=OK, error=None, restored=False):
+        """Set up the panel's cached state and how it answers writes."""
+        self.host = host
+        self.panel = types.SimpleNamespace(name=f"Panel {host}")
+        self.data = data or {}
+        self.schema = PathTrie((d.value_path, d) for d in DESCRIPTORS)
+        self.restored = restored
+        self.last_update_success = True
+        self.writer = self
+        self.outcome = outcome
+        self.error = error
+        self.refreshes = 0
+        self.written = []
+
+    async def async_refresh(self):
+        """Pretend to poll the panel."""
+        self.refreshes += 1
+        self.restored = False
+
+    async def async_write(self, value_path, value, immediate=False):
+        """Record a write and answer it."""
+        outcomes = await self.async_write_many({value_path: value}, immediate)
+        return outcomes[value_path]
+
+    async def async_write_many(self, values, immediate=False):
+        """Record writes and answer them, like the coalescer does."""
+        if not values:
+            return {}
+        self.written.append(dict(values))
+        if self.error is not None:
+            raise self.error
+        return {path: self.outcome for path in values}
+
+
+def call_service(monkeypatch, handler, service, schema, data, panels):
+    """Run a service handler against ``panels``."""
+    monkeypatch.setattr(
+        services, "async_target_coordinators", lambda hass, call: panels
+    )
+    return asyncio.run(handler(None, ServiceCall(DOMAIN, service, schema(data))))
+
+
+@pytest.mark.parametrize(
+    ("value", "valid"),
+    [
+        ("Device.Display.Lcd.Brightness", True),
+        ("Device.Display", True),
+        ("Device", False),
+        ("Display.Lcd.Brightness", False),
+        ("Device..Lcd", False),
+    ],
+)
+def test_parse_value_path(value, valid):
+    """Value paths are dotted paths below ``Device``."""
+    if valid:
+        assert services.parse_value_path(value) == tuple(value.split("."))
+    else:
+        with pytest.raises(vol.Invalid):
+            services.parse_value_path(value)
+
+
+def test_gather_panels_isolates_failures():
+    """Every panel gets a result; an error fails its panel only."""
+
+    async def run():
+        running = []
+        peak = []
+
+        async def action(coordinator):
+            running.append(coordinator)
+            peak.append(len(running))
+            await asyncio.sleep(0.01)
+            running.remove(coordinator)
+            if coordinator.error is not None:
+                raise coordinator.error
+            return {"success": True}
+
+        panels = [FakePanel(f"10.0.0.{i}") for i in range(6)]
+        panels[1].error = TimeoutError()
+        panels[2].error = ValueError("garbled")
+        response = await services.async_gather_panels(panels, action, concurrency=2)
+        assert max(peak) == 2
+        assert response["succeeded"] == 4
+        assert response["failed"] == 2
+        assert response["panels"]["10.0.0.1"]["error"] == "TimeoutError"
+        assert response["panels"]["10.0.0.2"]["error"] == "garbled"
+        assert response["panels"]["10.0.0.0"]["name"] == "Panel 10.0.0.0"
+        assert "latency_ms" in response["panels"]["10.0.0.0"]
+
+    asyncio.run(run())
+
+
+def test_bulk_set(monkeypatch):
+    """One value is written to every panel, with per-panel outcomes."""
+    panels = [
+        FakePanel("10.0.0.1"),
+        FakePanel("10.0.0.2", outcome=WriteOutcome(3, "Out of range")),
+        FakePanel("10.0.0.3", outcome=None),
+    ]
+    response = call_service(
+        monkeypatch,
+        services._async_bulk_set,
+        services.SERVICE_BULK_SET,
+        services.BULK_SET_SCHEMA,
+        {"value_path": "Device.Display.Lcd.Brightness", "value": 40},
+        panels,
+    )
+    assert all(panel.written == [{BRIGHTNESS: 40}] for panel in panels)
+    assert response["succeeded"] == 1
+    results = response["panels"]
+    assert results["10.0.0.1"]["status_id"] == 0
+    assert results["10.0.0.2"]["status_info"] == "Out of range"
+    assert results["10.0.0.3"]["error"] == "No result reported"
+
+
+def test_parse_profile():
+    """Profiles are partial Device trees of single values."""
+    assert services.parse_profile({"Display": {"Lcd": {"Brightness": 40}}}) == {
+        BRIGHTNESS: 40
+    }
+    assert services.parse_profile(
+        {"Device": {"Display": {"Audio": {"Volume": 10}}}}
+    ) == {VOLUME: 10}
+    for invalid in ({}, [], {"Display": {}}, {"Display": {"Name": [1]}}):
+        with pytest.raises(vol.Invalid):
+            services.parse_profile(invalid)
+
+
+def apply_profile(monkeypatch, profile, panels):
+    """Apply ``profile`` to ``panels`` and return the service response."""
+    return call_service(
+        monkeypatch,
+        services._async_apply_profile,
+        services.SERVICE_APPLY_PROFILE,
+        services.APPLY_PROFILE_SCHEMA,
+        {"profile": profile},
+        panels,
+    )
+
+
+def test_apply_profile_sends_only_differences(monkeypatch):
+    """Values a panel already has are skipped; matching panels get no write."""
+    state = {
+        "Device": {"Display": {"Lcd": {"Brightness": 40}, "Audio": {"Volume": 10}}}
+    }
+    matching = FakePanel("10.0.0.1", state)
+    differing = FakePanel(
+        "10.0.0.2",
+        {"Device": {"Display": {"Lcd": {"Brightness": 80}, "Audio": {"Volume": 10}}}},
+    )
+    restored = FakePanel("10.0.0.3", state, restored=True)
+    restored.async_refresh = lambda: asyncio.sleep(0)
+    response = apply_profile(
+        monkeypatch,
+        {"Display": {"Lcd": {"Brightness": 40}, "Audio": {"Volume": 10}}},
+        [matching, differing, restored],
+    )
+    assert matching.written == []
+    assert differing.written == [{BRIGHTNESS: 40}]
+    # Still restored after its refresh failed: every value is sent
+    assert restored.written == [{BRIGHTNESS: 40, VOLUME: 10}]
+    results = response["panels"]
+    assert results["10.0.0.1"]["skipped"] == [
+        "Device.Display.Lcd.Brightness",
+        "Device.Display.Audio.Volume",
+    ]
+    assert results["10.0.0.2"]["changed"] == ["Device.Display.Lcd.Brightness"]
+    assert response["succeeded"] == 3
+
+
+def test_apply_profile_refreshes_stale_state(monkeypatch):
+    """A panel showing restored state is polled before comparing."""
+    panel = FakePanel(
+        "10.0.0.1", {"Device": {"Display": {"Lcd": {"Brightness": 40}}}}, restored=True
+    )
+    response = apply_profile(
+        monkeypatch, {"Display": {"Lcd": {"Brightness": 40}}}, [panel]
+    )
+    assert panel.refreshes == 1
+    assert panel.written == []
+    assert response["panels"]["10.0.0.1"]["success"]
+
+
+def test_apply_profile_reports_failed_values(monkeypatch):
+    """Values the panel rejects fail the panel, naming the reason."""
+    panel = FakePanel("10.0.0.1", outcome=WriteOutcome(3, "Out of range"))
+    response = apply_profile(
+        monkeypatch, {"Display": {"Lcd": {"Brightness": 400}}}, [panel]
+    )
+    assert response["panels"]["10.0.0.1"]["failed"] == {
+        "Device.Display.Lcd.Brightness": "Out of range"
+    }
+    assert response["failed"] == 1
+
+
+@pytest.mark.parametrize(
+    "profile",
+    [
+        {"Display": {"CurrentState": "On"}},
+        {"DeviceOperations": {"EnterStandby": True}},
+        {"Display": {"Unknown": 1}},
+    ],
+)
+def test_apply_profile_rejects_non_settings(monkeypatch, profile):
+    """Sensors, device operations and unknown paths cannot be in a profile."""
+    panel = FakePanel("10.0.0.1")
+    with pytest.raises(ServiceValidationError):
+        apply_profile(monkeypatch, profile, [panel])
+    assert panel.written == []
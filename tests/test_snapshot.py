@@ -0,0 +1,107 @@
+"""Tests for warm starts from the stored snapshot."""
+
+import asyncio
+import json
+import os
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.crestron_tsw760.coordinator import (
+    CrestronDataUpdateCoordinator,
+)
+from custom_components.crestron_tsw760.descriptors import PathDescriptor
+from custom_components.crestron_tsw760.snapshot import SnapshotStore
+from tools.tsw760_simulator import PanelSimulator
+
+BRIGHTNESS = ("Device", "Display", "Lcd", "Brightness")
+TREE = {"Device": {"Display": {"Lcd": {"Brightness": 40}}}}
+DISCOVERED = (
+    PathDescriptor(
+        type="sensor",
+        name="Display Mode",
+        key="display_mode",
+        value_path=("Device", "Display", "Mode"),
+        discovered=True,
+    ),
+)
+
+
+def save(config_dir, data, schema=None):
+    """Schedule a save and let Home Assistant write it on stop."""
+
+    async def run():
+        hass = HomeAssistant(config_dir)
+        SnapshotStore(hass, "entry").async_schedule_save(data, schema)
+        await hass.async_stop(force=True)
+
+    asyncio.run(run())
+
+
+def test_round_trip(tmp_path):
+    """The tree and the discovered leaves survive a restart."""
+    save(str(tmp_path), TREE, DISCOVERED)
+
+    async def run():
+        hass = HomeAssistant(str(tmp_path))
+        snapshot = await SnapshotStore(hass, "entry").async_load()
+        await hass.async_stop(force=True)
+        return snapshot
+
+    snapshot = asyncio.run(run())
+    assert snapshot.data == TREE
+    assert snapshot.schema == DISCOVERED
+    assert snapshot.saved_at is not None
+
+
+def test_missing_or_invalid_snapshot(tmp_path):
+    """Nothing is restored from a missing or malformed snapshot."""
+
+    async def load():
+        hass = HomeAssistant(str(tmp_path))
+        snapshot = await SnapshotStore(hass, "entry").async_load()
+        await hass.async_stop(force=True)
+        return snapshot
+
+    assert asyncio.run(load()) is None
+    save(str(tmp_path), ["not", "a", "tree"])
+    assert asyncio.run(load()) is None
+    # A stored schema that no longer fits is dropped, keeping the data
+    path = os.path.join(tmp_path, ".storage", "crestron_tsw760.entry.snapshot")
+    with open(path, encoding="utf-8") as file:
+        stored = json.load(file)
+    stored["data"] = {"data": TREE, "schema": [{"name": "Display Mode"}]}
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(stored, file)
+    snapshot = asyncio.run(load())
+    assert snapshot.data == TREE
+    assert snapshot.schema is None
+
+
+def test_coordinator_starts_from_snapshot(tmp_path):
+    """Values are served from the snapshot until a live poll succeeds."""
+    save(str(tmp_path), TREE)
+
+    async def run():
+        simulator = PanelSimulator()
+        port = await simulator.async_start("127.0.0.1", 0)
+        hass = HomeAssistant(str(tmp_path))
+        coordinator = CrestronDataUpdateCoordinator(
+            hass, f"127.0.0.1:{port}", "Panel", store=SnapshotStore(hass, "entry")
+        )
+        coordinator.register_path(BRIGHTNESS)
+        panel = simulator.panel(coordinator.host)
+        panel["tree"]["Device"]["Display"]["Lcd"]["Brightness"] = 65
+        try:
+            assert await coordinator.async_restore_snapshot()
+            assert coordinator.restored
+            assert coordinator.values[BRIGHTNESS] == 40
+            assert simulator.stats["gets"] == 0
+            await coordinator.async_refresh()
+            assert not coordinator.restored
+            assert coordinator.values[BRIGHTNESS] == 65
+        finally:
+            await coordinator.async_shutdown()
+            await simulator.async_stop()
+            await hass.async_stop(force=True)
+
+    asyncio.run(run())
@@ -0,0 +1,236 @@
+"""Tests for coalescing writes to a panel."""
+
+import asyncio
+import types
+
+from custom_components.crestron_tsw760.breaker import CircuitBreaker
+from custom_components.crestron_tsw760.commands import CommandQueue
+from custom_components.crestron_tsw760.timing import PhaseTimings
+from custom_components.crestron_tsw760.writer import (
+    WriteCoalescer,
+    WriteOutcome,
+    parse_write_results,
+)
+
+BRIGHTNESS = ("Device", "Display", "Lcd", "Brightness")
+VOLUME = ("Device", "Audio", "Volume")
+STANDBY = ("Device", "DeviceOperations", "Standby")
+
+
+class FakeClient:
+    """Stand-in for the panel client, answering every write with success."""
+
+    host = "panel"
+
+    def __init__(self):
+        """Record the payloads posted."""
+        self.breaker = CircuitBreaker("panel")
+        self.queue = CommandQueue()
+        self.timings = PhaseTimings()
+        self.payloads = []
+
+    async def async_post_json(self, path, payload):
+        """Record the payload and report every leaf written."""
+        self.payloads.append(payload)
+        return {"Actions": [{"Results": list(results(payload, []))}]}
+
+
+def results(tree, parent):
+    """Yield a successful result for every leaf of a write payload."""
+    for key, value in tree.items():
+        if isinstance(value, dict):
+            yield from results(value, [*parent, key])
+        else:
+            yield {"Path": ".".join(parent), "Property": key, "StatusId": 0}
+
+
+def make_coalescer(client, delay=0.01):
+    """Return a coalescer on the running loop, recording its results."""
+    loop = asyncio.get_running_loop()
+    hass = types.SimpleNamespace(loop=loop, async_create_task=loop.create_task)
+    applied = []
+    coalescer = WriteCoalescer(
+        hass, client, lambda *result: applied.append(result), delay
+    )
+    return coalescer, applied
+
+
+def test_rapid_writes_are_merged():
+    """Writes pending together go in one POST, keeping each path's latest value."""
+
+    async def run():
+        client = FakeClient()
+        coalescer, applied = make_coalescer(client)
+        outcomes = await asyncio.gather(
+            coalescer.async_write(BRIGHTNESS, 10),
+            coalescer.async_write(BRIGHTNESS, 40),
+            coalescer.async_write(VOLUME, 25),
+        )
+        assert client.payloads == [
+            {
+                "Device": {
+                    "Display": {"Lcd": {"Brightness": 40}},
+                    "Audio": {"Volume": 25},
+                }
+            }
+        ]
+        assert all(outcome.success for outcome in outcomes)
+        assert applied == [({BRIGHTNESS: 40, VOLUME: 25}, [], [])]
+        assert coalescer.stats == {
+            "writes_requested": 3,
+            "writes_superseded": 1,
+            "posts": 1,
+        }
+
+    asyncio.run(run())
+
+
+def test_operations_skip_the_debounce():
+    """A device operation is sent at once, taking pending writes along."""
+
+    async def run():
+        client = FakeClient()
+        coalescer, _ = make_coalescer(client, delay=60)
+        slider = asyncio.create_task(coalescer.async_write(BRIGHTNESS, 10))
+        await asyncio.sleep(0)
+        await asyncio.wait_for(coalescer.async_write(STANDBY, True), 1)
+        await asyncio.wait_for(slider, 1)
+        assert client.payloads == [
+            {
+                "Device": {
+                    "Display": {"Lcd": {"Brightness": 10}},
+                    "DeviceOperations": {"Standby": True},
+                }
+            }
+        ]
+
+    asyncio.run(run())
+
+
+def test_writes_made_while_queued_join_the_batch():
+    """A batch waiting for a queue slot still takes newer writes."""
+
+    async def run():
+        client = FakeClient()
+        client.queue = CommandQueue(limit=1)
+        coalescer, _ = make_coalescer(client, delay=0)
+        async with client.queue.async_slot():
+            first = asyncio.create_task(coalescer.async_write(BRIGHTNESS, 10))
+            await asyncio.sleep(0.01)
+            second = asyncio.create_task(coalescer.async_write(VOLUME, 25))
+            await asyncio.sleep(0.01)
+            assert client.payloads == []
+        await asyncio.wait_for(asyncio.gather(first, second), 1)
+        assert client.payloads == [
+            {
+                "Device": {
+                    "Display": {"Lcd": {"Brightness": 10}},
+                    "Audio": {"Volume": 25},
+                }
+            }
+        ]
+
+    asyncio.run(run())
+
+
+def test_flush_sends_pending_writes():
+    """Flushing sends the pending batch without waiting for the debounce."""
+
+    async def run():
+        client = FakeClient()
+        coalescer, applied = make_coalescer(client, delay=60)
+        write = asyncio.create_task(coalescer.async_write(BRIGHTNESS, 10))
+        await asyncio.sleep(0)
+        await asyncio.wait_for(coalescer.async_flush(), 1)
+        assert write.done()
+        assert applied == [({BRIGHTNESS: 10}, [], [])]
+
+    asyncio.run(run())
+
+
+def test_parse_write_results():
+    """Results are keyed by path; malformed entries are ignored."""
+    response = {
+        "Actions": [
+            {
+                "Results": [
+                    {
+                        "Path": "Device.Display.Lcd",
+                        "Property": "Brightness",
+                        "StatusId": 1,
+                        "StatusInfo": "OK",
+                    },
+                    {"Path": "Device.Audio", "Property": "Volume", "StatusId": 3},
+                    {"Path": "Device.Audio", "StatusId": 0},
+                    "Device.Audio.Mute",
+                ]
+            },
+            None,
+            {"Results": None},
+        ]
+    }
+    outcomes = parse_write_results(response)
+    assert outcomes == {
+        BRIGHTNESS: WriteOutcome(1, "OK"),
+        VOLUME: WriteOutcome(3, None),
+    }
+    assert outcomes[BRIGHTNESS].success
+    assert not outcomes[VOLUME].success
+    assert parse_write_results(None) == {}
+    assert parse_write_results({"Actions": None}) == {}
+
+
+def test_results_are_fanned_out():
+    """Each waiter gets its path's outcome; unreported paths are ambiguous."""
+
+    async def run():
+        client = FakeClient()
+
+        async def answer(path, payload):
+            client.payloads.append(payload)
+            return {
+                "Actions": [
+                    {
+                        "Results": [
+                            {
+                                "Path": "Device.Audio",
+                                "Property": "Volume",
+                                "StatusId": 3,
+                            }
+                        ]
+                    }
+                ]
+            }
+
+        client.async_post_json = answer
+        coalescer, applied = make_coalescer(client)
+        brightness, volume = await asyncio.gather(
+            coalescer.async_write(BRIGHTNESS, 10), coalescer.async_write(VOLUME, 25)
+        )
+        assert brightness is None
+        assert volume == WriteOutcome(3, None)
+        assert applied == [({}, [VOLUME], [BRIGHTNESS])]
+
+    asyncio.run(run())
+
+
+def test_failed_post_fails_every_waiter():
+    """An error from the POST reaches every caller and marks the paths failed."""
+
+    async def run():
+        client = FakeClient()
+
+        async def fail(path, payload):
+            raise OSError("unreachable")
+
+        client.async_post_json = fail
+        coalescer, applied = make_coalescer(client)
+        results = await asyncio.gather(
+            coalescer.async_write(BRIGHTNESS, 10),
+            coalescer.async_write(VOLUME, 25),
+            return_exceptions=True,
+        )
+        assert all(isinstance(result, OSError) for result in results)
+        assert applied == [({}, [BRIGHTNESS, VOLUME], [])]
+
+    asyncio.run(run())
@@ -0,0 +1,291 @@
+"""End-to-end load benchmark for the Crestron TSW-760 integration.
+
+Starts ``tsw760_simulator.py`` in a subprocess and sets up N panels against
+it, each with its coordinator and its switch, number, sensor and text
+entities created through the platforms' ``async_setup_entry``. It then
+runs rounds of concurrent polls, with slider writes mixed in, and reports:
+
+- poll latency percentiles (including time queued in the fleet scheduler)
+- requests per second and bytes received/parsed
+- peak RSS of the benchmark process, and with ``--trace-memory`` the
+  Python memory allocated per panel (coordinator, snapshot and entities)
+- event-loop blocking, measured by a ticker task
+- with ``--push``, the changes received over the panels' event streams
+
+Example: ``python tools/benchmark.py --panels 200 --rounds 20``.
+Any simulator option (``--latency``, ``--certificates``, ...) is passed on.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+import types
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from homeassistant.const import CONF_HOST, CONF_NAME  # noqa: E402
+from homeassistant.core import HomeAssistant  # noqa: E402
+from homeassistant.helpers import (  # noqa: E402
+    device_registry as dr,
+    entity_registry as er,
+)
+
+from custom_components.crestron_tsw760 import (  # noqa: E402
+    number,
+    sensor,
+    switch,
+    text,
+)
+from custom_components.crestron_tsw760.const import DOMAIN  # noqa: E402
+from custom_components.crestron_tsw760.coordinator import (  # noqa: E402
+    CrestronDataUpdateCoordinator,
+)
+from custom_components.crestron_tsw760.descriptors import (  # noqa: E402
+    DESCRIPTORS,
+    build_panel_info,
+)
+from custom_components.crestron_tsw760.scheduler import FleetScheduler  # noqa: E402
+from tsw760_simulator import add_arguments  # noqa: E402
+
+SIMULATOR = os.path.join(ROOT, "tools", "tsw760_simulator.py")
+PLATFORM_MODULES = (sensor, switch, number, text)
+
+
+def percentile(values, fraction):
+    """Return the ``fraction`` percentile of ``values``."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+class LoopMonitor:
+    """Measure how long the event loop is blocked between ticks."""
+
+    def __init__(self, interval=0.005):
+        """Initialize the monitor."""
+        self.interval = interval
+        self.delays = []
+        self._task = None
+
+    def start(self):
+        """Start ticking."""
+        self._task = asyncio.get_running_loop().create_task(self._tick())
+
+    async def _tick(self):
+        """Record how late each tick fires."""
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            self.delays.append(max(loop.time() - start - self.interval, 0.0))
+
+    def stop(self):
+        """Stop ticking."""
+        self._task.cancel()
+
+
+async def async_start_simulator(args, port):
+    """Start the simulator subprocess and wait until it listens."""
+    simulator_args = [
+        f"--certificates={args.certificates}",
+        f"--certificate-size={args.certificate_size}",
+        f"--latency={args.latency}",
+        f"--latency-jitter={args.latency_jitter}",
+        f"--error-rate={args.error_rate}",
+        f"--write-error-rate={args.write_error_rate}",
+        f"--churn={args.churn}",
+        f"--change-interval={args.change_interval}",
+    ]
+    if args.etag:
+        simulator_args.append("--etag")
+    if args.push:
+        simulator_args.append("--push")
+    process = await asyncio.create_subprocess_exec(
+        sys.executable,
+        SIMULATOR,
+        f"--port={port}",
+        *simulator_args,
+        stdout=asyncio.subprocess.PIPE,
+    )
+    await process.stdout.readline()
+    return process
+
+
+async def async_setup_panel(hass, index, port, scheduler, read_state):
+    """Create one panel's coordinator and entities."""
+    host = f"127.0.{index // 250}.{index % 250 + 1}:{port}"
+    name = f"Panel {index}"
+    entry = types.SimpleNamespace(
+        entry_id=f"bench{index}",
+        data={CONF_HOST: host, CONF_NAME: name},
+        options={},
+    )
+    coordinator = CrestronDataUpdateCoordinator(hass, host, name, scheduler)
+    for descriptor in DESCRIPTORS:
+        coordinator.register_path(descriptor.value_path)
+    await coordinator.async_refresh()
+    coordinator.panel = build_panel_info(coordinator, entry)
+    hass.data[DOMAIN][entry.entry_id] = coordinator
+
+    entities = []
+
+    def add_entities(new_entities, update_before_add=False):
+        entities.extend(new_entities)
+
+    for module in PLATFORM_MODULES:
+        await module.async_setup_entry(hass, entry, add_entities)
+    for entity in entities:
+        entity.hass = hass
+        coordinator.async_add_listener(
+            lambda entity=entity: read_state(entity), entity.coordinator_context
+        )
+    return coordinator, entities
+
+
+async def async_run(args):
+    """Run the benchmark and return the report."""
+    simulator = await async_start_simulator(args, args.port)
+    config_dir = tempfile.mkdtemp()
+    hass = HomeAssistant(config_dir)
+    hass.data[DOMAIN] = {}
+    await dr.async_load(hass)
+    await er.async_load(hass)
+    scheduler = FleetScheduler()
+    latencies = []
+    state_reads = [0]
+
+    def read_state(entity):
+        # What async_write_ha_state would read
+        state_reads[0] += 1
+        _ = entity.state, entity.extra_state_attributes
+
+    try:
+        if args.trace_memory:
+            tracemalloc.start()
+        setup_start = time.perf_counter()
+        panels = await asyncio.gather(
+            *(
+                async_setup_panel(hass, index, args.port, scheduler, read_state)
+                for index in range(args.panels)
+            )
+        )
+        setup_seconds = time.perf_counter() - setup_start
+        memory_per_panel = None
+        if args.trace_memory:
+            # Sockets and buffers of the pooled connections are included
+            memory_per_panel = tracemalloc.get_traced_memory()[0] // args.panels
+            tracemalloc.stop()
+        coordinators = [coordinator for coordinator, _ in panels]
+        numbers = [
+            entity
+            for _, entities in panels
+            for entity in entities
+            if isinstance(entity, number.CrestronNumber)
+        ]
+        for coordinator in coordinators:
+            original = coordinator._async_update_data
+
+            async def timed(original=original):
+                start = time.perf_counter()
+                try:
+                    return await original()
+                finally:
+                    latencies.append(time.perf_counter() - start)
+
+            coordinator._async_update_data = timed
+            if args.push:
+                coordinator.push.start()
+        if args.push:
+            while not all(coordinator.push.connected for coordinator in coordinators):
+                await asyncio.sleep(0.05)
+
+        requests_before = sum(c.client.stats["requests"] for c in coordinators)
+        monitor = LoopMonitor()
+        monitor.start()
+        start = time.perf_counter()
+        for _ in range(args.rounds):
+            writes = [
+                entity.async_set_native_value(random.randint(0, 100))
+                for entity in random.sample(
+                    numbers, min(args.writes_per_round, len(numbers))
+                )
+            ]
+            await asyncio.gather(
+                *(coordinator.async_refresh() for coordinator in coordinators),
+                *writes,
+            )
+        elapsed = time.perf_counter() - start
+        monitor.stop()
+
+        def total(key):
+            return sum(coordinator.client.stats[key] for coordinator in coordinators)
+
+        requests = total("requests") - requests_before
+        received = total("bytes_received")
+        skipped = total("bytes_skipped")
+        report = {
+            "panels": args.panels,
+            "rounds": args.rounds,
+            "setup_seconds": round(setup_seconds, 3),
+            "setup_ms_per_panel": round(setup_seconds * 1000 / args.panels, 2),
+            "poll_latency_ms": {
+                name: round(percentile(latencies, fraction) * 1000, 2)
+                for name, fraction in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99))
+            },
+            "requests_per_second": round(requests / elapsed, 1),
+            "bytes_received": received,
+            "bytes_parsed": received - skipped,
+            "connections_created": total("connections_created"),
+            "connections_reused": total("connections_reused"),
+            "state_reads": state_reads[0],
+            "peak_rss_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+            "memory_per_panel_bytes": memory_per_panel,
+            "loop_blocking_ms": {
+                "max": round(max(monitor.delays, default=0) * 1000, 2),
+                "p99": round(percentile(monitor.delays, 0.99) * 1000, 2),
+                "total": round(sum(monitor.delays) * 1000, 2),
+            },
+            "scheduler": dict(scheduler.stats),
+            "queue_max_depth": max(
+                coordinator.client.queue.stats["max_depth"]
+                for coordinator in coordinators
+            ),
+        }
+        if args.push:
+            report["pushed_changes"] = sum(
+                coordinator.stats["pushed_changes"] for coordinator in coordinators
+            )
+        for coordinator in coordinators:
+            await coordinator.async_shutdown()
+        return report
+    finally:
+        simulator.terminate()
+        await simulator.wait()
+        await hass.async_stop(force=True)
+
+
+def main():
+    """Parse arguments, run the benchmark and print the report as JSON."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--panels", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--writes-per-round", type=int, default=10)
+    parser.add_argument("--port", type=int, default=18760)
+    parser.add_argument("--trace-memory", action="store_true")
+    add_arguments(parser)
+    report = asyncio.run(async_run(parser.parse_args()))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
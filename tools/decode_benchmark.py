@@ -0,0 +1,148 @@
+"""Benchmark decoding of real-sized ``/Device`` payloads.
+
+Compares decoding a whole body with the standard library and filtering
+it afterwards, as the integration originally did, against
+``PruningJsonDecoder`` pruning it while it streams, with each available
+backend (``pruned_*``). Bodies come from ``tsw760_simulator.py`` and include the raw control
+character some firmware emits unless ``--clean`` is given. They are fed
+in 16 KiB chunks like the HTTP client does. ``--compare`` adds another
+``decoder.py``, e.g. an older revision exported with ``git show``.
+
+Example: ``python tools/decode_benchmark.py --certificates 0 20 100``.
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from tsw760_simulator import build_device_tree  # noqa: E402
+
+
+def load_decoder(path, name="crestron_decoder"):
+    """Load a decoder module on its own, without Home Assistant."""
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+decoder = load_decoder(
+    os.path.join(ROOT, "custom_components", "crestron_tsw760", "decoder.py")
+)
+
+EXCLUDED_KEYS = ["CertificateStore", "Ieee8021x"]
+CHUNK_SIZE = 16384
+
+
+def build_body(certificates, certificate_size, clean=False):
+    """Return a ``/Device`` body as the panel sends it."""
+    tree = build_device_tree("1234567890", certificates, certificate_size)
+    body = json.dumps(tree)
+    if not clean:
+        body = body.replace("TSW-760 Lobby", "TSW-760\tLobby")
+    return body.encode()
+
+
+def filter_response_data(data):
+    """Filter out the excluded keys like the integration originally did."""
+    if isinstance(data, dict):
+        return {
+            k: filter_response_data(v) for k, v in data.items() if k not in EXCLUDED_KEYS
+        }
+    if isinstance(data, list):
+        return [filter_response_data(item) for item in data]
+    return data
+
+
+def decode_full(body):
+    """Decode and filter the whole body like the integration originally did."""
+    return filter_response_data(json.loads(body.decode(), strict=False))
+
+
+def decode_pruned(body, loads=None, module=decoder):
+    """Decode the body in chunks, skipping the excluded subtrees."""
+    if loads is None:
+        pruning = module.PruningJsonDecoder(EXCLUDED_KEYS)
+    else:
+        pruning = module.PruningJsonDecoder(EXCLUDED_KEYS, loads)
+    for start in range(0, len(body), CHUNK_SIZE):
+        pruning.feed(body[start : start + CHUNK_SIZE])
+    return pruning.close()
+
+
+def measure(function, rounds):
+    """Return the median run time of ``function`` in milliseconds."""
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def peak_memory(function):
+    """Return the peak memory allocated while running ``function`` in KiB."""
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1] / 1024
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    """Run the benchmark and print the results as JSON."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--certificates", type=int, nargs="+", default=[0, 20, 100])
+    parser.add_argument("--certificate-size", type=int, default=2048)
+    parser.add_argument("--rounds", type=int, default=50)
+    parser.add_argument(
+        "--clean", action="store_true", help="leave out the raw control character"
+    )
+    parser.add_argument("--compare", help="another decoder.py to measure")
+    args = parser.parse_args()
+
+    candidates = {}
+    for name, loads in decoder.BACKENDS.items():
+        candidates[f"pruned_{name}"] = lambda body, loads=loads: decode_pruned(
+            body, loads
+        )
+    if args.compare:
+        other = load_decoder(args.compare, "compared_decoder")
+        candidates["compared"] = lambda body: decode_pruned(body, module=other)
+
+    results = []
+    for certificates in args.certificates:
+        body = build_body(certificates, args.certificate_size, args.clean)
+        expected = decode_full(body)
+        result = {
+            "certificates": certificates,
+            "body_bytes": len(body),
+            "full_stdlib_ms": round(measure(lambda: decode_full(body), args.rounds), 3),
+            "full_stdlib_peak_kib": round(peak_memory(lambda: decode_full(body)), 1),
+        }
+        for name, decode in candidates.items():
+            if decode(body) != expected:
+                raise SystemExit(f"{name} decoded a different document")
+            result[f"{name}_ms"] = round(
+                measure(lambda decode=decode: decode(body), args.rounds), 3
+            )
+            result[f"{name}_peak_kib"] = round(
+                peak_memory(lambda decode=decode: decode(body)), 1
+            )
+        results.append(result)
+    print(
+        json.dumps({"backends": list(decoder.BACKENDS), "results": results}, indent=2)
+    )
+
+
+if __name__ == "__main__":
+    main()
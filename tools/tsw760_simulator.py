@@ -0,0 +1,370 @@
+"""Local stand-in for the Crestron TSW-760 REST API.
+
+Serves ``/Device`` and any subtree below it (``/Device/Display``,
+``/Device/ThirdPartyApplications``, ...) and answers POSTs with
+``Actions/Results`` like the panel firmware does. Every distinct ``Host``
+header is a separate simulated panel, so a single server can stand in for
+a whole fleet: point each coordinator at ``127.0.x.y:<port>``.
+
+With ``--push`` it also serves the ``/Device/Events`` websocket, sending
+``{"Changes": [{"Path", "Property", "Value"}]}`` for every write and every
+spontaneous change (``--churn``, ``--change-interval``). Without it the
+endpoint answers 404 like firmware without an event stream.
+
+Run standalone with ``python tools/tsw760_simulator.py --port 8760``.
+"""
+
+import argparse
+import asyncio
+import base64
+import copy
+import hashlib
+import json
+import os
+import random
+
+from aiohttp import web
+
+EXCLUDED_FROM_WRITES = ("DeviceInfo", "CertificateStore")
+
+
+def build_device_tree(serial, certificates=20, certificate_size=2048):
+    """Return a realistic ``/Device`` document for one panel."""
+    return {
+        "Device": {
+            "DeviceInfo": {
+                "Model": "TSW-760",
+                "Category": "TouchPanel",
+                "Manufacturer": "Crestron",
+                "SerialNumber": serial,
+                "MacAddress": "00.10.7f.00.00.00",
+                "DeviceVersion": "3.002.1061",
+                "BuildDate": "Mar 18 2024 (487213)",
+                "Name": "TSW-760 Lobby",
+            },
+            "Display": {
+                "CurrentState": "Active",
+                "Lcd": {
+                    "Brightness": 80,
+                    "AutoBrightness": {"IsEnabled": False, "Level": 3},
+                },
+                "Audio": {"Volume": 50, "IsMuted": False},
+                "ScreenSaver": {"IsEnabled": True, "TimeoutMinutes": 10},
+            },
+            "Camera": {"IsEnabled": True, "Resolution": "1080p"},
+            "DeviceOperations": {"EnterStandby": False, "ExitStandby": False},
+            "ThirdPartyApplications": {
+                "Ems": {"ServerUrl": "https://ems.example.com", "IsEnabled": True},
+                "Mode": "Ems",
+            },
+            "Ethernet": {
+                "HostName": f"TSW-{serial}",
+                "Adapters": [
+                    {
+                        "IsDhcpEnabled": True,
+                        "IpAddress": "10.0.0.10",
+                        "SubnetMask": "255.255.255.0",
+                    }
+                ],
+            },
+            "CertificateStore": {
+                "Certificates": [
+                    {
+                        "Name": f"enterprise-{index}",
+                        "Issuer": "CN=Example Enterprise CA",
+                        "Pem": base64.b64encode(os.urandom(certificate_size)).decode(),
+                    }
+                    for index in range(certificates)
+                ]
+            },
+            "Ieee8021x": {
+                "IsEnabled": True,
+                "AuthenticationMethod": "EAP-TLS",
+                "Certificates": ["radius-client"],
+            },
+        }
+    }
+
+
+def flatten_payload(payload, prefix=()):
+    """Yield ``(path, value)`` for every leaf of a write payload."""
+    for key, value in payload.items():
+        if isinstance(value, dict):
+            yield from flatten_payload(value, (*prefix, key))
+        else:
+            yield (*prefix, key), value
+
+
+class PanelSimulator:
+    """aiohttp application simulating a fleet of TSW-760 panels."""
+
+    def __init__(
+        self,
+        certificates=20,
+        certificate_size=2048,
+        latency=0.0,
+        latency_jitter=0.0,
+        error_rate=0.0,
+        write_error_rate=0.0,
+        churn=0.0,
+        etag=False,
+        push=False,
+        change_interval=0.0,
+    ):
+        """Initialize the simulator."""
+        self.certificates = certificates
+        self.certificate_size = certificate_size
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.error_rate = error_rate
+        self.write_error_rate = write_error_rate
+        self.churn = churn
+        self.etag = etag
+        self.change_interval = change_interval
+        self.panels = {}
+        self._template = None
+        self._change_task = None
+        self.stats = {
+            "gets": 0,
+            "posts": 0,
+            "errors": 0,
+            "bytes_sent": 0,
+            "events_sent": 0,
+        }
+        self.app = web.Application()
+        if push:
+            self.app.router.add_get("/Device/Events", self.handle_events)
+        self.app.router.add_get("/Device", self.handle_get)
+        self.app.router.add_get("/Device/{path:.+}", self.handle_get)
+        self.app.router.add_post("/Device", self.handle_post)
+        self.app.router.add_post("/Device/{path:.+}", self.handle_post)
+
+    def panel(self, host):
+        """Return the state of the panel addressed by ``host``."""
+        if host not in self.panels:
+            if self._template is None:
+                # Certificates are expensive to generate; share one store
+                self._template = build_device_tree(
+                    "0", self.certificates, self.certificate_size
+                )
+            tree = copy.deepcopy(self._template)
+            digest = hashlib.sha1(host.encode()).digest()
+            device_info = tree["Device"]["DeviceInfo"]
+            device_info["SerialNumber"] = digest.hex()[:10].upper()
+            device_info["MacAddress"] = "00.10.7f.%02x.%02x.%02x" % tuple(digest[:3])
+            self.panels[host] = {"tree": tree, "version": 0, "subscribers": set()}
+        return self.panels[host]
+
+    async def _publish(self, panel, changes):
+        """Send ``[(path, value)]`` changes to the panel's subscribers."""
+        if not changes or not panel["subscribers"]:
+            return
+        message = {
+            "Changes": [
+                {"Path": ".".join(path[:-1]), "Property": path[-1], "Value": value}
+                for path, value in changes
+            ]
+        }
+        for websocket in list(panel["subscribers"]):
+            try:
+                await websocket.send_json(message)
+            except ConnectionError:
+                panel["subscribers"].discard(websocket)
+                continue
+            self.stats["events_sent"] += 1
+
+    async def _toggle_state(self, panel):
+        """Flip the display between Active and Standby."""
+        display = panel["tree"]["Device"]["Display"]
+        display["CurrentState"] = (
+            "Standby" if display["CurrentState"] == "Active" else "Active"
+        )
+        panel["version"] += 1
+        await self._publish(
+            panel, [(("Device", "Display", "CurrentState"), display["CurrentState"])]
+        )
+
+    async def _change_periodically(self):
+        """Change every panel's state every ``change_interval`` seconds."""
+        while True:
+            await asyncio.sleep(self.change_interval)
+            for panel in list(self.panels.values()):
+                await self._toggle_state(panel)
+
+    async def handle_events(self, request):
+        """Stream the panel's changes over a websocket."""
+        panel = self.panel(request.host)
+        websocket = web.WebSocketResponse(heartbeat=30)
+        await websocket.prepare(request)
+        panel["subscribers"].add(websocket)
+        try:
+            async for _ in websocket:
+                pass
+        finally:
+            panel["subscribers"].discard(websocket)
+        return websocket
+
+    async def _delay(self):
+        """Wait for the configured latency."""
+        delay = self.latency + random.uniform(0, self.latency_jitter)
+        if delay:
+            await asyncio.sleep(delay)
+
+    def _should_fail(self, rate):
+        """Return whether to inject an error."""
+        if rate and random.random() < rate:
+            self.stats["errors"] += 1
+            return True
+        return False
+
+    async def handle_get(self, request):
+        """Serve ``/Device`` or one of its subtrees."""
+        self.stats["gets"] += 1
+        await self._delay()
+        if self._should_fail(self.error_rate):
+            raise web.HTTPInternalServerError
+        panel = self.panel(request.host)
+        if self.churn and random.random() < self.churn:
+            await self._toggle_state(panel)
+        keys = ["Device", *filter(None, request.match_info.get("path", "").split("/"))]
+        node = panel["tree"]
+        for key in keys:
+            if not isinstance(node, dict) or key not in node:
+                raise web.HTTPNotFound
+            node = node[key]
+        etag = f'"{panel["version"]}-{len(keys)}-{hash(tuple(keys))}"'
+        if self.etag and request.headers.get("If-None-Match") == etag:
+            raise web.HTTPNotModified
+        for key in reversed(keys):
+            node = {key: node}
+        # Some firmware versions emit raw control characters in strings
+        body = json.dumps(node).replace("TSW-760 Lobby", "TSW-760\tLobby").encode()
+        self.stats["bytes_sent"] += len(body)
+        headers = {"ETag": etag} if self.etag else {}
+        return web.Response(
+            body=body, content_type="application/json", headers=headers
+        )
+
+    async def handle_post(self, request):
+        """Apply a partial device state and report per-property results."""
+        self.stats["posts"] += 1
+        await self._delay()
+        if self._should_fail(self.error_rate):
+            raise web.HTTPInternalServerError
+        panel = self.panel(request.host)
+        payload = await request.json()
+        results = []
+        changes = []
+        for path, value in flatten_payload(payload):
+            parent = panel["tree"]
+            for key in path[:-1]:
+                parent = parent.get(key) if isinstance(parent, dict) else None
+            if (
+                not isinstance(parent, dict)
+                or path[-1] not in parent
+                or any(key in EXCLUDED_FROM_WRITES for key in path)
+            ):
+                status_id, status_info = 2, "Property not found"
+            elif self._should_fail(self.write_error_rate):
+                status_id, status_info = 3, "Property could not be set"
+            else:
+                parent[path[-1]] = value
+                panel["version"] += 1
+                changes.append((path, value))
+                status_id, status_info = 0, "OK"
+            results.append(
+                {
+                    "Path": ".".join(path[:-1]),
+                    "Property": path[-1],
+                    "StatusId": status_id,
+                    "StatusInfo": status_info,
+                }
+            )
+        await self._publish(panel, changes)
+        return web.json_response(
+            {
+                "Actions": [
+                    {
+                        "Operation": "SetPartialDeviceState",
+                        "Results": results,
+                        "TargetObject": "Device",
+                    }
+                ]
+            }
+        )
+
+    async def async_start(self, host="0.0.0.0", port=0):
+        """Start serving and return the bound port."""
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        if self.change_interval:
+            self._change_task = asyncio.create_task(self._change_periodically())
+        return self._runner.addresses[0][1]
+
+    async def async_stop(self):
+        """Stop serving."""
+        if self._change_task is not None:
+            self._change_task.cancel()
+        for panel in self.panels.values():
+            for websocket in list(panel["subscribers"]):
+                await websocket.close()
+        await self._runner.cleanup()
+
+
+def add_arguments(parser):
+    """Add the simulator options to an argument parser."""
+    parser.add_argument("--certificates", type=int, default=20)
+    parser.add_argument("--certificate-size", type=int, default=2048)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--latency-jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--write-error-rate", type=float, default=0.0)
+    parser.add_argument("--churn", type=float, default=0.0)
+    parser.add_argument("--etag", action="store_true")
+    parser.add_argument("--push", action="store_true")
+    parser.add_argument("--change-interval", type=float, default=0.0)
+
+
+def simulator_from_args(args):
+    """Create a simulator from parsed arguments."""
+    return PanelSimulator(
+        certificates=args.certificates,
+        certificate_size=args.certificate_size,
+        latency=args.latency,
+        latency_jitter=args.latency_jitter,
+        error_rate=args.error_rate,
+        write_error_rate=args.write_error_rate,
+        churn=args.churn,
+        etag=args.etag,
+        push=args.push,
+        change_interval=args.change_interval,
+    )
+
+
+async def _async_main(args):
+    """Run the simulator until interrupted."""
+    simulator = simulator_from_args(args)
+    port = await simulator.async_start(args.bind, args.port)
+    print(f"TSW-760 simulator listening on {args.bind}:{port}", flush=True)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await simulator.async_stop()
+
+
+def main():
+    """Parse arguments and run the simulator."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--bind", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8760)
+    add_arguments(parser)
+    try:
+        asyncio.run(_async_main(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()